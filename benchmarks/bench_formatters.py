@@ -0,0 +1,81 @@
+"""Benchmark Telegram HTML rendering on Claude-sized reports.
+
+Run: uv run python benchmarks/bench_formatters.py
+
+Times `sanitize_telegram_html` (full pass over the input) and
+`render_telegram_html` (sanitize + repair + truncate to one message) on
+synthetic reports from 4 KB to 1 MB. Time per KB should stay flat as the
+input grows; a rising column means the scan went quadratic.
+"""
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+from d_brain.bot.formatters import render_telegram_html, sanitize_telegram_html
+
+SIZES = (4 * 1024, 16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024)
+
+# Pieces of a typical report plus the markup Claude gets wrong
+_PIECES = (
+    "<b>📅 Итоги дня</b>\n",
+    "<i>Задача перенесена на понедельник</i> ",
+    "Созвон с командой по проекту, обсудили метрики. ",
+    "<code>git push origin main</code> ",
+    '<a href="https://todoist.com/app/task/123">задача</a> ',
+    "конверсия < 5% & отток > 10% ",
+    "R&amp;D &#x27;бюджет&#x27; ",
+    "<div>неподдерживаемый тег</div> ",
+    "**markdown** ## заголовок ",
+    "<b>незакрытый ",
+    "</i> ",
+    "\n• пункт списка\n",
+)
+
+
+def make_report(size: int, seed: int = 0) -> str:
+    """Synthetic Claude report of about `size` characters."""
+    rnd = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        piece = rnd.choice(_PIECES)
+        parts.append(piece)
+        length += len(piece)
+    return "".join(parts)[:size]
+
+
+def measure(func: Callable[[str], str], text: str, min_time: float = 0.2) -> float:
+    """Best seconds per call over repeated runs."""
+    best = float("inf")
+    total = 0.0
+    while total < min_time:
+        start = time.perf_counter()
+        func(text)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="Seconds to spend per case"
+    )
+    args = parser.parse_args()
+
+    print(f"{'size':>8}  {'sanitize ms':>12}  {'µs/KB':>7}  {'render ms':>10}")
+    for size in SIZES:
+        text = make_report(size)
+        full = measure(sanitize_telegram_html, text, args.min_time)
+        cut = measure(render_telegram_html, text, args.min_time)
+        print(
+            f"{size // 1024:>6}KB  {full * 1000:>12.2f}  "
+            f"{full * 1e6 / (size / 1024):>7.1f}  {cut * 1000:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
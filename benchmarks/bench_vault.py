@@ -0,0 +1,318 @@
+"""Benchmark bot operations on synthetic vaults of growing size.
+
+Run: uv run python benchmarks/bench_vault.py --years 1 3 5
+
+For each vault size a synthetic vault (vault_gen.py) is generated and
+the hot paths are timed: appends, the attachment pipeline, /status, formatters,
+command parsing, git commit + push and prompt assembly. A time that
+climbs with --years shows where the bot degrades as the vault grows.
+
+Results are compared with the baseline file: cases slower than the
+baseline by more than --threshold are flagged and the exit code is 1.
+Record a baseline with --save-baseline (numbers are machine-specific,
+so keep one per machine).
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from bench_formatters import make_report
+from vault_gen import generate_vault
+
+from d_brain.bot.formatters import (
+    format_hypothesis_dashboard,
+    format_report_pages,
+    render_telegram_html,
+)
+from d_brain.bot.handlers.commands import cmd_status
+from d_brain.bot.handlers.hypothesis import (
+    HypothesisSubcommand,
+    ParsedCommand,
+    build_ekg_continuation_prompt,
+    build_hypothesis_prompt,
+    parse_subcommand,
+)
+from d_brain.services.attachments import AttachmentPipeline
+from d_brain.services.git import VaultGit
+from d_brain.services.hypothesis_maps import HypothesisIndex, summarize_maps
+from d_brain.services.processor import ClaudeProcessor
+from d_brain.services.storage import VaultStorage
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 0.25  # Flag cases this much slower than the baseline
+NOISE_FLOOR = 20e-6  # Ignore slowdowns smaller than this many seconds
+MIN_RUNS = 5  # Timed runs per case, however slow
+
+_SUBCOMMANDS = (
+    None,
+    "recommend",
+    "new personal",
+    "review hm-map-1",
+    "validate hm-map-2",
+    "unknown",
+)
+
+
+@dataclass
+class Case:
+    """Operation to time; func may return an awaitable."""
+
+    name: str
+    func: Callable[[], Any]
+    max_runs: int = 10_000  # Cap for slow cases like git
+
+
+class _FakeMessage:
+    """Stand-in for aiogram Message: answers are dropped."""
+
+    async def answer(self, text: str, **kwargs: Any) -> None:
+        pass
+
+
+class _FakeRunner:
+    """Claude runner that answers at once, leaving prompt assembly to time."""
+
+    async def run(self, args: list[str], **kwargs: Any) -> Any:
+        return subprocess.CompletedProcess(args, 0, "📊 <b>Отчёт</b>", "")
+
+
+async def _call(case: Case) -> None:
+    result = case.func()
+    if inspect.isawaitable(result):
+        await result
+
+
+async def measure(case: Case, min_time: float) -> float:
+    """Best seconds per call over repeated runs, after one warm-up call."""
+    await _call(case)
+    best = float("inf")
+    total = 0.0
+    runs = 0
+    while runs < MIN_RUNS or (total < min_time and runs < case.max_runs):
+        start = time.perf_counter()
+        await _call(case)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        runs += 1
+    return best
+
+
+async def vault_cases(vault: Path) -> list[Case]:
+    """Benchmark cases bound to one vault."""
+    storage = VaultStorage(vault)
+    attachments = AttachmentPipeline(storage)
+    container = SimpleNamespace(storage=storage, attachments=attachments)
+    git = VaultGit(vault)
+    processor = ClaudeProcessor(vault, runner=_FakeRunner())  # type: ignore[arg-type]
+    maps = await HypothesisIndex(vault).maps()
+    today = date.today()
+    # Writes go to a scratch day, so reused vaults keep today's note as
+    # generated and results stay comparable between runs
+    scratch = today + timedelta(days=1)
+    storage.get_daily_file(scratch).unlink(missing_ok=True)
+    shutil.rmtree(storage.attachments_path / scratch.isoformat(), ignore_errors=True)
+    scratch_time = datetime.combine(scratch, datetime.min.time())
+    text = make_report(64 * 1024)
+    report = {"report": text, "processed_entries": 10}
+    history = [
+        {"role": "user" if i % 2 else "assistant", "content": make_report(600, i)}
+        for i in range(20)
+    ]
+    counter = iter(range(sys.maxsize))
+
+    def append() -> None:
+        storage.append_to_daily("Заметка для бенчмарка", scratch_time, "[text]")
+
+    async def save_attachment(data: bytes) -> None:
+        # As the photo/document handlers: download into incoming(), commit
+        async with container.attachments.incoming(scratch) as tmp_path:
+            await asyncio.to_thread(tmp_path.write_bytes, data)
+            await container.attachments.commit(tmp_path, scratch)
+
+    def new_attachment() -> Any:
+        # Fresh bytes each time, or content dedup skips the write
+        return save_attachment(next(counter).to_bytes(8, "big") + bytes(64 * 1024))
+
+    duplicate = b"duplicate" + bytes(64 * 1024)
+
+    def commit_and_push() -> None:
+        append()
+        git.commit_and_push("chore: bench")
+
+    def parse_all() -> None:
+        for args in _SUBCOMMANDS:
+            parse_subcommand(args)
+
+    def recommend_prompt() -> None:
+        overview = summarize_maps(maps, today)
+        build_hypothesis_prompt(
+            ParsedCommand(HypothesisSubcommand.RECOMMEND), overview
+        )
+
+    def status() -> Any:
+        return cmd_status(_FakeMessage(), container)  # type: ignore[arg-type]
+
+    def review_prompt() -> None:
+        build_hypothesis_prompt(
+            ParsedCommand(HypothesisSubcommand.REVIEW, name="hm-map-1")
+        )
+
+    return [
+        Case("append_to_daily", append),
+        Case("attachment 64KB new", new_attachment),
+        Case("attachment 64KB duplicate", lambda: save_attachment(duplicate)),
+        Case("cmd_status", status),
+        Case("render_telegram_html 64KB", lambda: render_telegram_html(text)),
+        Case("format_report_pages 64KB", lambda: format_report_pages(report)),
+        Case(
+            "format_hypothesis_dashboard",
+            lambda: format_hypothesis_dashboard(maps, today),
+        ),
+        Case("parse_subcommand x6", parse_all),
+        # Cold index: parses every map, as after a restart
+        Case("hypothesis index scan", lambda: HypothesisIndex(vault).maps(), 200),
+        Case("prompt recommend", recommend_prompt),
+        Case("prompt review", review_prompt),
+        Case(
+            "prompt ekg 20 turns",
+            lambda: build_ekg_continuation_prompt("business", history),
+        ),
+        Case(
+            "prompt process_daily",
+            lambda: processor.process_daily(today, incremental=False),
+            500,
+        ),
+        Case("commit_and_push", commit_and_push, 20),
+    ]
+
+
+def load_baseline(path: Path) -> dict[str, float]:
+    """Seconds per case from a baseline file (empty if missing)."""
+    try:
+        return json.loads(path.read_text())["results"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def save_baseline(path: Path, results: dict[str, float]) -> None:
+    """Write results with the machine they were measured on."""
+    path.write_text(
+        json.dumps(
+            {
+                "machine": platform.node(),
+                "python": platform.python_version(),
+                "recorded": datetime.now().isoformat(timespec="seconds"),
+                "results": results,
+            },
+            indent=2,
+            ensure_ascii=False,
+        )
+        + "\n"
+    )
+
+
+def _format_time(seconds: float) -> str:
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} µs"
+
+
+async def run_suite(args: argparse.Namespace) -> int:
+    """Generate vaults, time all cases, compare with the baseline.
+
+    Returns:
+        Number of regressions
+    """
+    baseline = load_baseline(args.baseline)
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="d-brain-bench-"))
+    results: dict[str, float] = {}
+    regressions = 0
+
+    print(f"{'case':<34} {'time':>10} {'baseline':>10} {'change':>8}")
+    try:
+        for years in args.years:
+            vault = workdir / f"vault-{years:g}y"
+            if not vault.exists():
+                started = time.perf_counter()
+                summary = generate_vault(vault, years=years, seed=args.seed)
+                print(
+                    f"# {years:g}y vault: {summary.entries} entries, "
+                    f"{summary.thoughts} thoughts, "
+                    f"{summary.attachments} attachments, "
+                    f"{summary.commits} commits, {summary.bytes / 2**20:.0f} MB "
+                    f"(generated in {time.perf_counter() - started:.1f}s)"
+                )
+
+            for case in await vault_cases(vault):
+                if args.filter and args.filter not in case.name:
+                    continue
+                name = f"{case.name} @{years:g}y"
+                seconds = await measure(case, args.min_time)
+                results[name] = seconds
+
+                line = f"{name:<34} {_format_time(seconds):>10}"
+                previous = baseline.get(name)
+                if previous:
+                    change = seconds / previous - 1
+                    line += f" {_format_time(previous):>10} {change:>+7.0%}"
+                    if change > args.threshold and seconds - previous > NOISE_FLOOR:
+                        line += "  REGRESSION"
+                        regressions += 1
+                print(line)
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, {**baseline, **results})
+        print(f"Baseline saved to {args.baseline}")
+    elif regressions:
+        print(
+            f"{regressions} regression(s) over {args.threshold:.0%} "
+            f"vs {args.baseline}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--years", type=float, nargs="+", default=[1, 3], help="Vault sizes"
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="Seconds to spend per case"
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Record results as baseline"
+    )
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        help="Keep generated vaults here and reuse them (default: temp dir)",
+    )
+    parser.add_argument("--filter", help="Only run cases containing this text")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sys.exit(1 if asyncio.run(run_suite(args)) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Generate a synthetic multi-year d-brain vault for benchmarks.
+
+Run: uv run python benchmarks/vault_gen.py /tmp/vault --years 3
+
+Writes daily notes in the bot's entry format, thoughts, attachments,
+hypothesis maps per hypothesis/_schema.md, goals and a stand-in processor
+skill, then commits the history month by month into a git repo with a
+bare `origin` remote next to it, so commits and pushes behave like on
+the server. The same seed always gives the same vault.
+"""
+
+import argparse
+import os
+import random
+import subprocess
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from d_brain.services.storage import VaultStorage
+
+THOUGHT_DIRS = ("ideas", "learnings", "projects", "reflections", "tasks")
+MSG_TYPES = ("[voice]", "[text]", "[text]", "[photo]", "[forward from: Канал]")
+
+_WORDS = (
+    "созвон проект клиент метрика задача идея гипотеза неделя отчёт команда "
+    "продажи конверсия бюджет встреча релиз спорт сон книга заметка план "
+    "энергия фокус привычка результат цель эксперимент"
+).split()
+
+
+@dataclass
+class VaultSummary:
+    """What generate_vault wrote."""
+
+    path: Path
+    days: int
+    entries: int
+    thoughts: int
+    attachments: int
+    maps: int
+    commits: int
+    bytes: int
+
+
+def _sentence(rnd: random.Random, words: int) -> str:
+    return " ".join(rnd.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _daily_content(rnd: random.Random, day: date, entries: int) -> str:
+    minutes = sorted(rnd.sample(range(7 * 60, 23 * 60), entries))
+    parts = []
+    for minute in minutes:
+        timestamp = datetime.combine(day, time(minute // 60, minute % 60))
+        text = " ".join(_sentence(rnd, rnd.randint(5, 25)) for _ in range(3))
+        parts.append(VaultStorage.format_entry(text, timestamp, rnd.choice(MSG_TYPES)))
+    return "".join(parts)
+
+
+def hypothesis_map(rnd: random.Random, index: int, domain: str, today: date) -> str:
+    """Hypothesis map markdown in the hypothesis/_schema.md format."""
+    updated = today - timedelta(days=rnd.randint(0, 60))
+    review = updated + timedelta(days=14)
+    lines = [
+        "---",
+        "type: hypothesis-map",
+        f"domain: {domain}",
+        "status: active",
+        f"created: {updated - timedelta(days=90)}",
+        f"updated: {updated}",
+        "review_cadence: biweekly",
+        f"next_review: {review}",
+        "---",
+        "",
+        f"# HM: Карта {index} — {_sentence(rnd, 3)}",
+        "",
+        "## Goal",
+        "",
+        f"**Outcome:** {_sentence(rnd, 8)}",
+        "",
+        "### Metrics",
+        "",
+        "| Type | Metric | Current | Target | Deadline |",
+        "|------|--------|---------|--------|----------|",
+        f"| Subjective | Удовлетворённость | 5 | 8 | {review} |",
+        f"| Objective | Клиенты в месяц | {rnd.randint(1, 20)} | 40 | {review} |",
+        "",
+        "## Hypotheses",
+        "",
+    ]
+    for h in range(1, rnd.randint(2, 6)):
+        status = rnd.choice(("idea", "testing", "validated", "invalidated"))
+        lines += [
+            f"### H{h}: {_sentence(rnd, 4)}",
+            "",
+            f"**Status:** {status}",
+            "",
+            f"**IF:** {_sentence(rnd, 6)}",
+            f"**THEN:** {_sentence(rnd, 6)}",
+            f"**BECAUSE:** {_sentence(rnd, 6)}",
+            "",
+            "**Evidence:**",
+            *(f"- [{rnd.choice(' x')}] {_sentence(rnd, 5)}" for _ in range(3)),
+            "",
+            "**Experiments:**",
+            "| # | Description | Start | End | Result |",
+            "|---|-------------|-------|-----|--------|",
+            f"| 1 | {_sentence(rnd, 4)} | {updated} | {review} | pending |",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def _git(vault: Path, *args: str, env: dict[str, str] | None = None) -> None:
+    subprocess.run(
+        ["git", *args],
+        cwd=vault,
+        env={**os.environ, **(env or {})},
+        check=True,
+        capture_output=True,
+    )
+
+
+def _commit(vault: Path, message: str, when: date) -> None:
+    stamp = f"{when.isoformat()}T21:00:00"
+    _git(vault, "add", "-A")
+    _git(
+        vault,
+        "commit",
+        "--quiet",
+        "-m",
+        message,
+        env={"GIT_AUTHOR_DATE": stamp, "GIT_COMMITTER_DATE": stamp},
+    )
+
+
+def generate_vault(
+    path: Path,
+    years: float = 3,
+    thoughts: int = 3000,
+    attachments: int = 2000,
+    maps: int = 30,
+    entries_per_day: tuple[int, int] = (3, 20),
+    git: bool = True,
+    seed: int = 0,
+    today: date | None = None,
+) -> VaultSummary:
+    """Write a synthetic vault ending today.
+
+    Args:
+        path: Vault directory (created; must not contain a vault yet)
+        years: Span of daily notes
+        thoughts: Notes spread over thoughts/ categories
+        attachments: Images spread over the days (2-64 KB of random bytes)
+        maps: Hypothesis maps
+        entries_per_day: Min and max entries in a daily note
+        git: Commit the history month by month and add a bare origin
+        seed: Random seed
+        today: Last day of the history
+
+    Returns:
+        Counts of what was written
+    """
+    rnd = random.Random(seed)
+    today = today or date.today()
+    path = Path(path)
+    days = max(1, int(years * 365))
+    start = today - timedelta(days=days - 1)
+
+    for name in ("daily", "attachments", "goals", "MOC", "summaries"):
+        (path / name).mkdir(parents=True, exist_ok=True)
+    for name in THOUGHT_DIRS:
+        (path / "thoughts" / name).mkdir(parents=True, exist_ok=True)
+    for name in ("business", "personal"):
+        (path / "hypothesis" / name).mkdir(parents=True, exist_ok=True)
+    (path / ".gitignore").write_text(".d-brain/\n")
+
+    # Static notes first; daily notes, thoughts and attachments go by month
+    for level in ("0-vision-3y", "1-yearly", "2-monthly", "3-weekly"):
+        body = "\n".join(f"- {_sentence(rnd, 8)}" for _ in range(10))
+        (path / "goals" / f"{level}.md").write_text(f"# {level}\n\n{body}\n")
+    # Stand-ins for the processor skill the prompts embed (~8 KB each)
+    skill_dir = path / ".claude" / "skills" / "dbrain-processor"
+    (skill_dir / "references").mkdir(parents=True, exist_ok=True)
+    for name in ("SKILL.md", "references/todoist.md"):
+        body = "\n".join(_sentence(rnd, 20) for _ in range(60))
+        (skill_dir / name).write_text(f"# {name}\n\n{body}\n")
+    for i in range(maps):
+        domain = rnd.choice(("business", "personal"))
+        (path / "hypothesis" / domain / f"hm-map-{i}.md").write_text(
+            hypothesis_map(rnd, i, domain, today)
+        )
+
+    thought_days = sorted(rnd.randrange(days) for _ in range(thoughts))
+    attachment_days = sorted(rnd.randrange(days) for _ in range(attachments))
+
+    if git:
+        _git(path, "init", "--quiet", "--initial-branch=main")
+        _git(path, "config", "user.name", "d-brain bench")
+        _git(path, "config", "user.email", "bench@example.com")
+        remote = path.with_name(path.name + ".origin.git")
+        subprocess.run(
+            ["git", "init", "--quiet", "--bare", str(remote)],
+            check=True,
+            capture_output=True,
+        )
+        _git(path, "remote", "add", "origin", str(remote))
+
+    entries = commits = 0
+    thought_i = attachment_i = 0
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        count = rnd.randint(*entries_per_day)
+        entries += count
+        (path / "daily" / f"{day.isoformat()}.md").write_text(
+            _daily_content(rnd, day, count), encoding="utf-8"
+        )
+
+        while thought_i < thoughts and thought_days[thought_i] == offset:
+            category = rnd.choice(THOUGHT_DIRS)
+            body = "\n\n".join(_sentence(rnd, 30) for _ in range(rnd.randint(2, 8)))
+            (path / "thoughts" / category / f"{day}-note-{thought_i}.md").write_text(
+                f"---\ndate: {day}\ntype: {category}\n---\n\n{body}\n"
+            )
+            thought_i += 1
+
+        while attachment_i < attachments and attachment_days[attachment_i] == offset:
+            storage_dir = path / "attachments" / day.isoformat()
+            storage_dir.mkdir(exist_ok=True)
+            data = rnd.randbytes(rnd.randint(2, 64) * 1024)
+            (storage_dir / f"img-{attachment_i:06d}.jpg").write_bytes(data)
+            attachment_i += 1
+
+        month_end = (day + timedelta(days=1)).month != day.month
+        if git and (month_end or day == today):
+            _commit(path, f"chore: vault {day:%Y-%m}", day)
+            commits += 1
+
+    if git:
+        _git(path, "push", "--quiet", "-u", "origin", "main")
+
+    total = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    return VaultSummary(
+        path=path,
+        days=days,
+        entries=entries,
+        thoughts=thoughts,
+        attachments=attachments,
+        maps=maps,
+        commits=commits,
+        bytes=total,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path, help="Vault directory to create")
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--thoughts", type=int, default=3000)
+    parser.add_argument("--attachments", type=int, default=2000)
+    parser.add_argument("--maps", type=int, default=30)
+    parser.add_argument("--no-git", action="store_true", help="Skip git history")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    summary = generate_vault(
+        args.path,
+        years=args.years,
+        thoughts=args.thoughts,
+        attachments=args.attachments,
+        maps=args.maps,
+        git=not args.no_git,
+        seed=args.seed,
+    )
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
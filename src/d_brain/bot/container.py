@@ -0,0 +1,181 @@
+"""Application-scoped services shared by all handlers."""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+
+import httpx
+
+from d_brain.bot.outbound import OutboundDispatcher
+from d_brain.bot.pager import ReportPager
+from d_brain.config import Settings
+from d_brain.services.attachments import AttachmentPipeline, get_attachment_pipeline
+from d_brain.services.claude_runner import ClaudeRunner, set_claude_runner
+from d_brain.services.git import VaultGit
+from d_brain.services.git_sync import GitSyncService, close_git_syncs, get_git_sync
+from d_brain.services.hypothesis_maps import HypothesisIndex
+from d_brain.services.jobs import JobRegistry
+from d_brain.services.journal import AppendJournal, close_journals, get_journal
+from d_brain.services.processor import ClaudeProcessor
+from d_brain.services.result_cache import ResultCache
+from d_brain.services.search import VaultIndex
+from d_brain.services.storage import VaultStorage
+from d_brain.services.transcript_cache import TranscriptCache
+from d_brain.services.transcription import (
+    TRANSCRIBERS,
+    DeepgramTranscriber,
+    RoutingTranscriber,
+    Transcriber,
+    WhisperTranscriber,
+)
+
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+HTTP_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=120.0,
+)
+
+
+def create_transcriber(settings: Settings, http: httpx.AsyncClient) -> Transcriber:
+    """Create transcription engine selected by settings.
+
+    Args:
+        settings: Application settings (TRANSCRIBER: deepgram, local or auto)
+        http: Shared HTTP client for Deepgram
+
+    Returns:
+        Transcriber; "auto" routes short notes to local Whisper and long
+        ones to Deepgram, using whichever is available if only one is
+    """
+    if settings.transcriber not in TRANSCRIBERS:
+        raise ValueError(f"Unknown transcriber: {settings.transcriber}")
+
+    deepgram = None
+    if settings.transcriber != "local" and settings.deepgram_api_key:
+        deepgram = DeepgramTranscriber(
+            settings.deepgram_api_key,
+            base_url=settings.deepgram_base_url,
+            http_client=http,
+        )
+
+    whisper = None
+    if settings.transcriber != "deepgram":
+        try:
+            whisper = WhisperTranscriber(
+                settings.whisper_model, workers=settings.whisper_workers
+            )
+        except RuntimeError as e:
+            if settings.transcriber == "local":
+                raise
+            logger.warning("Local transcription unavailable: %s", e)
+
+    if deepgram and whisper:
+        return RoutingTranscriber(whisper, deepgram, settings.local_max_duration)
+    if whisper:
+        return whisper
+    if deepgram:
+        return deepgram
+    raise ValueError("No transcriber available: set DEEPGRAM_API_KEY")
+
+
+@dataclass
+class AppContainer:
+    """Services built once in run_bot and injected into handlers.
+
+    Passed to the dispatcher as workflow data, so handlers receive it as a
+    `container` argument instead of re-reading settings and creating
+    clients per message.
+    """
+
+    settings: Settings
+    http: httpx.AsyncClient
+    transcriber: Transcriber
+    transcripts: TranscriptCache
+    storage: VaultStorage
+    journal: AppendJournal
+    attachments: AttachmentPipeline
+    git: VaultGit
+    git_sync: GitSyncService
+    runner: ClaudeRunner
+    processor: ClaudeProcessor
+    jobs: JobRegistry
+    results: ResultCache
+    search: VaultIndex
+    hypotheses: HypothesisIndex
+    pager: ReportPager
+    outbound: OutboundDispatcher
+
+    @classmethod
+    async def create(cls, settings: Settings) -> "AppContainer":
+        """Build and start all services.
+
+        Args:
+            settings: Application settings
+
+        Returns:
+            Ready container; call close() on shutdown
+        """
+        # Keep-alive pool: voice notes reuse the TLS connection to Deepgram
+        http = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+        transcriber = create_transcriber(settings, http)
+        logger.info("Transcriber: %s", transcriber.model)
+
+        # Capture login env and resolve Claude CLI once, before first request
+        runner = ClaudeRunner(max_workers=settings.claude_workers)
+        set_claude_runner(runner)
+        await runner.start()
+
+        journal = get_journal(settings.vault_path)
+        git_sync = get_git_sync(settings.vault_path, settings.git_backend)
+        logger.info("Git backend: %s", type(git_sync.git.backend).__name__)
+
+        # Index bot writes as they happen; catch up on edits made while down
+        search = VaultIndex(settings.vault_path)
+        journal.storage.write_hooks.append(search.index_file)
+        await asyncio.to_thread(search.reconcile)
+
+        # Drop cached Claude reports when the bot writes what they depend on
+        results = ResultCache(settings.vault_path, settings.result_cache_size)
+        journal.storage.write_hooks.append(results.invalidate)
+
+        return cls(
+            settings=settings,
+            http=http,
+            transcriber=transcriber,
+            transcripts=TranscriptCache(
+                settings.vault_path, settings.transcript_cache_size
+            ),
+            storage=journal.storage,
+            journal=journal,
+            attachments=get_attachment_pipeline(settings.vault_path),
+            git=git_sync.git,
+            git_sync=git_sync,
+            runner=runner,
+            processor=ClaudeProcessor(
+                settings.vault_path, settings.todoist_api_key, runner=runner
+            ),
+            jobs=JobRegistry(settings.vault_path),
+            results=results,
+            search=search,
+            hypotheses=HypothesisIndex(settings.vault_path),
+            pager=ReportPager(settings.report_paging, settings.report_cache_size),
+            outbound=OutboundDispatcher(
+                settings.telegram_global_rate, settings.telegram_chat_rate
+            ),
+        )
+
+    async def close(self) -> None:
+        """Stop jobs and workers, flush writes, commits and messages, close."""
+        await self.jobs.close()
+        await self.runner.stop()
+        await close_journals()
+        await close_git_syncs()
+        await self.http.aclose()
+        self.transcriber.close()
+        self.transcripts.close()
+        self.search.close()
+        self.results.close()
+        await self.outbound.close()
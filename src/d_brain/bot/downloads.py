@@ -0,0 +1,49 @@
+"""Download Telegram files into the vault attachment pipeline."""
+
+from datetime import datetime
+
+from aiogram import Bot
+
+from d_brain.services.attachments import AttachmentPipeline
+
+
+async def save_telegram_file(
+    bot: Bot,
+    pipeline: AttachmentPipeline,
+    file_id: str,
+    timestamp: datetime,
+    prefix: str,
+    extension: str | None = None,
+    default_extension: str = "bin",
+) -> str:
+    """Stream a Telegram file to disk and commit it as an attachment.
+
+    Args:
+        bot: Bot instance
+        pipeline: Attachment pipeline of the vault
+        file_id: Telegram file id
+        timestamp: Message timestamp (selects attachments/YYYY-MM-DD/)
+        prefix: Filename prefix by kind (img, video, doc)
+        extension: File extension; guessed from Telegram file path if omitted
+        default_extension: Used when the extension can't be guessed
+
+    Returns:
+        Relative path for Obsidian embed
+
+    Raises:
+        ValueError: If Telegram did not return a downloadable file path
+    """
+    file = await bot.get_file(file_id)
+    if not file.file_path:
+        raise ValueError("Telegram returned no file path")
+
+    if not extension:
+        extension = default_extension
+        if "." in file.file_path:
+            extension = file.file_path.rsplit(".", 1)[-1]
+
+    day = timestamp.date()
+    async with pipeline.incoming(day) as tmp_path:
+        # Path destination makes aiogram stream chunks to disk off the loop
+        await bot.download_file(file.file_path, destination=tmp_path)
+        return await pipeline.commit(tmp_path, day, prefix, extension)
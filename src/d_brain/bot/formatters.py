@@ -2,12 +2,162 @@
 
 import html
 import re
+from datetime import date
 from typing import Any
 
+from d_brain.services.hypothesis_maps import STALE_DAYS, HypothesisMap
+from d_brain.services.search import MARK_END, MARK_START, SearchHit
+
 
 # Allowed HTML tags in Telegram
 ALLOWED_TAGS = {"b", "i", "code", "pre", "a", "s", "u"}
 
+TELEGRAM_MAX_LENGTH = 4096
+ELLIPSIS = "..."
+
+# One token per match: a tag, a known entity or a lone special character.
+# Tag attributes stop at the next "<", so unclosed tags can't make the scan
+# quadratic.
+_TOKEN_RE = re.compile(
+    r"<(/?)([a-zA-Z]+)(?:\s[^<>]*)?>"
+    r"|&(?:amp|lt|gt|quot|#\d+|#x[0-9a-fA-F]+);"
+    r"|[<>&]"
+)
+_ESCAPES = {"<": "&lt;", ">": "&gt;", "&": "&amp;"}
+
+
+class _HtmlWriter:
+    """Output buffer of _render: open tags and where to cut on overflow."""
+
+    def __init__(self, max_length: int | None) -> None:
+        self.max_length = max_length
+        self.parts: list[str] = []
+        self.size = 0
+        self.stack: list[str] = []
+        self.open_counts: dict[str, int] = {}
+        self.closing = 0  # Length of the closing tags the stack needs
+        # Last point where ellipsis and closing tags fit: (parts, tail, tags)
+        self.cut: tuple[int, str, list[str]] | None = None
+        self.full = False  # Output can no longer fit max_length
+
+    def write(self, piece: str, closing_delta: int = 0, split: bool = False) -> None:
+        """Append piece; `split` allows cutting it (plain text only)."""
+        if self.max_length is not None and self.cut is None:
+            room = (
+                self.max_length
+                - len(ELLIPSIS)
+                - self.size
+                - self.closing
+                - closing_delta
+            )
+            if len(piece) > room:
+                tail = piece[: max(room, 0)] if split else ""
+                self.cut = (len(self.parts), tail, list(self.stack))
+
+        self.parts.append(piece)
+        self.size += len(piece)
+        self.closing += closing_delta
+        # size + closing never decreases, so the cut is final from here on
+        if self.max_length is not None and self.size + self.closing > self.max_length:
+            self.full = True
+
+    def open(self, name: str, tag: str) -> None:
+        """Write opening tag."""
+        self.write(tag, closing_delta=len(name) + 3)
+        self.stack.append(name)
+        self.open_counts[name] = self.open_counts.get(name, 0) + 1
+
+    def close(self) -> None:
+        """Write closing tag for the innermost open tag."""
+        name = self.stack.pop()
+        self.open_counts[name] -= 1
+        self.write(f"</{name}>", closing_delta=-(len(name) + 3))
+
+    def result(self) -> str:
+        """Output with open tags closed, cut with ellipsis if too long."""
+        if not self.full:
+            return "".join(self.parts) + _closing_tags(self.stack)
+        count, tail, stack = self.cut or (0, "", [])
+        return "".join(self.parts[:count]) + tail + ELLIPSIS + _closing_tags(stack)
+
+
+def _closing_tags(stack: list[str]) -> str:
+    """Closing tags for open tags, innermost first."""
+    return "".join(f"</{name}>" for name in reversed(stack))
+
+
+def _render(text: str, max_length: int | None) -> tuple[str, bool]:
+    """Sanitize, balance and truncate Telegram HTML in one pass.
+
+    Allowed tags are kept, anything else that looks like markup is
+    escaped. Closing a tag also closes tags opened inside it; stray closing
+    tags are dropped and tags left open are closed at the end. Scanning
+    stops as soon as the output is known to exceed max_length.
+
+    Args:
+        text: Raw HTML text
+        max_length: Output length limit, None for no limit
+
+    Returns:
+        (html, balanced); balanced is False if tags had to be repaired
+    """
+    writer = _HtmlWriter(max_length)
+    balanced = True
+    pos = 0
+
+    while not writer.full:
+        match = _TOKEN_RE.search(text, pos)
+        if match is None:
+            if pos < len(text):
+                writer.write(text[pos:], split=True)
+            break
+
+        if match.start() > pos:
+            writer.write(text[pos : match.start()], split=True)
+            if writer.full:
+                break
+        pos = match.end()
+
+        token, name = match.group(0), match.group(2)
+        if name is None:
+            writer.write(_ESCAPES.get(token, token))
+            continue
+
+        name = name.lower()
+        if name not in ALLOWED_TAGS:
+            # Escape "<" and rescan the rest of the tag as text
+            writer.write("&lt;")
+            pos = match.start() + 1
+        elif not match.group(1):
+            writer.open(name, token)
+        elif writer.open_counts.get(name):
+            while writer.stack[-1] != name:
+                balanced = False
+                writer.close()
+            writer.close()
+        else:
+            balanced = False
+
+    return writer.result(), balanced and not writer.stack
+
+
+def render_telegram_html(text: str, max_length: int = TELEGRAM_MAX_LENGTH) -> str:
+    """Make Claude output safe to send with parse_mode=HTML.
+
+    Sanitizes, repairs tag nesting and truncates at a tag boundary in a
+    single linear pass; see benchmarks/bench_formatters.py.
+
+    Args:
+        text: Raw HTML text from Claude
+        max_length: Maximum length (Telegram limit is 4096)
+
+    Returns:
+        Balanced HTML with only Telegram-supported tags
+    """
+    if not text:
+        return ""
+    return _render(text, max_length)[0]
+
 
 def sanitize_telegram_html(text: str) -> str:
     """Sanitize HTML for Telegram, keeping only allowed tags.
@@ -18,54 +168,11 @@ def sanitize_telegram_html(text: str) -> str:
         text: Raw HTML text from Claude
 
     Returns:
-        Sanitized HTML safe for Telegram
+        Sanitized HTML safe for Telegram, with tags balanced
     """
     if not text:
         return ""
-
-    # First, escape any raw < > that are not part of tags
-    # This regex matches < or > not followed/preceded by tag patterns
-    result = []
-    i = 0
-    while i < len(text):
-        if text[i] == "<":
-            # Check if this looks like a valid tag
-            tag_match = re.match(r"</?([a-zA-Z]+)(?:\s[^>]*)?>", text[i:])
-            if tag_match:
-                tag_name = tag_match.group(1).lower()
-                if tag_name in ALLOWED_TAGS:
-                    # Keep the allowed tag
-                    result.append(tag_match.group(0))
-                    i += len(tag_match.group(0))
-                    continue
-                else:
-                    # Escape disallowed tag
-                    result.append("&lt;")
-                    i += 1
-                    continue
-            else:
-                # Not a valid tag pattern, escape
-                result.append("&lt;")
-                i += 1
-                continue
-        elif text[i] == ">":
-            # Standalone > should be escaped
-            result.append("&gt;")
-            i += 1
-        elif text[i] == "&":
-            # Check if already escaped
-            entity_match = re.match(r"&(amp|lt|gt|quot|#\d+|#x[0-9a-fA-F]+);", text[i:])
-            if entity_match:
-                result.append(entity_match.group(0))
-                i += len(entity_match.group(0))
-            else:
-                result.append("&amp;")
-                i += 1
-        else:
-            result.append(text[i])
-            i += 1
-
-    return "".join(result)
+    return _render(text, None)[0]
 
 
 def validate_telegram_html(text: str) -> bool:
@@ -77,27 +184,10 @@ def validate_telegram_html(text: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    tag_stack = []
-    tag_pattern = re.compile(r"<(/?)([a-zA-Z]+)(?:\s[^>]*)?>")
+    return _render(text, None)[1]
 
-    for match in tag_pattern.finditer(text):
-        is_closing = match.group(1) == "/"
-        tag_name = match.group(2).lower()
-
-        if tag_name not in ALLOWED_TAGS:
-            continue
 
-        if is_closing:
-            if not tag_stack or tag_stack[-1] != tag_name:
-                return False
-            tag_stack.pop()
-        else:
-            tag_stack.append(tag_name)
-
-    return len(tag_stack) == 0
-
-
-def truncate_html(text: str, max_length: int = 4096) -> str:
+def truncate_html(text: str, max_length: int = TELEGRAM_MAX_LENGTH) -> str:
     """Truncate HTML text while keeping tags balanced.
 
     Args:
@@ -107,49 +197,186 @@ def truncate_html(text: str, max_length: int = 4096) -> str:
     Returns:
         Truncated text with balanced tags
     """
-    if len(text) <= max_length:
-        return text
-
-    # Find a safe cut point
-    cut_point = max_length - 50  # Leave room for closing tags and ellipsis
-
-    # Don't cut in the middle of a tag
-    last_open = text.rfind("<", 0, cut_point)
-    last_close = text.rfind(">", 0, cut_point)
-
-    if last_open > last_close:
-        # We're in the middle of a tag, cut before it
-        cut_point = last_open
-
-    truncated = text[:cut_point]
-
-    # Close any open tags
-    tag_pattern = re.compile(r"<(/?)([a-zA-Z]+)(?:\s[^>]*)?>")
-    open_tags = []
-
-    for match in tag_pattern.finditer(truncated):
-        is_closing = match.group(1) == "/"
-        tag_name = match.group(2).lower()
+    return render_telegram_html(text, max_length)
+
+
+class _PageSplitter:
+    """Pack balanced HTML tokens into pages, reopening tags across breaks."""
+
+    def __init__(self, page_length: int) -> None:
+        self.page_length = page_length
+        self.pages: list[str] = []
+        self.parts: list[str] = []
+        self.start = 0  # Index of the first part after reopened tags
+        self.visible = False  # Page has text, not just tags
+        self.size = 0
+        self.stack: list[tuple[str, str]] = []  # (name, opening tag)
+        self.closing = 0
+        # Just after the last newline on this page: (parts, size, open tags)
+        self.line_break: tuple[int, int, list[tuple[str, str]]] | None = None
+
+    def text(self, piece: str) -> None:
+        """Add plain text, splitting it across pages if needed."""
+        while piece:
+            room = self.page_length - self.size - self.closing
+            if len(piece) <= room:
+                self._append_text(piece)
+                return
+
+            cut = piece.rfind("\n", 0, room) + 1 if room > 0 else 0
+            if not cut and self._break_at_line():
+                continue
+            if not cut and room > 0:
+                cut = piece.rfind(" ", 0, room) + 1 or room
+            if not cut and not self._has_content():
+                cut = 1  # Reopened tags alone overflow; make progress anyway
+            if cut:
+                self._append_text(piece[:cut])
+                piece = piece[cut:]
+            self._flush(self.stack)
+
+    def token(self, piece: str, name: str | None = None, closing: bool = False) -> None:
+        """Add a tag or entity, which can't be split."""
+        delta = 0
+        if name is not None:
+            delta = -(len(name) + 3) if closing else len(name) + 3
+        if not self._fits(len(piece) + delta):
+            self._break_at_line()
+            if not self._fits(len(piece) + delta) and self._has_content():
+                self._flush(self.stack)
+
+        self.parts.append(piece)
+        self.size += len(piece)
+        self.closing += delta
+        if name is None:
+            self.visible = True
+        elif closing:
+            self.stack.pop()
+        else:
+            self.stack.append((name, piece))
+
+    def finish(self) -> list[str]:
+        """Flush the last page and return all pages."""
+        if self._has_content():
+            self._flush(self.stack)
+        return self.pages
+
+    def _fits(self, length: int) -> bool:
+        return self.size + length + self.closing <= self.page_length
+
+    def _has_content(self) -> bool:
+        return self.visible
+
+    def _append_text(self, piece: str) -> None:
+        newline = piece.rfind("\n") + 1
+        if newline:
+            self._add_text(piece[:newline])
+            if self.visible:
+                self.line_break = (len(self.parts), self.size, list(self.stack))
+            piece = piece[newline:]
+        if piece:
+            self._add_text(piece)
+
+    def _add_text(self, piece: str) -> None:
+        self.parts.append(piece)
+        self.size += len(piece)
+        if not self.visible and not piece.isspace():
+            self.visible = True
+
+    def _break_at_line(self) -> bool:
+        """End the page at its last newline if that keeps it half full."""
+        if self.line_break is None:
+            return False
+        index, size, stack = self.line_break
+        if size < self.page_length // 2 or index <= self.start:
+            return False
+
+        carry = self.parts[index:]
+        del self.parts[index:]
+        self._flush(stack)
+        self.parts.extend(carry)
+        self.size += sum(len(part) for part in carry)
+        # Text parts never start with "<" once sanitized
+        self.visible = any(
+            not part.startswith("<") and not part.isspace() for part in carry
+        )
+        return True
+
+    def _flush(self, stack: list[tuple[str, str]]) -> None:
+        """End the page, closing `stack`, and start the next reopening it.
+
+        Pages with only tags and whitespace are dropped (Telegram rejects
+        them as empty).
+        """
+        if self.visible:
+            names = [name for name, _ in stack]
+            self.pages.append("".join(self.parts) + _closing_tags(names))
+        reopen = "".join(tag for _, tag in stack)
+        self.parts = [reopen] if reopen else []
+        self.start = len(self.parts)
+        self.visible = False
+        self.size = len(reopen)
+        self.line_break = None
+
+
+def paginate_html(text: str, page_length: int = TELEGRAM_MAX_LENGTH) -> list[str]:
+    """Split HTML into Telegram-sized pages with balanced tags.
+
+    The text is sanitized first. Tags open at a page break are closed at
+    the end of the page and reopened at the start of the next one. Pages
+    end at a newline when one falls in their second half, else at a space.
 
-        if tag_name not in ALLOWED_TAGS:
-            continue
+    Args:
+        text: Raw HTML text from Claude
+        page_length: Maximum page length (Telegram limit is 4096)
 
-        if is_closing and open_tags and open_tags[-1] == tag_name:
-            open_tags.pop()
-        elif not is_closing:
-            open_tags.append(tag_name)
+    Returns:
+        Pages in order; empty list for empty text
+    """
+    html_text = sanitize_telegram_html(text)
+    if len(html_text) <= page_length:
+        return [html_text] if html_text else []
+
+    splitter = _PageSplitter(page_length)
+    pos = 0
+    # Sanitized text only has allowed, properly nested tags
+    for match in _TOKEN_RE.finditer(html_text):
+        if match.start() > pos:
+            splitter.text(html_text[pos : match.start()])
+        pos = match.end()
+        name = match.group(2)
+        splitter.token(
+            match.group(0),
+            name.lower() if name else None,
+            closing=bool(match.group(1)),
+        )
+    if pos < len(html_text):
+        splitter.text(html_text[pos:])
+    return splitter.finish()
+
+
+def format_report_pages(report: dict[str, Any], footer: str = "") -> list[str]:
+    """Format processing report as one or more Telegram pages.
 
-    # Add closing tags in reverse order
-    closing_tags = "".join(f"</{tag}>" for tag in reversed(open_tags))
+    Args:
+        report: Processing report from ClaudeProcessor
+        footer: HTML appended after the report (ends up on the last page)
 
-    return truncated + "..." + closing_tags
+    Returns:
+        Pages of balanced Telegram HTML, at least one
+    """
+    if "error" in report:
+        return [format_process_report(report) + footer]
+    pages = paginate_html(report.get("report", "") + footer)
+    return pages or ["✅ <b>Обработка завершена</b>"]
 
 
 def format_process_report(report: dict[str, Any]) -> str:
     """Format processing report for Telegram HTML.
 
     The report from Claude is expected to be in HTML format.
-    We sanitize it to ensure only Telegram-safe tags are used.
+    We sanitize it to ensure only Telegram-safe tags are used, repair
+    unbalanced tags and fit it into one message.
 
     Args:
         report: Processing report from ClaudeProcessor
@@ -162,20 +389,26 @@ def format_process_report(report: dict[str, Any]) -> str:
         return f"❌ <b>Ошибка:</b> {error_msg}"
 
     if "report" in report:
-        raw_report = report["report"]
+        return render_telegram_html(report["report"])
 
-        # Sanitize HTML, keeping allowed tags
-        sanitized = sanitize_telegram_html(raw_report)
+    return "✅ <b>Обработка завершена</b>"
 
-        # Validate tag balance
-        if not validate_telegram_html(sanitized):
-            # Fall back to plain text if tags are broken
-            return html.escape(raw_report)
 
-        # Truncate if too long
-        return truncate_html(sanitized, max_length=4096)
+def format_partial_report(header: str, partial: str, max_length: int = 4096) -> str:
+    """Format in-progress status with a preview of partial Claude output.
 
-    return "✅ <b>Обработка завершена</b>"
+    Args:
+        header: Status line, e.g. "⏳ Processing... (1m 30s)"
+        partial: Latest partial output from Claude
+
+    Returns:
+        Formatted HTML message for Telegram
+    """
+    if not partial:
+        return header
+
+    preview = render_telegram_html(partial, max_length - len(header) - 2)
+    return f"{header}\n\n{preview}"
 
 
 def format_error(error: str) -> str:
@@ -200,3 +433,104 @@ def format_empty_daily() -> str:
         "📭 <b>Нет записей для обработки</b>\n\n"
         "<i>Добавьте голосовые сообщения или текст в течение дня</i>"
     )
+
+
+def format_search_results(query: str, hits: list[SearchHit]) -> str:
+    """Format search hits for Telegram HTML.
+
+    Args:
+        query: User query as typed
+        hits: Ranked hits from VaultIndex
+
+    Returns:
+        Formatted HTML message with highlighted snippets
+    """
+    if not hits:
+        return f"🔎 Ничего не найдено: <i>{html.escape(query)}</i>"
+
+    lines = [f"🔎 <b>{html.escape(query)}</b> — {len(hits)}\n"]
+    for hit in hits:
+        snippet = " ".join(html.escape(hit.snippet).split())
+        snippet = snippet.replace(MARK_START, "<b>").replace(MARK_END, "</b>")
+        lines.append(
+            f"• <b>{html.escape(hit.title)}</b>\n"
+            f"<code>{html.escape(hit.path)}</code>\n"
+            f"{snippet}\n"
+        )
+
+    return truncate_html("\n".join(lines), max_length=4096)
+
+
+def format_hypothesis_dashboard(maps: list[HypothesisMap], today: date) -> str:
+    """Format hypothesis maps overview for Telegram HTML.
+
+    Args:
+        maps: Parsed maps from HypothesisIndex
+        today: Reference date for overdue and stale checks
+
+    Returns:
+        Formatted HTML dashboard
+    """
+    lines = ["🗺️ <b>Hypothesis Maps Dashboard</b>"]
+    active = [hm for hm in maps if hm.status == "active"]
+    paused = [hm for hm in maps if hm.status == "paused"]
+    archived = [hm for hm in maps if hm.status == "archived"]
+
+    if not maps:
+        lines.append("\nКарт пока нет.")
+
+    if active:
+        lines.append("\n<b>📊 Active Maps:</b>")
+    for domain in sorted({hm.domain for hm in active}):
+        lines.append(f"\n<b>{html.escape(domain.capitalize())}:</b>")
+        for hm in (hm for hm in active if hm.domain == domain):
+            lines.append(f"• <b>{html.escape(hm.title)}</b>")
+            goal = hm.outcome
+            metric = hm.key_metric
+            if metric:
+                goal += f" ({metric.name}: {metric.current} → {metric.target})"
+            if goal:
+                lines.append(f"  Goal: {html.escape(goal.strip())}")
+            lines.append(
+                f"  Hypotheses: {hm.count('testing')}🧪 "
+                f"{hm.count('validated')}✅ {hm.count('invalidated')}❌"
+                + (f" {hm.count('idea')}💡" if hm.count("idea") else "")
+            )
+            if hm.next_review:
+                lines.append(f"  Next review: {hm.next_review}")
+
+    if paused:
+        lines.append("\n<b>⏸️ Paused Maps:</b>")
+        for hm in paused:
+            since = ""
+            if hm.updated:
+                since = f" — paused {(today - hm.updated).days} days ago"
+            lines.append(f"• {html.escape(hm.title)}{since}")
+
+    if archived:
+        lines.append(f"\n🗄 Archived: {len(archived)}")
+
+    attention = []
+    for hm in active:
+        if hm.is_overdue(today):
+            days = (today - hm.next_review).days if hm.next_review else 0
+            attention.append(
+                f"• Review overdue: <b>{html.escape(hm.title)}</b> ({days} d)"
+            )
+        for h in hm.stale_hypotheses(today):
+            attention.append(
+                f"• Stale {STALE_DAYS}+ days: {html.escape(hm.title)} — "
+                f"{h.code} {html.escape(h.name)}"
+            )
+    if attention:
+        lines.append("\n<b>⚠️ Attention Needed:</b>")
+        lines.extend(attention)
+
+    lines.append(
+        "\n<b>Commands:</b>\n"
+        "<code>/hypothesis recommend</code>\n"
+        "<code>/hypothesis new business</code>\n"
+        "<code>/hypothesis new personal</code>\n"
+        "<code>/hypothesis review name</code>"
+    )
+    return truncate_html("\n".join(lines), max_length=4096)
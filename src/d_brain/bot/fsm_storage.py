@@ -0,0 +1,243 @@
+"""Disk-backed FSM storage: SQLite (WAL) with TTL and a write-through cache."""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Mapping
+from copy import copy
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from d_brain.services.storage import STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 72 * 3600  # Seconds an untouched conversation is kept
+DEFAULT_CACHE_SIZE = 256  # Keys kept in memory
+COMPRESS_MIN = 1024  # zlib-compress data JSON from this many bytes
+PURGE_INTERVAL = 3600.0  # Seconds between expired-row sweeps
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fsm (
+    key TEXT PRIMARY KEY,
+    state TEXT,
+    data BLOB NOT NULL,
+    compressed INTEGER NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fsm_expires ON fsm (expires);
+"""
+
+
+@dataclass
+class _Record:
+    """State and data of one storage key."""
+
+    state: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+    expires: float = 0.0
+
+    @property
+    def empty(self) -> bool:
+        return self.state is None and not self.data
+
+
+def _key_id(key: StorageKey) -> str:
+    """Row key for a StorageKey."""
+    return ":".join(
+        str(part) if part is not None else ""
+        for part in (
+            key.bot_id,
+            key.chat_id,
+            key.user_id,
+            key.thread_id,
+            key.business_connection_id,
+            key.destiny,
+        )
+    )
+
+
+def _encode(data: dict[str, Any]) -> tuple[bytes, bool]:
+    """Compact JSON, zlib-compressed when large."""
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+    if len(raw) >= COMPRESS_MIN:
+        return zlib.compress(raw), True
+    return raw, False
+
+
+def _decode(blob: bytes, compressed: bool) -> dict[str, Any]:
+    return json.loads(zlib.decompress(blob) if compressed else blob)
+
+
+class SqliteStorage(BaseStorage):
+    """FSM storage in .d-brain/fsm.sqlite3 that survives restarts.
+
+    Keeps /do wait states and EKG session history across bot restarts.
+    Conversations not written for `ttl` seconds expire and are swept from
+    disk. Recently used keys stay in an LRU cache of `cache_size` entries;
+    writes update the cache and go straight to disk (write-through), so
+    reads of hot keys never touch SQLite. The cache assumes this is the
+    only writer: one bot process per vault (see run_webhook's lock), and
+    the timer scripts don't use FSM storage. Data is stored as compact
+    JSON, compressed when large. Data must be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        vault_path: Path,
+        ttl: float = DEFAULT_TTL,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        self.db_path = Path(vault_path) / STATE_DIR / "fsm.sqlite3"
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, _Record] = OrderedDict()
+        self._lock = threading.Lock()
+        self._write_lock = asyncio.Lock()  # Keeps disk writes in call order
+        self._conn: sqlite3.Connection | None = None
+        self._last_purge = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open database on first use."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._load(key)
+        state = state.state if isinstance(state, State) else state
+        await self._store(key, replace(record, state=state))
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return (await self._load(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            msg = f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            raise DataNotDictLikeError(msg)
+        record = await self._load(key)
+        await self._store(key, replace(record, data=data.copy()))
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        return (await self._load(key)).data.copy()
+
+    async def get_value(
+        self, storage_key: StorageKey, dict_key: str, default: Any | None = None
+    ) -> Any | None:
+        data = (await self._load(storage_key)).data
+        return copy(data.get(dict_key, default))
+
+    async def close(self) -> None:
+        """Close database connection (idempotent)."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        self._cache.clear()
+
+    async def _load(self, key: StorageKey) -> _Record:
+        """Get record from cache or disk; expired records read as empty."""
+        key_id = _key_id(key)
+        record = self._cache.get(key_id)
+        if record is None:
+            loaded = await asyncio.to_thread(self._read, key_id)
+            # A write may have cached a newer record while we were reading
+            record = self._cache.get(key_id)
+            if record is None:
+                record = loaded
+                self._remember(key_id, record)
+        else:
+            self._cache.move_to_end(key_id)
+
+        if not record.empty and record.expires < time.time():
+            logger.info("FSM state expired for %s", key_id)
+            record = _Record()
+            self._remember(key_id, record)
+        return record
+
+    async def _store(self, key: StorageKey, record: _Record) -> None:
+        """Write record through the cache to disk.
+
+        Raises:
+            TypeError: If data is not JSON-serializable; nothing is cached
+        """
+        key_id = _key_id(key)
+        record.expires = time.time() + self.ttl
+        blob, compressed = _encode(record.data)
+        self._remember(key_id, record)
+        try:
+            async with self._write_lock:
+                await asyncio.to_thread(
+                    self._write, key_id, record.state, blob, compressed, record.expires
+                )
+        except BaseException:
+            # Disk didn't take it; don't serve it from memory either
+            if self._cache.get(key_id) is record:
+                del self._cache[key_id]
+            raise
+
+    def _remember(self, key_id: str, record: _Record) -> None:
+        """Put record in the LRU cache, evicting the coldest beyond the bound."""
+        self._cache[key_id] = record
+        self._cache.move_to_end(key_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _read(self, key_id: str) -> _Record:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT state, data, compressed, expires FROM fsm WHERE key = ?",
+                    (key_id,),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return _Record()
+        state, blob, compressed, expires = row
+        try:
+            return _Record(state, _decode(blob, compressed), expires)
+        except (zlib.error, ValueError) as e:
+            logger.warning("Dropping unreadable FSM record %s: %s", key_id, e)
+            return _Record()
+
+    def _write(
+        self,
+        key_id: str,
+        state: str | None,
+        blob: bytes,
+        compressed: bool,
+        expires: float,
+    ) -> None:
+        with self._lock, self._connect() as conn:
+            if state is None and blob == b"{}":
+                conn.execute("DELETE FROM fsm WHERE key = ?", (key_id,))
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO fsm VALUES (?, ?, ?, ?, ?)",
+                    (key_id, state, blob, compressed, expires),
+                )
+
+            now = time.time()
+            if now - self._last_purge > PURGE_INTERVAL:
+                self._last_purge = now
+                purged = conn.execute(
+                    "DELETE FROM fsm WHERE expires < ?", (now,)
+                ).rowcount
+                if purged:
+                    logger.info("Purged %d expired FSM records", purged)
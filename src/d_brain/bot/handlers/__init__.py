@@ -4,10 +4,12 @@ from d_brain.bot.handlers import (
     buttons,
     commands,
     do,
+    document,
     forward,
     hypothesis,
     photo,
     process,
+    search,
     text,
     voice,
     weekly,
@@ -17,10 +19,12 @@ __all__ = [
     "buttons",
     "commands",
     "do",
+    "document",
     "forward",
     "hypothesis",
     "photo",
     "process",
+    "search",
     "text",
     "voice",
     "weekly",
@@ -4,33 +4,34 @@ from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
 
+from d_brain.bot.container import AppContainer
 from d_brain.bot.states import DoCommandState
 
 router = Router(name="buttons")
 
 
 @router.message(F.text == "📊 Статус")
-async def btn_status(message: Message) -> None:
+async def btn_status(message: Message, container: AppContainer) -> None:
     """Handle Status button."""
     from d_brain.bot.handlers.commands import cmd_status
 
-    await cmd_status(message)
+    await cmd_status(message, container)
 
 
 @router.message(F.text == "⚙️ Обработать")
-async def btn_process(message: Message) -> None:
+async def btn_process(message: Message, container: AppContainer) -> None:
     """Handle Process button."""
     from d_brain.bot.handlers.process import cmd_process
 
-    await cmd_process(message)
+    await cmd_process(message, container)
 
 
 @router.message(F.text == "📅 Неделя")
-async def btn_weekly(message: Message) -> None:
+async def btn_weekly(message: Message, container: AppContainer) -> None:
     """Handle Weekly button."""
     from d_brain.bot.handlers.weekly import cmd_weekly
 
-    await cmd_weekly(message)
+    await cmd_weekly(message, container)
 
 
 @router.message(F.text == "✨ Запрос")
@@ -1,14 +1,14 @@
 """Command handlers for /start, /help, /status."""
 
+import asyncio
 from datetime import date
 
 from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message
 
+from d_brain.bot.container import AppContainer
 from d_brain.bot.keyboards import get_main_keyboard
-from d_brain.config import get_settings
-from d_brain.services.storage import VaultStorage
 
 router = Router(name="commands")
 
@@ -22,12 +22,14 @@ async def cmd_start(message: Message) -> None:
         "🎤 Голосовые сообщения\n"
         "💬 Текст\n"
         "📷 Фото\n"
+        "📎 Документы и видео\n"
         "↩️ Пересланные сообщения\n\n"
         "Всё будет сохранено и обработано.\n\n"
         "<b>Команды:</b>\n"
         "/status - статус сегодняшнего дня\n"
         "/process - обработать записи\n"
         "/do - выполнить произвольный запрос\n"
+        "/search - поиск по заметкам\n"
         "/weekly - недельный дайджест\n"
         "/help - справка",
         reply_markup=get_main_keyboard(),
@@ -41,47 +43,41 @@ async def cmd_help(message: Message) -> None:
         "<b>Как использовать d-brain:</b>\n\n"
         "1. Отправь голосовое — я транскрибирую и сохраню\n"
         "2. Отправь текст — сохраню как есть\n"
-        "3. Отправь фото — сохраню в attachments\n"
+        "3. Отправь фото, видео или файл — сохраню в attachments\n"
         "4. Перешли сообщение — сохраню с источником\n\n"
         "Вечером используй /process для обработки:\n"
         "Мысли → Obsidian, Задачи → Todoist\n\n"
         "<b>Команды:</b>\n"
         "/status - сколько записей сегодня\n"
-        "/process - обработать записи\n"
+        "/process - обработать новые записи\n"
+        "/process full - обработать весь день заново\n"
         "/do - выполнить произвольный запрос\n"
+        "/search - поиск по daily, thoughts, summaries, hypothesis\n"
         "/weekly - недельный дайджест\n\n"
         "<i>Пример: /do перенеси просроченные задачи на понедельник</i>"
     )
 
 
 @router.message(Command("status"))
-async def cmd_status(message: Message) -> None:
+async def cmd_status(message: Message, container: AppContainer) -> None:
     """Handle /status command."""
-    settings = get_settings()
-    storage = VaultStorage(settings.vault_path)
-
     today = date.today()
-    content = storage.read_daily(today)
+    stats = await asyncio.to_thread(container.storage.daily_stats, today)
 
-    if not content:
+    if not stats.total:
         await message.answer(f"📅 <b>{today}</b>\n\nЗаписей пока нет.")
         return
 
-    lines = content.strip().split("\n")
-    entries = [line for line in lines if line.startswith("## ")]
-
-    voice_count = sum(1 for e in entries if "[voice]" in e)
-    text_count = sum(1 for e in entries if "[text]" in e)
-    photo_count = sum(1 for e in entries if "[photo]" in e)
-    forward_count = sum(1 for e in entries if "[forward from:" in e)
-
-    total = len(entries)
+    counts = stats.counts
+    files_count = counts.get("document", 0) + counts.get("video", 0)
 
     await message.answer(
         f"📅 <b>{today}</b>\n\n"
-        f"Всего записей: <b>{total}</b>\n"
-        f"- 🎤 Голосовых: {voice_count}\n"
-        f"- 💬 Текстовых: {text_count}\n"
-        f"- 📷 Фото: {photo_count}\n"
-        f"- ↩️ Пересланных: {forward_count}"
+        f"Всего записей: <b>{stats.total}</b>\n"
+        f"- 🎤 Голосовых: {counts.get('voice', 0)}\n"
+        f"- 💬 Текстовых: {counts.get('text', 0)}\n"
+        f"- 📷 Фото: {counts.get('photo', 0)}\n"
+        f"- ↩️ Пересланных: {counts.get('forward', 0)}\n"
+        f"- 📎 Файлов: {files_count}\n\n"
+        f"🕐 {stats.first}–{stats.last}, {stats.bytes / 1024:.1f} КБ"
     )
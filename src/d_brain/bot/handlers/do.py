@@ -1,6 +1,5 @@
 """Handler for /do command - arbitrary Claude requests."""
 
-import asyncio
 import logging
 
 from aiogram import Bot, Router
@@ -8,22 +7,27 @@ from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
 
-from d_brain.bot.formatters import format_process_report
+from d_brain.bot.container import AppContainer
+from d_brain.bot.formatters import format_report_pages
+from d_brain.bot.progress import ProgressReporter
 from d_brain.bot.states import DoCommandState
-from d_brain.config import get_settings
-from d_brain.services.processor import ClaudeProcessor
-from d_brain.services.transcription import DeepgramTranscriber
+from d_brain.bot.transcripts import transcribe_voice
 
 router = Router(name="do")
 logger = logging.getLogger(__name__)
 
 
 @router.message(Command("do"))
-async def cmd_do(message: Message, command: CommandObject, state: FSMContext) -> None:
+async def cmd_do(
+    message: Message,
+    command: CommandObject,
+    state: FSMContext,
+    container: AppContainer,
+) -> None:
     """Handle /do command."""
     # Check for inline text: /do move overdue tasks
     if command.args:
-        await process_request(message, command.args)
+        await process_request(message, command.args, container)
         return
 
     # Otherwise, wait for next message
@@ -35,7 +39,9 @@ async def cmd_do(message: Message, command: CommandObject, state: FSMContext) ->
 
 
 @router.message(DoCommandState.waiting_for_input)
-async def handle_do_input(message: Message, bot: Bot, state: FSMContext) -> None:
+async def handle_do_input(
+    message: Message, bot: Bot, state: FSMContext, container: AppContainer
+) -> None:
     """Handle voice/text input after /do command."""
     await state.clear()  # Clear state immediately
 
@@ -44,22 +50,11 @@ async def handle_do_input(message: Message, bot: Bot, state: FSMContext) -> None
     # Handle voice input
     if message.voice:
         await message.chat.do(action="typing")
-        settings = get_settings()
-        transcriber = DeepgramTranscriber(settings.deepgram_api_key)
-
         try:
-            file = await bot.get_file(message.voice.file_id)
-            if not file.file_path:
-                await message.answer("❌ Не удалось скачать голосовое")
-                return
-
-            file_bytes = await bot.download_file(file.file_path)
-            if not file_bytes:
-                await message.answer("❌ Не удалось скачать голосовое")
-                return
-
-            audio_bytes = file_bytes.read()
-            prompt = await transcriber.transcribe(audio_bytes)
+            prompt = await transcribe_voice(bot, message.voice, container)
+        except ValueError:
+            await message.answer("❌ Не удалось скачать голосовое")
+            return
         except Exception as e:
             logger.exception("Failed to transcribe voice for /do")
             await message.answer(f"❌ Не удалось транскрибировать: {e}")
@@ -80,40 +75,22 @@ async def handle_do_input(message: Message, bot: Bot, state: FSMContext) -> None
         await message.answer("❌ Отправь текст или голосовое сообщение")
         return
 
-    await process_request(message, prompt)
+    await process_request(message, prompt, container)
 
 
-async def process_request(message: Message, prompt: str) -> None:
+async def process_request(
+    message: Message, prompt: str, container: AppContainer
+) -> None:
     """Process the user's request with Claude."""
     status_msg = await message.answer("⏳ Выполняю...")
 
-    settings = get_settings()
-    processor = ClaudeProcessor(settings.vault_path, settings.todoist_api_key)
-
-    async def run_with_progress() -> dict:
-        task = asyncio.create_task(
-            asyncio.to_thread(processor.execute_prompt, prompt)
+    progress = ProgressReporter(status_msg, "⏳ Выполняю...")
+    report = await progress.run(
+        container.processor.execute_prompt(
+            prompt,
+            user_key=str(message.chat.id),
+            on_partial=progress.on_partial,
         )
+    )
 
-        elapsed = 0
-        while not task.done():
-            await asyncio.sleep(30)
-            elapsed += 30
-            if not task.done():
-                try:
-                    await status_msg.edit_text(
-                        f"⏳ Выполняю... ({elapsed // 60}m {elapsed % 60}s)"
-                    )
-                except Exception:
-                    pass
-
-        return await task
-
-    report = await run_with_progress()
-
-    formatted = format_process_report(report)
-    try:
-        await status_msg.edit_text(formatted)
-    except Exception:
-        # Fallback: send without HTML parsing
-        await status_msg.edit_text(formatted, parse_mode=None)
+    await container.pager.send(status_msg, format_report_pages(report))
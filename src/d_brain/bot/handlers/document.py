@@ -0,0 +1,74 @@
+"""Document and video message handler."""
+
+import logging
+from datetime import datetime
+
+from aiogram import Bot, Router
+from aiogram.types import Message
+
+from d_brain.bot.container import AppContainer
+from d_brain.bot.downloads import save_telegram_file
+
+router = Router(name="document")
+logger = logging.getLogger(__name__)
+
+
+def _extension(file_name: str | None) -> str | None:
+    """Get extension from original file name."""
+    if file_name and "." in file_name:
+        return file_name.rsplit(".", 1)[-1].lower()
+    return None
+
+
+@router.message(lambda m: m.document is not None or m.video is not None)
+async def handle_document(message: Message, bot: Bot, container: AppContainer) -> None:
+    """Handle documents and videos."""
+    if not message.from_user:
+        return
+
+    if message.video:
+        file_id = message.video.file_id
+        file_name = message.video.file_name
+        prefix, msg_type, default_extension = "video", "[video]", "mp4"
+    elif message.document:
+        file_id = message.document.file_id
+        file_name = message.document.file_name
+        prefix, msg_type, default_extension = "doc", "[document]", "bin"
+    else:
+        return
+
+    try:
+        timestamp = datetime.fromtimestamp(message.date.timestamp())
+
+        try:
+            relative_path = await save_telegram_file(
+                bot,
+                container.attachments,
+                file_id,
+                timestamp,
+                prefix=prefix,
+                extension=_extension(file_name),
+                default_extension=default_extension,
+            )
+        except ValueError:
+            await message.answer("Failed to download file")
+            return
+
+        # Videos and PDFs render inline in Obsidian, other files as links
+        content = f"![[{relative_path}]]"
+        if message.document and not relative_path.endswith(".pdf"):
+            content = f"[[{relative_path}|{file_name or relative_path}]]"
+        # Picked up by the next batched commit without scanning attachments/
+        container.git_sync.track([relative_path])
+
+        if message.caption:
+            content += f"\n\n{message.caption}"
+
+        await container.journal.append(content, timestamp, msg_type)
+
+        await message.answer("📎 ✓ Сохранено")
+        logger.info("%s saved: %s", msg_type, relative_path)
+
+    except Exception as e:
+        logger.exception("Error processing %s", msg_type)
+        await message.answer(f"Error: {e}")
@@ -6,22 +6,18 @@ from datetime import datetime
 from aiogram import Router
 from aiogram.types import Message
 
-from d_brain.config import get_settings
-from d_brain.services.storage import VaultStorage
+from d_brain.bot.container import AppContainer
 
 router = Router(name="forward")
 logger = logging.getLogger(__name__)
 
 
 @router.message(lambda m: m.forward_origin is not None)
-async def handle_forward(message: Message) -> None:
+async def handle_forward(message: Message, container: AppContainer) -> None:
     """Handle forwarded messages."""
     if not message.from_user:
         return
 
-    settings = get_settings()
-    storage = VaultStorage(settings.vault_path)
-
     # Determine source name
     source_name = "Unknown"
     origin = message.forward_origin
@@ -41,7 +37,7 @@ async def handle_forward(message: Message) -> None:
     msg_type = f"[forward from: {source_name}]"
 
     timestamp = datetime.fromtimestamp(message.date.timestamp())
-    storage.append_to_daily(content, timestamp, msg_type)
+    await container.journal.append(content, timestamp, msg_type)
 
     await message.answer(f"✓ Сохранено (от {source_name})")
     logger.info("Forwarded message saved from: %s", source_name)
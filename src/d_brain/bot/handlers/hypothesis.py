@@ -2,7 +2,9 @@
 
 import asyncio
 import logging
+import uuid
 from dataclasses import dataclass
+from datetime import date
 from enum import Enum
 
 from aiogram import Bot, Router
@@ -11,11 +13,14 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import Message
 
-from d_brain.bot.formatters import format_process_report
-from d_brain.config import get_settings
-from d_brain.services.git import VaultGit
-from d_brain.services.processor import ClaudeProcessor
-from d_brain.services.transcription import DeepgramTranscriber
+from d_brain.bot.container import AppContainer
+from d_brain.bot.formatters import format_hypothesis_dashboard, format_report_pages
+from d_brain.bot.progress import ProgressReporter
+from d_brain.bot.transcripts import transcribe_voice
+from d_brain.services.git_sync import CLAUDE_WRITE_PATHS
+from d_brain.services.hypothesis_maps import summarize_maps
+from d_brain.services.processor import ClaudeProcessor, PartialCallback
+from d_brain.services.prompts import PromptBuilder, PromptTemplate, html_output
 
 router = Router(name="hypothesis")
 logger = logging.getLogger(__name__)
@@ -25,6 +30,7 @@ class HypothesisSubcommand(Enum):
     """Supported hypothesis subcommands."""
 
     DASHBOARD = "dashboard"
+    RECOMMEND = "recommend"
     NEW = "new"
     REVIEW = "review"
     VALIDATE = "validate"
@@ -50,6 +56,7 @@ def parse_subcommand(args: str | None) -> ParsedCommand:
 
     Examples:
         None or "" -> dashboard
+        "recommend" -> recommendations from Claude
         "new business" -> new with domain=business
         "new personal" -> new with domain=personal
         "review consulting-growth" -> review with name=consulting-growth
@@ -61,6 +68,9 @@ def parse_subcommand(args: str | None) -> ParsedCommand:
     parts = args.strip().split(maxsplit=1)
     cmd = parts[0].lower()
 
+    if cmd == "recommend":
+        return ParsedCommand(subcommand=HypothesisSubcommand.RECOMMEND)
+
     if cmd == "new":
         domain = parts[1] if len(parts) > 1 else "business"
         if domain not in ("business", "personal"):
@@ -79,70 +89,38 @@ def parse_subcommand(args: str | None) -> ParsedCommand:
     return ParsedCommand(subcommand=HypothesisSubcommand.DASHBOARD)
 
 
-def build_hypothesis_prompt(parsed: ParsedCommand) -> str:
-    """Build Claude prompt based on parsed subcommand.
-
-    Uses hypothesis-manager agent instructions for all operations.
-    """
-    base_context = """Ты - hypothesis-manager agent для управления hypothesis maps.
+_HYPOTHESIS_CONTEXT = """Ты - hypothesis-manager agent для управления hypothesis maps.
 
 CONTEXT:
 - Hypothesis maps находятся в vault/hypothesis/
 - Schema в vault/hypothesis/_schema.md
 - Правила в vault/.claude/rules/hypothesis-format.md
-- Agent инструкции в vault/.claude/agents/hypothesis-manager.md
+- Agent инструкции в vault/.claude/agents/hypothesis-manager.md"""
 
-CRITICAL OUTPUT FORMAT:
-- Return ONLY raw HTML for Telegram (parse_mode=HTML)
-- NO markdown: no **, no ##, no ```, no tables
-- Allowed tags: <b>, <i>, <code>, <s>, <u>
-- Be concise - Telegram has 4096 char limit
-"""
+_RECOMMEND_TASK = PromptTemplate("""TASK: Дай рекомендации по hypothesis maps.
 
-    if parsed.subcommand == HypothesisSubcommand.DASHBOARD:
-        return f"""{base_context}
-
-TASK: Сгенерируй dashboard всех hypothesis maps.
+Сводка карт (собрана локально из frontmatter и секций):
+{overview}
 
 WORKFLOW:
-1. Read vault/hypothesis/business/*.md (where status: active)
-2. Read vault/hypothesis/personal/*.md (where status: active)
-3. Read vault/hypothesis/archive/*.md for archived count
-4. Extract from each: status, goal, metrics, hypothesis counts
-5. Generate HTML dashboard
+1. Use the overview above; open only the maps you need details from
+2. Apply Red Path prioritization across active maps
+3. Address overdue reviews and stale hypotheses
+4. Suggest next experiments for hypotheses in testing
 
 OUTPUT FORMAT:
-🗺️ <b>Hypothesis Maps Dashboard</b>
-
-<b>📊 Active Maps:</b>
-
-<b>Business:</b>
-• <b>map_name</b>
-  Goal: outcome (current → target)
-  Hypotheses: N🧪 M✅ K❌
-  Next review: date
-
-<b>Personal:</b>
-• ...
+💡 <b>Рекомендации по hypothesis maps</b>
 
-<b>⏸️ Paused Maps:</b>
-• map_name — paused N days ago
+<b>🔴 Red Path (Focus):</b>
+→ map_name / hypothesis_name: next_action
 
-<b>⚠️ Attention Needed:</b>
-• Overdue reviews
-• Stale hypotheses (14+ days)
+<b>⚠️ Attention:</b>
+• issue — what to do
 
-<b>Commands:</b>
-<code>/hypothesis new business</code>
-<code>/hypothesis new personal</code>
-<code>/hypothesis review name</code>
-"""
+<b>🧪 Next Experiments:</b>
+• hypothesis — experiment""")
 
-    elif parsed.subcommand == HypothesisSubcommand.NEW:
-        domain = parsed.domain or "business"
-        return f"""{base_context}
-
-TASK: Начни создание нового hypothesis map для domain={domain}.
+_NEW_TASK = PromptTemplate("""TASK: Начни создание нового hypothesis map для domain={domain}.
 
 Используй EKG технику (Express Map 20-30 min):
 
@@ -166,14 +144,9 @@ OUTPUT:
 
 <i>Отправь описание цели следующим сообщением</i>
 
-<b>Tip:</b> Goal Shaking — если достигнем в 10x больше, это всё ещё то, чего хочешь?
-"""
+<b>Tip:</b> Goal Shaking — если достигнем в 10x больше, это всё ещё то, чего хочешь?""")
 
-    elif parsed.subcommand == HypothesisSubcommand.REVIEW:
-        name = parsed.name or ""
-        return f"""{base_context}
-
-TASK: Сгенерируй review для hypothesis map "{name}".
+_REVIEW_TASK = PromptTemplate("""TASK: Сгенерируй review для hypothesis map "{name}".
 
 WORKFLOW:
 1. Find hypothesis map by name (search in business/ and personal/)
@@ -217,14 +190,9 @@ Recommendation: ...
 • recommendation_1
 • recommendation_2
 
-<b>📅 Next Review:</b> date
-"""
-
-    elif parsed.subcommand == HypothesisSubcommand.VALIDATE:
-        name = parsed.name or ""
-        return f"""{base_context}
+<b>📅 Next Review:</b> date""")
 
-TASK: Validate hypothesis map "{name}" for errors.
+_VALIDATE_TASK = PromptTemplate("""TASK: Validate hypothesis map "{name}" for errors.
 
 WORKFLOW:
 1. Find and read hypothesis map
@@ -261,40 +229,87 @@ OUTPUT FORMAT:
 
 <b>Actions:</b>
 • Fix N errors before proceeding
-• Review M warnings
-"""
+• Review M warnings""")
 
-    return parsed.subcommand.value
 
+def build_hypothesis_prompt(parsed: ParsedCommand, overview: str = "") -> str:
+    """Build Claude prompt based on parsed subcommand.
 
-async def call_claude_processor(prompt: str) -> dict:
+    Uses hypothesis-manager agent instructions for all operations. The
+    dashboard is rendered locally and has no prompt.
+
+    Args:
+        parsed: Parsed subcommand
+        overview: Local summary of all maps (for recommend)
+    """
+    builder = PromptBuilder(f"hypothesis_{parsed.subcommand.value}")
+    builder.add("context", _HYPOTHESIS_CONTEXT)
+    builder.add("output_format", html_output())
+
+    if parsed.subcommand == HypothesisSubcommand.RECOMMEND:
+        builder.add("task", _RECOMMEND_TASK.render(overview=overview or "(нет карт)"))
+    elif parsed.subcommand == HypothesisSubcommand.NEW:
+        builder.add("task", _NEW_TASK.render(domain=parsed.domain or "business"))
+    elif parsed.subcommand == HypothesisSubcommand.REVIEW:
+        builder.add("task", _REVIEW_TASK.render(name=parsed.name or ""))
+    elif parsed.subcommand == HypothesisSubcommand.VALIDATE:
+        builder.add("task", _VALIDATE_TASK.render(name=parsed.name or ""))
+    else:
+        return parsed.subcommand.value
+
+    return builder.build().text
+
+
+async def call_claude_processor(
+    processor: ClaudeProcessor,
+    prompt: str,
+    user_key: str,
+    on_partial: PartialCallback | None = None,
+    session_id: str | None = None,
+    resume: bool = False,
+) -> dict:
     """Call Claude processor with hypothesis prompt.
 
+    Args:
+        processor: Claude processor
+        prompt: Full prompt, or just the next message when resuming
+        user_key: Fairness key for the Claude runner queue
+        on_partial: Receives partial output while Claude is running
+        session_id: Claude session to start (or continue, with resume)
+        resume: Continue session_id instead of starting it
+
     Returns:
         Report dict with 'report' or 'error' key
     """
-    settings = get_settings()
-    processor = ClaudeProcessor(settings.vault_path, settings.todoist_api_key)
+    if session_id and resume:
+        return await processor.continue_session(
+            session_id, prompt, user_key=user_key, on_partial=on_partial
+        )
+    return await processor.execute_prompt(
+        prompt, user_key=user_key, on_partial=on_partial, session_id=session_id
+    )
 
-    return await asyncio.to_thread(processor.execute_prompt, prompt)
 
-
-def format_response_for_telegram(report: dict) -> str:
+def format_response_for_telegram(report: dict, footer: str = "") -> list[str]:
     """Format Claude response for Telegram.
 
-    Uses the standard format_process_report formatter.
+    Uses the standard format_report_pages formatter.
     """
-    return format_process_report(report)
+    return format_report_pages(report, footer)
 
 
 @router.message(Command("hypothesis"))
 async def hypothesis_command_handler(
-    message: Message, command: CommandObject, state: FSMContext
+    message: Message,
+    command: CommandObject,
+    state: FSMContext,
+    container: AppContainer,
 ) -> None:
     """Handle /hypothesis command with subcommands.
 
     Subcommands:
-        /hypothesis - Show dashboard
+        /hypothesis - Show dashboard (rendered locally, no Claude call)
+        /hypothesis recommend - Red Path recommendations from Claude
         /hypothesis new {domain} - Create new map (business/personal)
         /hypothesis review {name} - Review specific map
         /hypothesis validate {name} - Validate map for errors
@@ -314,41 +329,71 @@ async def hypothesis_command_handler(
 
         status_msg = await message.answer("⏳ Запускаю EKG сессию...")
 
-        # Call Claude to start the EKG session
+        # Call Claude to start the EKG session; later turns resume it
+        session_id = str(uuid.uuid4())
         prompt = build_ekg_start_prompt(domain)
-        report = await run_claude_with_progress(prompt, status_msg, "⏳ Запускаю EKG сессию...")
-
-        # Store Claude's first message in history
+        report = await run_claude_with_progress(
+            container.processor,
+            prompt,
+            status_msg,
+            "⏳ Запускаю EKG сессию...",
+            session_id=session_id,
+        )
+
+        # Store Claude's first message in history (replayed if resume fails)
         report_text = report.get("report", "")
-        await state.update_data(history=[{"role": "assistant", "content": report_text}])
+        await state.update_data(
+            history=[{"role": "assistant", "content": report_text}],
+            session_id=session_id if "report" in report else None,
+        )
+
+        pages = format_response_for_telegram(
+            report, footer="\n\n<i>Для отмены: /cancel</i>"
+        )
+        await container.pager.send(status_msg, pages)
+        return
 
-        formatted = format_response_for_telegram(report)
-        try:
-            await status_msg.edit_text(formatted + "\n\n<i>Для отмены: /cancel</i>")
-        except Exception:
-            await status_msg.edit_text(formatted, parse_mode=None)
+    if parsed.subcommand == HypothesisSubcommand.DASHBOARD:
+        maps = await container.hypotheses.maps()
+        await message.answer(format_hypothesis_dashboard(maps, date.today()))
         return
 
     # Build appropriate prompt
-    prompt = build_hypothesis_prompt(parsed)
+    overview = ""
+    if parsed.subcommand == HypothesisSubcommand.RECOMMEND:
+        overview = summarize_maps(await container.hypotheses.maps(), date.today())
+    prompt = build_hypothesis_prompt(parsed, overview)
 
     # Show progress message
     status_messages = {
-        HypothesisSubcommand.DASHBOARD: "⏳ Загружаю hypothesis maps...",
+        HypothesisSubcommand.RECOMMEND: "⏳ Готовлю рекомендации...",
         HypothesisSubcommand.REVIEW: "⏳ Анализирую hypothesis map...",
         HypothesisSubcommand.VALIDATE: "⏳ Проверяю hypothesis map...",
     }
     status_msg = await message.answer(status_messages.get(parsed.subcommand, "⏳ Processing..."))
 
-    report = await run_claude_with_progress(prompt, status_msg, status_messages.get(parsed.subcommand, "⏳ Processing..."))
+    # Read-only: reuse today's report while hypothesis/ and goals/ are unchanged
+    # (the date is part of the key: reviews judge deadlines against today)
+    cache_key, cached = await container.results.lookup(f"{date.today()}\n{prompt}")
+    if cached is not None:
+        pages = format_response_for_telegram(
+            {"report": cached},
+            footer="\n\n<i>♻️ Карты не менялись — отчёт из кэша</i>",
+        )
+        await container.pager.send(status_msg, pages)
+        return
+
+    report = await run_claude_with_progress(
+        container.processor,
+        prompt,
+        status_msg,
+        status_messages.get(parsed.subcommand, "⏳ Processing..."),
+    )
+    if "error" not in report:
+        await container.results.put(cache_key, report.get("report", ""))
 
     # Format and send response
-    formatted = format_response_for_telegram(report)
-    try:
-        await status_msg.edit_text(formatted)
-    except Exception:
-        # Fallback: send without HTML parsing
-        await status_msg.edit_text(formatted, parse_mode=None)
+    await container.pager.send(status_msg, format_response_for_telegram(report))
 
 
 @router.message(Command("cancel"))
@@ -364,29 +409,20 @@ async def cancel_handler(message: Message, state: FSMContext) -> None:
 
 
 @router.message(HypothesisState.ekg_session)
-async def handle_ekg_input(message: Message, bot: Bot, state: FSMContext) -> None:
+async def handle_ekg_input(
+    message: Message, bot: Bot, state: FSMContext, container: AppContainer
+) -> None:
     """Handle user input during EKG session - Claude drives the conversation."""
     user_input = None
 
     # Handle voice input
     if message.voice:
         await message.chat.do(action="typing")
-        settings = get_settings()
-        transcriber = DeepgramTranscriber(settings.deepgram_api_key)
-
         try:
-            file = await bot.get_file(message.voice.file_id)
-            if not file.file_path:
-                await message.answer("❌ Не удалось скачать голосовое")
-                return
-
-            file_bytes = await bot.download_file(file.file_path)
-            if not file_bytes:
-                await message.answer("❌ Не удалось скачать голосовое")
-                return
-
-            audio_bytes = file_bytes.read()
-            user_input = await transcriber.transcribe(audio_bytes)
+            user_input = await transcribe_voice(bot, message.voice, container)
+        except ValueError:
+            await message.answer("❌ Не удалось скачать голосовое")
+            return
         except Exception as e:
             logger.exception("Failed to transcribe voice in EKG session")
             await message.answer(f"❌ Не удалось транскрибировать: {e}")
@@ -411,6 +447,7 @@ async def handle_ekg_input(message: Message, bot: Bot, state: FSMContext) -> Non
     data = await state.get_data()
     domain = data.get("domain", "business")
     history = data.get("history", [])
+    session_id = data.get("session_id")
 
     # Add user message to history
     history.append({"role": "user", "content": user_input})
@@ -418,10 +455,38 @@ async def handle_ekg_input(message: Message, bot: Bot, state: FSMContext) -> Non
 
     status_msg = await message.answer("⏳ Анализирую...")
 
-    # Build prompt with full conversation history
-    prompt = build_ekg_continuation_prompt(domain, history)
-
-    report = await run_claude_with_progress(prompt, status_msg, "⏳ Анализирую...")
+    report = None
+    if session_id:
+        # Claude already has the instructions and earlier turns
+        report = await run_claude_with_progress(
+            container.processor,
+            build_ekg_turn_prompt(user_input),
+            status_msg,
+            "⏳ Анализирую...",
+            session_id=session_id,
+            resume=True,
+        )
+        if "error" in report:
+            logger.warning(
+                "Could not resume EKG session %s, replaying transcript: %s",
+                session_id,
+                report["error"],
+            )
+            report = None
+
+    if report is None:
+        # Replay full conversation history in a new session
+        session_id = str(uuid.uuid4())
+        report = await run_claude_with_progress(
+            container.processor,
+            build_ekg_continuation_prompt(domain, history),
+            status_msg,
+            "⏳ Анализирую...",
+            session_id=session_id,
+        )
+        await state.update_data(
+            session_id=session_id if "report" in report else None
+        )
 
     # Check if Claude created the file (session complete)
     report_text = report.get("report", "")
@@ -430,45 +495,42 @@ async def handle_ekg_input(message: Message, bot: Bot, state: FSMContext) -> Non
     if session_complete:
         await state.clear()
         # Commit changes
-        settings = get_settings()
-        git = VaultGit(settings.vault_path)
-        try:
-            await asyncio.to_thread(git.commit_and_push, "feat: create hypothesis map via EKG")
-        except Exception as e:
-            logger.warning("Failed to commit hypothesis map: %s", e)
+        container.git_sync.request_commit(
+            "feat: create hypothesis map via EKG", CLAUDE_WRITE_PATHS
+        )
+        await asyncio.to_thread(container.results.invalidate, *CLAUDE_WRITE_PATHS)
     else:
         # Add Claude response to history for next turn
         history.append({"role": "assistant", "content": report_text})
         await state.update_data(history=history)
 
     # Format and send response
-    formatted = format_response_for_telegram(report)
-    try:
-        await status_msg.edit_text(formatted)
-    except Exception:
-        await status_msg.edit_text(formatted, parse_mode=None)
+    await container.pager.send(status_msg, format_response_for_telegram(report))
 
 
-async def run_claude_with_progress(prompt: str, status_msg: Message, status_text: str) -> dict:
+async def run_claude_with_progress(
+    processor: ClaudeProcessor,
+    prompt: str,
+    status_msg: Message,
+    status_text: str,
+    session_id: str | None = None,
+    resume: bool = False,
+) -> dict:
     """Run Claude processor with progress updates."""
-    task = asyncio.create_task(call_claude_processor(prompt))
-
-    elapsed = 0
-    while not task.done():
-        await asyncio.sleep(30)
-        elapsed += 30
-        if not task.done():
-            try:
-                await status_msg.edit_text(f"{status_text} ({elapsed // 60}m {elapsed % 60}s)")
-            except Exception:
-                pass
-
-    return await task
+    progress = ProgressReporter(status_msg, status_text)
+    return await progress.run(
+        call_claude_processor(
+            processor,
+            prompt,
+            user_key=str(status_msg.chat.id),
+            on_partial=progress.on_partial,
+            session_id=session_id,
+            resume=resume,
+        )
+    )
 
 
-def build_ekg_start_prompt(domain: str) -> str:
-    """Build Claude prompt to start EKG session as authentic facilitator."""
-    return f"""Ты — фасилитатор ЭКГ (Экспресс Карта Гипотез) по методологии hypothesismapping.com.
+_EKG_START = PromptTemplate("""Ты — фасилитатор ЭКГ (Экспресс Карта Гипотез) по методологии hypothesismapping.com.
 
 РОЛЬ ФАСИЛИТАТОРА:
 - Ты НЕ эксперт, ты методист — следишь за форматом, не даёшь советов по содержанию
@@ -513,30 +575,21 @@ def build_ekg_start_prompt(domain: str) -> str:
 - Никакого markdown: **, ##, ```
 - Лаконично — это чат, не документ
 - Один вопрос за раз
-- Когда карта готова — создай файл и напиши [EKG_COMPLETE]
+- Когда карта готова — создай файл vault/hypothesis/{domain}/hm-<slug>.md
+  по _schema.md, обнови vault/MOC/MOC-hypotheses.md, покажи краткое
+  summary карты и напиши [EKG_COMPLETE]
+- Дальше я буду присылать только новые ответы клиента
 
 НАЧНИ СЕССИЮ:
 Поприветствуй, объясни что будем делать за 20-30 минут.
 Спроси про ЦЕЛЬ — что хочет изменить/достичь.
-Не давай примеров сразу — сначала послушай клиента.
-"""
-
-
-def build_ekg_continuation_prompt(domain: str, history: list[dict]) -> str:
-    """Build Claude prompt to continue EKG session as authentic facilitator."""
-    history_text = "\n".join([
-        f"{'КЛИЕНТ' if msg['role'] == 'user' else 'ФАСИЛИТАТОР'}: {msg['content']}"
-        for msg in history
-    ])
+Не давай примеров сразу — сначала послушай клиента.""")
 
-    return f"""Ты — фасилитатор ЭКГ, продолжаешь сессию.
+_EKG_ROLE = """Ты — фасилитатор ЭКГ, продолжаешь сессию.
 
-РОЛЬ: Методист, не эксперт. Следишь за форматом, ловишь ошибки, помогаешь структурировать.
+РОЛЬ: Методист, не эксперт. Следишь за форматом, ловишь ошибки, помогаешь структурировать."""
 
-ИСТОРИЯ ДИАЛОГА:
-{history_text}
-
-КОНТЕКСТ:
+_EKG_CONTINUE = PromptTemplate("""КОНТЕКСТ:
 - Domain: {domain}
 - Читай vault/hypothesis/_schema.md для формата файла
 - Читай vault/goals/ для связи с целями клиента
@@ -573,5 +626,34 @@ def build_ekg_continuation_prompt(domain: str, history: list[dict]) -> str:
 ФОРМАТ:
 - HTML: <b>, <i>, <code> — никакого markdown
 - Один вопрос/действие за раз
-- Лаконично, это чат
-"""
+- Лаконично, это чат""")
+
+
+def build_ekg_start_prompt(domain: str) -> str:
+    """Build Claude prompt to start EKG session as authentic facilitator."""
+    builder = PromptBuilder("ekg_start")
+    builder.add("facilitator", _EKG_START.render(domain=domain))
+    return builder.build().text
+
+
+def build_ekg_turn_prompt(user_input: str) -> str:
+    """Build next message of a resumed EKG session: the client's answer only."""
+    return f"КЛИЕНТ: {user_input}"
+
+
+def build_ekg_continuation_prompt(domain: str, history: list[dict]) -> str:
+    """Build Claude prompt to continue EKG session as authentic facilitator.
+
+    Replays the whole conversation; used when the Claude session can't be
+    resumed.
+    """
+    history_text = "\n".join([
+        f"{'КЛИЕНТ' if msg['role'] == 'user' else 'ФАСИЛИТАТОР'}: {msg['content']}"
+        for msg in history
+    ])
+
+    builder = PromptBuilder("ekg_continue")
+    builder.add("role", _EKG_ROLE)
+    builder.add("history", f"ИСТОРИЯ ДИАЛОГА:\n{history_text}")
+    builder.add("instructions", _EKG_CONTINUE.render(domain=domain))
+    return builder.build().text
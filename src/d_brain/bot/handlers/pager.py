@@ -0,0 +1,23 @@
+"""Inline pager buttons for multi-page reports."""
+
+from aiogram import Router
+from aiogram.types import CallbackQuery, Message
+
+from d_brain.bot.container import AppContainer
+from d_brain.bot.keyboards import PageCallback
+
+router = Router(name="pager")
+
+
+@router.callback_query(PageCallback.filter())
+async def show_page(
+    callback: CallbackQuery, callback_data: PageCallback, container: AppContainer
+) -> None:
+    """Flip a report page by editing the pager message."""
+    shown = isinstance(callback.message, Message) and await container.pager.show(
+        callback.message, callback_data.key, callback_data.page
+    )
+    if not shown:
+        await callback.answer("Отчёт устарел, запусти команду заново", show_alert=True)
+        return
+    await callback.answer()
@@ -3,63 +3,67 @@
 import asyncio
 import logging
 from datetime import date
+from typing import Any
 
 from aiogram import Router
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.types import Message
 
-from d_brain.bot.formatters import format_process_report
-from d_brain.config import get_settings
-from d_brain.services.git import VaultGit
-from d_brain.services.processor import ClaudeProcessor
+from d_brain.bot.container import AppContainer
+from d_brain.bot.formatters import format_report_pages
+from d_brain.bot.progress import ProgressReporter
+from d_brain.services.git_sync import CLAUDE_WRITE_PATHS
+from d_brain.services.jobs import PartialCallback
 
 router = Router(name="process")
 logger = logging.getLogger(__name__)
 
 
 @router.message(Command("process"))
-async def cmd_process(message: Message) -> None:
-    """Handle /process command - trigger Claude processing."""
-    user_id = message.from_user.id if message.from_user else "unknown"
-    logger.info("Process command triggered by user %s", user_id)
+async def cmd_process(
+    message: Message,
+    container: AppContainer,
+    command: CommandObject | None = None,
+) -> None:
+    """Handle /process command - trigger Claude processing.
 
-    status_msg = await message.answer("⏳ Processing... (may take up to 10 min)")
+    `/process full` reprocesses the whole day, ignoring the watermark.
+    """
+    user_id = message.from_user.id if message.from_user else "unknown"
+    full = bool(command and command.args and command.args.strip() == "full")
+    logger.info("Process command triggered by user %s (full=%s)", user_id, full)
 
-    settings = get_settings()
-    processor = ClaudeProcessor(settings.vault_path, settings.todoist_api_key)
-    git = VaultGit(settings.vault_path)
+    today = date.today()
+    if container.jobs.running("process", today.isoformat()):
+        # Another /process or the nightly timer is on it: share its result
+        status_text = "⏳ Обработка уже идёт, жду результат..."
+    else:
+        status_text = "⏳ Processing..."
+    status_msg = await message.answer(status_text)
 
-    # Run subprocess in thread to avoid blocking event loop
-    async def process_with_progress() -> dict:
-        task = asyncio.create_task(
-            asyncio.to_thread(processor.process_daily, date.today())
+    async def process(on_partial: PartialCallback) -> dict[str, Any]:
+        report = await container.processor.process_daily(
+            today,
+            user_key=str(message.chat.id),
+            on_partial=on_partial,
+            incremental=not full,
         )
+        # Commit and push changes (once per run, not per attached request)
+        if "error" not in report and report.get("processed_entries"):
+            container.git_sync.request_commit(
+                f"chore: process daily {today.isoformat()}", CLAUDE_WRITE_PATHS
+            )
+            await asyncio.to_thread(
+                container.results.invalidate, *CLAUDE_WRITE_PATHS
+            )
+        return report
 
-        elapsed = 0
-        while not task.done():
-            await asyncio.sleep(30)
-            elapsed += 30
-            if not task.done():
-                try:
-                    await status_msg.edit_text(
-                        f"⏳ Processing... ({elapsed // 60}m {elapsed % 60}s)"
-                    )
-                except Exception:
-                    pass  # Ignore edit errors
-
-        return await task
-
-    report = await process_with_progress()
-
-    # Commit and push changes
-    if "error" not in report:
-        today = date.today().isoformat()
-        await asyncio.to_thread(git.commit_and_push, f"chore: process daily {today}")
+    progress = ProgressReporter(status_msg, status_text)
+    report = await progress.run(
+        container.jobs.run(
+            "process", today.isoformat(), process, on_partial=progress.on_partial
+        )
+    )
 
     # Format and send report
-    formatted = format_process_report(report)
-    try:
-        await status_msg.edit_text(formatted)
-    except Exception:
-        # Fallback: send without HTML parsing
-        await status_msg.edit_text(formatted, parse_mode=None)
+    await container.pager.send(status_msg, format_report_pages(report))
@@ -0,0 +1,36 @@
+"""Handler for /search command - full-text search over the vault."""
+
+import logging
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from d_brain.bot.container import AppContainer
+from d_brain.bot.formatters import format_search_results
+
+router = Router(name="search")
+logger = logging.getLogger(__name__)
+
+MAX_RESULTS = 8
+
+
+@router.message(Command("search"))
+async def cmd_search(
+    message: Message, command: CommandObject, container: AppContainer
+) -> None:
+    """Handle /search command: ranked snippets from the vault index."""
+    query = (command.args or "").strip()
+    if not query:
+        await message.answer(
+            "🔎 <b>Поиск по vault</b>\n\n"
+            "<code>/search запрос</code>\n"
+            "Фильтры: <code>type:</code> <code>status:</code> "
+            "<code>domain:</code> <code>tag:</code>\n\n"
+            "<i>Пример: /search отток клиентов type:hypothesis-map</i>"
+        )
+        return
+
+    hits = await container.search.search(query, limit=MAX_RESULTS)
+    logger.info("Search %r: %d hits", query, len(hits))
+    await message.answer(format_search_results(query, hits))
@@ -1,51 +1,69 @@
 """Voice message handler."""
 
+import html
 import logging
 from datetime import datetime
 
 from aiogram import Bot, Router
 from aiogram.types import Message
 
-from d_brain.config import get_settings
-from d_brain.services.storage import VaultStorage
-from d_brain.services.transcription import DeepgramTranscriber
+from d_brain.bot.container import AppContainer
+from d_brain.bot.transcripts import transcribe_voice
+from d_brain.services.transcription import CHUNKED_MIN_DURATION
 
 router = Router(name="voice")
 logger = logging.getLogger(__name__)
 
+PREVIEW_CHARS = 3500  # Tail of partial transcript shown while chunks finish
+
 
 @router.message(lambda m: m.voice is not None)
-async def handle_voice(message: Message, bot: Bot) -> None:
+async def handle_voice(message: Message, bot: Bot, container: AppContainer) -> None:
     """Handle voice messages."""
     if not message.voice or not message.from_user:
         return
 
     await message.chat.do(action="typing")
 
-    settings = get_settings()
-    storage = VaultStorage(settings.vault_path)
-    transcriber = DeepgramTranscriber(settings.deepgram_api_key)
+    voice = message.voice
+    status_msg: Message | None = None
 
-    try:
-        file = await bot.get_file(message.voice.file_id)
-        if not file.file_path:
-            await message.answer("Failed to download voice message")
+    async def show_start() -> None:
+        nonlocal status_msg
+        if voice.duration >= CHUNKED_MIN_DURATION:
+            status_msg = await message.answer("🎤 <i>Распознаю длинное...</i>")
+
+    async def show_progress(text: str, done: int, total: int) -> None:
+        # Long memo: show chunk transcripts as they come in
+        if status_msg is None:
             return
+        preview = html.escape(text[-PREVIEW_CHARS:])
+        try:
+            await status_msg.edit_text(
+                f"🎤 <i>Распознаю... ({done}/{total})</i>\n\n{preview}"
+            )
+        except Exception as e:
+            logger.debug("Progress edit failed: %s", e)
 
-        file_bytes = await bot.download_file(file.file_path)
-        if not file_bytes:
+    try:
+        try:
+            transcript = await transcribe_voice(
+                bot,
+                voice,
+                container,
+                on_start=show_start,
+                on_progress=show_progress,
+            )
+        except ValueError:
             await message.answer("Failed to download voice message")
             return
 
-        audio_bytes = file_bytes.read()
-        transcript = await transcriber.transcribe(audio_bytes)
-
         if not transcript:
             await message.answer("Could not transcribe audio")
             return
 
         timestamp = datetime.fromtimestamp(message.date.timestamp())
-        storage.append_to_daily(transcript, timestamp, "[voice]")
+        await container.journal.append(transcript, timestamp, "[voice]")
 
         await message.answer(f"🎤 {transcript}\n\n✓ Сохранено")
         logger.info("Voice message saved: %d chars", len(transcript))
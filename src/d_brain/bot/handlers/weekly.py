@@ -2,59 +2,56 @@
 
 import asyncio
 import logging
+from datetime import date
+from typing import Any
 
 from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message
 
-from d_brain.bot.formatters import format_process_report
-from d_brain.config import get_settings
-from d_brain.services.git import VaultGit
-from d_brain.services.processor import ClaudeProcessor
+from d_brain.bot.container import AppContainer
+from d_brain.bot.formatters import format_report_pages
+from d_brain.bot.progress import ProgressReporter
+from d_brain.services.git_sync import CLAUDE_WRITE_PATHS
+from d_brain.services.jobs import PartialCallback
 
 router = Router(name="weekly")
 logger = logging.getLogger(__name__)
 
 
 @router.message(Command("weekly"))
-async def cmd_weekly(message: Message) -> None:
+async def cmd_weekly(message: Message, container: AppContainer) -> None:
     """Handle /weekly command - generate weekly digest."""
     user_id = message.from_user.id if message.from_user else "unknown"
     logger.info("Weekly digest triggered by user %s", user_id)
 
-    status_msg = await message.answer("⏳ Генерирую недельный дайджест...")
-
-    settings = get_settings()
-    processor = ClaudeProcessor(settings.vault_path, settings.todoist_api_key)
-    git = VaultGit(settings.vault_path)
-
-    async def run_with_progress() -> dict:
-        task = asyncio.create_task(
-            asyncio.to_thread(processor.generate_weekly)
+    year, week, _ = date.today().isocalendar()
+    week_key = f"{year}-W{week:02d}"
+    if container.jobs.running("weekly", week_key):
+        # Another /weekly or the Friday timer is on it: share its result
+        status_text = "⏳ Дайджест уже генерируется, жду результат..."
+    else:
+        status_text = "⏳ Генерирую недельный дайджест..."
+    status_msg = await message.answer(status_text)
+
+    async def weekly(on_partial: PartialCallback) -> dict[str, Any]:
+        report = await container.processor.generate_weekly(
+            user_key=str(message.chat.id),
+            on_partial=on_partial,
         )
-
-        elapsed = 0
-        while not task.done():
-            await asyncio.sleep(30)
-            elapsed += 30
-            if not task.done():
-                try:
-                    await status_msg.edit_text(
-                        f"⏳ Генерирую дайджест... ({elapsed // 60}m {elapsed % 60}s)"
-                    )
-                except Exception:
-                    pass
-
-        return await task
-
-    report = await run_with_progress()
-
-    # Commit any changes (weekly goal updates, etc)
-    if "error" not in report:
-        await asyncio.to_thread(git.commit_and_push, "chore: weekly digest")
-
-    formatted = format_process_report(report)
-    try:
-        await status_msg.edit_text(formatted)
-    except Exception:
-        await status_msg.edit_text(formatted, parse_mode=None)
+        # Commit any changes (weekly goal updates, etc)
+        if "error" not in report:
+            container.git_sync.request_commit(
+                "chore: weekly digest", CLAUDE_WRITE_PATHS
+            )
+            await asyncio.to_thread(
+                container.results.invalidate, *CLAUDE_WRITE_PATHS
+            )
+        return report
+
+    progress = ProgressReporter(status_msg, status_text)
+    report = await progress.run(
+        container.jobs.run("weekly", week_key, weekly, on_partial=progress.on_partial)
+    )
+
+    await container.pager.send(status_msg, format_report_pages(report))
@@ -1,7 +1,15 @@
-"""Reply keyboards for Telegram bot."""
+"""Reply and inline keyboards for Telegram bot."""
 
-from aiogram.types import ReplyKeyboardMarkup
-from aiogram.utils.keyboard import ReplyKeyboardBuilder
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import InlineKeyboardMarkup, ReplyKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder, ReplyKeyboardBuilder
+
+
+class PageCallback(CallbackData, prefix="page"):
+    """Inline pager button: show page of a cached report."""
+
+    key: str
+    page: int
 
 
 def get_main_keyboard() -> ReplyKeyboardMarkup:
@@ -16,3 +24,18 @@ def get_main_keyboard() -> ReplyKeyboardMarkup:
     builder.button(text="❓ Помощь")
     builder.adjust(3, 2)  # 3 in first row, 2 in second
     return builder.as_markup(resize_keyboard=True, is_persistent=True)
+
+
+def get_pager_keyboard(key: str, page: int, total: int) -> InlineKeyboardMarkup:
+    """Inline ◀️ n/total ▶️ row for a multi-page report."""
+    builder = InlineKeyboardBuilder()
+    builder.button(
+        text="◀️", callback_data=PageCallback(key=key, page=(page - 1) % total)
+    )
+    builder.button(
+        text=f"{page + 1}/{total}", callback_data=PageCallback(key=key, page=page)
+    )
+    builder.button(
+        text="▶️", callback_data=PageCallback(key=key, page=(page + 1) % total)
+    )
+    return builder.as_markup()
@@ -6,39 +6,75 @@ from typing import Any
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import Update
 
+from d_brain.bot.container import AppContainer
+from d_brain.bot.fsm_storage import SqliteStorage
+from d_brain.bot.webhook import run_webhook
 from d_brain.config import Settings
 
 logger = logging.getLogger(__name__)
 
+BOT_MODES = ("polling", "webhook")
+
 
 def create_bot(settings: Settings) -> Bot:
     """Create and configure the Telegram bot."""
+    session = None
+    if settings.telegram_api_base:
+        # Self-hosted Bot API server or a local fake for testing
+        session = AiohttpSession(
+            api=TelegramAPIServer.from_base(settings.telegram_api_base)
+        )
     return Bot(
         token=settings.telegram_bot_token,
+        session=session,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
 
 
-def create_dispatcher() -> Dispatcher:
-    """Create and configure the dispatcher with routers."""
-    from d_brain.bot.handlers import buttons, commands, do, forward, hypothesis, photo, process, text, voice, weekly
+def create_dispatcher(storage: BaseStorage | None = None) -> Dispatcher:
+    """Create and configure the dispatcher with routers.
+
+    Args:
+        storage: FSM storage (required for /do and EKG session state);
+            in-memory if not given
+    """
+    from d_brain.bot.handlers import (
+        buttons,
+        commands,
+        do,
+        document,
+        forward,
+        hypothesis,
+        pager,
+        photo,
+        process,
+        search,
+        text,
+        voice,
+        weekly,
+    )
 
-    # Use memory storage for FSM (required for /do command state)
-    dp = Dispatcher(storage=MemoryStorage())
+    dp = Dispatcher(storage=storage or MemoryStorage())
 
     # Register routers - ORDER MATTERS
     dp.include_router(commands.router)
     dp.include_router(process.router)
     dp.include_router(weekly.router)
     dp.include_router(hypothesis.router)
+    dp.include_router(search.router)
+    dp.include_router(pager.router)  # Inline report pager buttons
     dp.include_router(do.router)  # Before voice/text to catch FSM state
     dp.include_router(buttons.router)  # Reply keyboard buttons
     dp.include_router(voice.router)
     dp.include_router(photo.router)
+    dp.include_router(document.router)
     dp.include_router(forward.router)
     dp.include_router(text.router)  # Must be last (catch-all for text)
     return dp
@@ -82,15 +118,40 @@ def create_auth_middleware(settings: Settings) -> MiddlewareType:
 
 
 async def run_bot(settings: Settings) -> None:
-    """Run the bot with polling."""
+    """Run the bot with polling or webhook, as set by BOT_MODE."""
+    if settings.bot_mode not in BOT_MODES:
+        raise ValueError(f"Unknown bot mode: {settings.bot_mode}")
+
     bot = create_bot(settings)
-    dp = create_dispatcher()
+    # FSM state survives restarts; the dispatcher closes it on shutdown
+    dp = create_dispatcher(
+        SqliteStorage(
+            settings.vault_path,
+            ttl=settings.fsm_ttl_hours * 3600,
+            cache_size=settings.fsm_cache_size,
+        )
+    )
 
     # Always add auth middleware for security (it handles allow_all_users internally)
     dp.update.middleware(create_auth_middleware(settings))
 
-    logger.info("Starting bot polling...")
+    # Settings, HTTP pool, transcriber, vault services and Claude runner
+    container = await AppContainer.create(settings)
+    # Every chat-bound API call goes through the paced outbound queue
+    bot.session.middleware(container.outbound)
+
     try:
-        await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+        if settings.bot_mode == "webhook":
+            await run_webhook(bot, dp, settings, container=container)
+        else:
+            logger.info("Starting bot polling...")
+            # getUpdates fails while a webhook from an earlier run is set
+            await bot.delete_webhook()
+            await dp.start_polling(
+                bot,
+                allowed_updates=dp.resolve_used_update_types(),
+                container=container,
+            )
     finally:
+        await container.close()
         await bot.session.close()
@@ -0,0 +1,243 @@
+"""Outbound Telegram request queue: rate limits, flood waits, edit coalescing."""
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageText, TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+# Telegram allows about 30 messages/s per bot and 1/s per chat sustained
+DEFAULT_GLOBAL_RATE = 25.0
+DEFAULT_CHAT_RATE = 1.0
+CHAT_BURST = 3  # Messages a quiet chat may send back to back
+MAX_RETRIES = 3  # RetryAfter retries per request before giving up
+DRAIN_TIMEOUT = 10.0  # Seconds close() waits for queued requests
+
+
+class TokenBucket:
+    """Async token bucket; pause() blocks it for a flood wait."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = 0.0
+        self._blocked_until = 0.0
+
+    async def acquire(self) -> None:
+        """Wait for and take one token."""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            # No refill while paused, so a flood wait doesn't end in a burst
+            refill_from = max(self._updated, self._blocked_until)
+            if self._updated and now > refill_from:
+                elapsed = now - refill_from
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+            wait = self._blocked_until - now
+            if wait <= 0 and self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep(max(wait, (1 - self._tokens) / self.rate))
+
+    def pause(self, seconds: float) -> None:
+        """Block the bucket for `seconds` from now, then allow one request."""
+        until = asyncio.get_running_loop().time() + seconds
+        self._blocked_until = max(self._blocked_until, until)
+        self._tokens = 1.0
+
+
+@dataclass
+class _Request:
+    """Queued API call and everyone waiting for its result."""
+
+    make_request: NextRequestMiddlewareType[Any]
+    bot: "Bot"
+    method: TelegramMethod[Any]
+    futures: list[asyncio.Future[Any]] = field(default_factory=list)
+
+
+@dataclass
+class _ChatQueue:
+    """Requests for one chat, sent in order by one worker task."""
+
+    bucket: TokenBucket
+    requests: deque[_Request] = field(default_factory=deque)
+    # Queued (not yet sent) edits by message_id, for coalescing
+    edits: dict[int, _Request] = field(default_factory=dict)
+    worker: asyncio.Task[None] | None = None
+
+
+@dataclass
+class OutboundMetrics:
+    """Snapshot of outbound queue counters."""
+
+    queued: int  # Requests waiting now, all chats
+    max_queued: int  # Highest queued seen
+    busiest_chat: int  # Longest single-chat queue now
+    sent: int
+    coalesced: int  # Edits replaced by a newer edit before sending
+    retry_after: int  # Flood-control responses
+    retry_after_seconds: float  # Total time Telegram asked us to wait
+
+
+class OutboundDispatcher(BaseRequestMiddleware):
+    """Session middleware that queues every chat-bound Bot API call.
+
+    Handlers keep calling message.answer / edit_text as usual; this
+    middleware sends the calls in order per chat, paced by a per-chat and a
+    global token bucket. A RetryAfter pauses the chat for the requested
+    time and the request is retried. A queued edit of a message is replaced
+    by a newer edit of the same message, so only the latest text goes out
+    and all callers get its result. Calls without a chat_id (getUpdates,
+    getFile, callback answers) pass straight through.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = DEFAULT_GLOBAL_RATE,
+        chat_rate: float = DEFAULT_CHAT_RATE,
+    ) -> None:
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self._chats: dict[int | str, _ChatQueue] = {}
+        self._max_queued = 0
+        self._sent = 0
+        self._coalesced = 0
+        self._retry_after = 0
+        self._retry_after_seconds = 0.0
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        queue = self._chats.get(chat_id)
+        if queue is None:
+            queue = _ChatQueue(bucket=TokenBucket(self.chat_rate, CHAT_BURST))
+            self._chats[chat_id] = queue
+
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        message_id = getattr(method, "message_id", None)
+        pending = queue.edits.get(message_id) if message_id is not None else None
+
+        if isinstance(method, EditMessageText) and pending is not None:
+            pending.method = method
+            pending.make_request = make_request
+            pending.futures.append(future)
+            self._coalesced += 1
+        else:
+            request = _Request(make_request, bot, method, [future])
+            queue.requests.append(request)
+            if isinstance(method, EditMessageText) and message_id is not None:
+                queue.edits[message_id] = request
+            elif message_id is not None:
+                # Later edits must not jump ahead of this call
+                queue.edits.pop(message_id, None)
+            self._max_queued = max(self._max_queued, self.queued)
+
+        if queue.worker is None or queue.worker.done():
+            queue.worker = asyncio.create_task(
+                self._run(chat_id, queue), name=f"outbound-{chat_id}"
+            )
+        return await future
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting to be sent, all chats."""
+        return sum(len(queue.requests) for queue in self._chats.values())
+
+    def metrics(self) -> OutboundMetrics:
+        """Current queue depth and counters."""
+        return OutboundMetrics(
+            queued=self.queued,
+            max_queued=self._max_queued,
+            busiest_chat=max(
+                (len(queue.requests) for queue in self._chats.values()), default=0
+            ),
+            sent=self._sent,
+            coalesced=self._coalesced,
+            retry_after=self._retry_after,
+            retry_after_seconds=self._retry_after_seconds,
+        )
+
+    async def _run(self, chat_id: int | str, queue: _ChatQueue) -> None:
+        """Send a chat's requests in order until its queue is empty."""
+        while queue.requests:
+            request = queue.requests.popleft()
+            message_id = getattr(request.method, "message_id", None)
+            if queue.edits.get(message_id) is request:
+                del queue.edits[message_id]
+
+            try:
+                result = await self._send(chat_id, queue, request)
+            except asyncio.CancelledError:
+                for pending in (request, *queue.requests):
+                    for future in pending.futures:
+                        future.cancel()
+                raise
+            except Exception as e:
+                for future in request.futures:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for future in request.futures:
+                    if not future.done():
+                        future.set_result(result)
+
+    async def _send(
+        self, chat_id: int | str, queue: _ChatQueue, request: _Request
+    ) -> Any:
+        """Send one request, waiting out flood control."""
+        retries = 0
+        while True:
+            await queue.bucket.acquire()
+            await self.global_bucket.acquire()
+            try:
+                result = await request.make_request(request.bot, request.method)
+            except TelegramRetryAfter as e:
+                self._retry_after += 1
+                self._retry_after_seconds += e.retry_after
+                if retries >= MAX_RETRIES:
+                    raise
+                retries += 1
+                logger.warning(
+                    "Telegram flood control for chat %s: retry %s in %ss",
+                    chat_id,
+                    type(request.method).__name__,
+                    e.retry_after,
+                )
+                # Later requests for this chat wait too, keeping their order
+                queue.bucket.pause(e.retry_after)
+                continue
+            self._sent += 1
+            return result
+
+    async def close(self) -> None:
+        """Wait for queued requests to go out (bounded by DRAIN_TIMEOUT)."""
+        workers = [q.worker for q in self._chats.values() if q.worker is not None]
+        if workers:
+            _, pending = await asyncio.wait(workers, timeout=DRAIN_TIMEOUT)
+            for task in pending:
+                task.cancel()
+        logger.info("Outbound queue stats: %s", self.metrics())
@@ -0,0 +1,101 @@
+"""Delivery of multi-page reports: inline pager or follow-up messages."""
+
+import logging
+import secrets
+from collections import OrderedDict
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup, Message
+
+from d_brain.bot.keyboards import get_pager_keyboard
+
+logger = logging.getLogger(__name__)
+
+PAGING_MODES = ("pager", "messages")
+DEFAULT_MAX_REPORTS = 100
+
+
+class ReportPager:
+    """Send long reports page by page.
+
+    In "pager" mode the first page replaces the status message and inline
+    ◀️/▶️ buttons edit that same message; the pages stay in a bounded LRU
+    cache so flipping costs no recomputation. In "messages" mode the
+    remaining pages are sent as follow-up messages.
+    """
+
+    def __init__(
+        self, mode: str = "pager", max_reports: int = DEFAULT_MAX_REPORTS
+    ) -> None:
+        if mode not in PAGING_MODES:
+            raise ValueError(f"Unknown report paging mode: {mode}")
+        self.mode = mode
+        self.max_reports = max_reports
+        self._reports: OrderedDict[str, list[str]] = OrderedDict()
+
+    def put(self, pages: list[str]) -> str:
+        """Cache pages, evicting the least recently viewed report if full.
+
+        Returns:
+            Key for callback data
+        """
+        key = secrets.token_urlsafe(6)
+        self._reports[key] = pages
+        while len(self._reports) > self.max_reports:
+            self._reports.popitem(last=False)
+        return key
+
+    def get(self, key: str) -> list[str] | None:
+        """Get cached pages and mark the report as recently viewed."""
+        pages = self._reports.get(key)
+        if pages is not None:
+            self._reports.move_to_end(key)
+        return pages
+
+    async def send(self, status_msg: Message, pages: list[str]) -> None:
+        """Replace status message with the report.
+
+        Args:
+            status_msg: Message to edit into the first page
+            pages: Pages from format_report_pages
+        """
+        if len(pages) == 1:
+            await _edit(status_msg, pages[0])
+            return
+
+        logger.info("Sending report in %d pages (%s)", len(pages), self.mode)
+        if self.mode == "messages":
+            await _edit(status_msg, pages[0])
+            for page in pages[1:]:
+                try:
+                    await status_msg.answer(page)
+                except TelegramBadRequest:
+                    await status_msg.answer(page, parse_mode=None)
+            return
+
+        key = self.put(pages)
+        await _edit(status_msg, pages[0], get_pager_keyboard(key, 0, len(pages)))
+
+    async def show(self, message: Message, key: str, page: int) -> bool:
+        """Edit pager message to show another page.
+
+        Returns:
+            False if the report is no longer cached
+        """
+        pages = self.get(key)
+        if pages is None or not 0 <= page < len(pages):
+            return False
+        await _edit(message, pages[page], get_pager_keyboard(key, page, len(pages)))
+        return True
+
+
+async def _edit(
+    message: Message, text: str, markup: InlineKeyboardMarkup | None = None
+) -> None:
+    """Edit message text, falling back to plain text if HTML is rejected."""
+    try:
+        await message.edit_text(text, reply_markup=markup)
+    except TelegramBadRequest as e:
+        if "message is not modified" in str(e):
+            return
+        await message.edit_text(text, reply_markup=markup, parse_mode=None)
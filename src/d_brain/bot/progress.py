@@ -0,0 +1,85 @@
+"""Status message updates while long Claude jobs are running."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable
+from typing import Any
+
+from aiogram.types import Message
+
+from d_brain.bot.formatters import format_partial_report
+
+logger = logging.getLogger(__name__)
+
+EDIT_INTERVAL = 3.0  # Min seconds between status edits
+ELAPSED_INTERVAL = 30  # Refresh elapsed time when nothing new arrives
+
+
+class ProgressReporter:
+    """Keep a status message updated with elapsed time and partial output.
+
+    Partial output is coalesced: only the latest text is shown, and edits
+    are rate-limited to one per EDIT_INTERVAL seconds.
+    """
+
+    def __init__(self, status_msg: Message, status_text: str) -> None:
+        self.status_msg = status_msg
+        self.status_text = status_text
+        self._partial = ""
+        self._shown = ""
+        self._changed = asyncio.Event()
+
+    async def on_partial(self, text: str) -> None:
+        """Receive partial output (safe to call at any rate)."""
+        self._partial = text
+        self._changed.set()
+
+    async def run(self, job: Awaitable[dict[str, Any]]) -> dict[str, Any]:
+        """Await job while keeping the status message fresh.
+
+        Args:
+            job: Coroutine producing a processor report
+
+        Returns:
+            The job's report
+        """
+        loop = asyncio.get_running_loop()
+        task = asyncio.ensure_future(job)
+        started = loop.time()
+        last_edit = 0.0
+
+        while not task.done():
+            changed = asyncio.create_task(self._changed.wait())
+            await asyncio.wait(
+                {task, changed},
+                timeout=ELAPSED_INTERVAL,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            changed.cancel()
+            if task.done():
+                break
+
+            # Coalesce bursts of partial output into one edit
+            delay = last_edit + EDIT_INTERVAL - loop.time()
+            if delay > 0:
+                await asyncio.wait({task}, timeout=delay)
+                if task.done():
+                    break
+
+            self._changed.clear()
+            await self._edit(int(loop.time() - started))
+            last_edit = loop.time()
+
+        return await task
+
+    async def _edit(self, elapsed: int) -> None:
+        """Edit status message, skipping no-op edits."""
+        header = f"{self.status_text} ({elapsed // 60}m {elapsed % 60}s)"
+        text = format_partial_report(header, self._partial)
+        if text == self._shown:
+            return
+        try:
+            await self.status_msg.edit_text(text)
+            self._shown = text
+        except Exception as e:
+            logger.debug("Progress edit failed: %s", e)
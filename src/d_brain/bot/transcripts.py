@@ -0,0 +1,62 @@
+"""Voice message transcription shared by the voice, /do and EKG handlers."""
+
+from collections.abc import Awaitable, Callable
+
+from aiogram import Bot
+from aiogram.types import Voice
+
+from d_brain.bot.container import AppContainer
+from d_brain.services.transcription import ChunkProgressCallback
+
+
+async def transcribe_voice(
+    bot: Bot,
+    voice: Voice,
+    container: AppContainer,
+    on_start: Callable[[], Awaitable[None]] | None = None,
+    on_progress: ChunkProgressCallback | None = None,
+) -> str:
+    """Get transcript of a voice message, from cache when possible.
+
+    The cache is keyed by file_unique_id, so forwarded and re-sent notes
+    are neither downloaded nor transcribed again. Long notes are
+    transcribed as parallel chunks.
+
+    Args:
+        bot: Bot instance
+        voice: Telegram voice object
+        container: Application services
+        on_start: Called on cache miss, before downloading
+        on_progress: Called as chunks of a long note finish
+
+    Returns:
+        Transcript text, empty if nothing was recognized
+
+    Raises:
+        ValueError: If the voice file can't be downloaded
+    """
+    transcriber = container.transcriber
+    cache = container.transcripts
+    key = (voice.file_unique_id, transcriber.model, transcriber.language)
+
+    cached = await cache.get(*key)
+    if cached is not None:
+        return cached
+
+    if on_start is not None:
+        await on_start()
+
+    file = await bot.get_file(voice.file_id)
+    if not file.file_path:
+        raise ValueError("Telegram returned no file path")
+
+    file_bytes = await bot.download_file(file.file_path)
+    if not file_bytes:
+        raise ValueError("Empty download")
+
+    transcript = await transcriber.transcribe_chunked(
+        file_bytes.read(), voice.duration, on_progress=on_progress
+    )
+    if transcript:
+        await cache.put(*key, transcript)
+    return transcript
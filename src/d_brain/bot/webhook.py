@@ -0,0 +1,144 @@
+"""Webhook runtime: aiohttp server receiving updates pushed by Telegram."""
+
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from d_brain.config import Settings
+from d_brain.services.storage import STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PATH = "/healthz"
+
+
+def webhook_secret(settings: Settings) -> str:
+    """Secret token Telegram sends in X-Telegram-Bot-Api-Secret-Token.
+
+    Uses WEBHOOK_SECRET, else one derived from the bot token, so it stays
+    the same across restarts without configuration.
+    """
+    if settings.webhook_secret:
+        return settings.webhook_secret
+    digest = hashlib.sha256(f"webhook:{settings.telegram_bot_token}".encode())
+    return digest.hexdigest()[:32]
+
+
+def _lock_instance(vault_path: Path) -> int:
+    """Take the vault's webhook lock, held for the life of the process.
+
+    Pager pages, the outbound rate limiter, git sync and the journal
+    writer live in process memory, so only one webhook process may serve
+    a vault.
+
+    Returns:
+        Descriptor holding the lock
+
+    Raises:
+        RuntimeError: If another webhook process serves this vault
+    """
+    lock_path = Path(vault_path) / STATE_DIR / "webhook.lock"
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        raise RuntimeError(
+            f"Another webhook process is serving {vault_path} ({lock_path})"
+        ) from None
+    return fd
+
+
+async def _health(request: web.Request) -> web.Response:
+    """Liveness probe for the reverse proxy."""
+    return web.Response(text="ok")
+
+
+def create_webhook_app(
+    bot: Bot, dp: Dispatcher, settings: Settings, **data: Any
+) -> web.Application:
+    """Create aiohttp app that feeds webhook updates to the dispatcher.
+
+    Requests without the right secret token get 401. Valid updates are
+    acknowledged with 200 right away and handled in a background task, so
+    slow handlers never make Telegram retry a delivery.
+
+    Args:
+        bot: Bot used to answer updates
+        dp: Dispatcher with routers and middlewares
+        settings: Application settings (WEBHOOK_PATH, WEBHOOK_SECRET)
+        **data: Workflow data for handlers, e.g. container
+
+    Returns:
+        Application ready to be served
+    """
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=True,
+        secret_token=webhook_secret(settings),
+        **data,
+    ).register(app, path=settings.webhook_path)
+    app.router.add_get(HEALTH_PATH, _health)
+    setup_application(app, dp, bot=bot, **data)
+    return app
+
+
+async def run_webhook(
+    bot: Bot, dp: Dispatcher, settings: Settings, **data: Any
+) -> None:
+    """Serve webhook until cancelled.
+
+    Registers WEBHOOK_URL + WEBHOOK_PATH with Telegram on start. The
+    webhook is left in place on shutdown, so updates sent during a restart
+    are queued by Telegram and delivered once the server is back. Runs as
+    a single process per vault: bot state lives in process memory.
+
+    Args:
+        bot: Bot used to answer updates
+        dp: Dispatcher with routers and middlewares
+        settings: Application settings
+        **data: Workflow data for handlers, e.g. container
+
+    Raises:
+        ValueError: If WEBHOOK_URL is not set
+        RuntimeError: If another webhook process serves the vault
+    """
+    if not settings.webhook_url:
+        raise ValueError("BOT_MODE=webhook requires WEBHOOK_URL")
+
+    lock_fd = _lock_instance(settings.vault_path)
+    app = create_webhook_app(bot, dp, settings, **data)
+    runner = web.AppRunner(app, handle_signals=False)
+    try:
+        await runner.setup()
+        site = web.TCPSite(runner, settings.webhook_host, settings.webhook_port)
+        await site.start()
+
+        url = settings.webhook_url.rstrip("/") + settings.webhook_path
+        await bot.set_webhook(
+            url,
+            secret_token=webhook_secret(settings),
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+        logger.info(
+            "Webhook %s served on %s:%d",
+            url,
+            settings.webhook_host,
+            settings.webhook_port,
+        )
+
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        os.close(lock_fd)
@@ -1,5 +1,6 @@
 """Application configuration using Pydantic Settings."""
 
+from functools import lru_cache
 from pathlib import Path
 
 from pydantic import Field
@@ -16,7 +17,30 @@ class Settings(BaseSettings):
     )
 
     telegram_bot_token: str = Field(description="Telegram Bot API token")
-    deepgram_api_key: str = Field(description="Deepgram API key for transcription")
+    deepgram_api_key: str = Field(
+        default="",
+        description="Deepgram API key (optional with TRANSCRIBER=local)",
+    )
+    deepgram_base_url: str = Field(
+        default="",
+        description="Deepgram API base URL override (empty = production)",
+    )
+    transcriber: str = Field(
+        default="deepgram",
+        description="Transcription engine: deepgram, local (Whisper) or auto",
+    )
+    whisper_model: str = Field(
+        default="small",
+        description="faster-whisper model size or path for local transcription",
+    )
+    whisper_workers: int = Field(
+        default=1,
+        description="Local transcription worker processes",
+    )
+    local_max_duration: int = Field(
+        default=30,
+        description="With TRANSCRIBER=auto, notes up to this many seconds go local",
+    )
     todoist_api_key: str = Field(default="", description="Todoist API key for tasks")
     vault_path: Path = Field(
         default=Path("./vault"),
@@ -30,6 +54,74 @@ class Settings(BaseSettings):
         default=False,
         description="Whether to allow access to all users (security risk!)",
     )
+    transcript_cache_size: int = Field(
+        default=2000,
+        description="Max voice transcripts kept in the on-disk cache",
+    )
+    claude_workers: int = Field(
+        default=2,
+        description="Max concurrent Claude CLI processes",
+    )
+    git_backend: str = Field(
+        default="auto",
+        description="Vault git backend: auto, subprocess or pygit2",
+    )
+    report_paging: str = Field(
+        default="pager",
+        description="Long reports: pager (inline buttons) or messages (follow-ups)",
+    )
+    report_cache_size: int = Field(
+        default=100,
+        description="Multi-page reports kept for the inline pager",
+    )
+    result_cache_size: int = Field(
+        default=200,
+        description="Read-only Claude reports (/hypothesis review etc) kept",
+    )
+    fsm_ttl_hours: float = Field(
+        default=72,
+        description="Hours a /do or EKG conversation is kept since its last step",
+    )
+    fsm_cache_size: int = Field(
+        default=256,
+        description="Conversations kept in memory in front of the FSM database",
+    )
+    telegram_global_rate: float = Field(
+        default=25.0,
+        description="Max outgoing Bot API messages per second, all chats",
+    )
+    telegram_chat_rate: float = Field(
+        default=1.0,
+        description="Max outgoing Bot API messages per second in one chat",
+    )
+    telegram_api_base: str = Field(
+        default="",
+        description="Bot API server base URL override (empty = api.telegram.org)",
+    )
+    bot_mode: str = Field(
+        default="polling",
+        description="How updates arrive: polling or webhook",
+    )
+    webhook_url: str = Field(
+        default="",
+        description="Public HTTPS base URL of the webhook (BOT_MODE=webhook)",
+    )
+    webhook_path: str = Field(
+        default="/telegram/webhook",
+        description="Path the webhook is served on",
+    )
+    webhook_secret: str = Field(
+        default="",
+        description="Webhook secret token (empty = derived from the bot token)",
+    )
+    webhook_host: str = Field(
+        default="127.0.0.1",
+        description="Address the webhook server binds to",
+    )
+    webhook_port: int = Field(
+        default=8080,
+        description="Port the webhook server binds to",
+    )
 
     @property
     def daily_path(self) -> Path:
@@ -47,6 +139,7 @@ class Settings(BaseSettings):
         return self.vault_path / "thoughts"
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get application settings instance."""
+    """Get application settings instance (parsed once per process)."""
     return Settings()
@@ -0,0 +1,189 @@
+"""Content-addressed attachment pipeline with streaming downloads."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import date
+from pathlib import Path
+
+from d_brain.services.storage import STATE_DIR, VaultStorage, attachment_filename
+
+logger = logging.getLogger(__name__)
+
+
+class AttachmentIndex:
+    """Map content hashes to stored attachment paths.
+
+    Persisted as .d-brain/attachments.json; safe to use from worker threads.
+    """
+
+    def __init__(self, vault_path: Path) -> None:
+        self.vault_path = Path(vault_path)
+        self.index_file = self.vault_path / STATE_DIR / "attachments.json"
+        self._lock = threading.Lock()
+        self._entries: dict[str, str] | None = None
+
+    def _load(self) -> dict[str, str]:
+        """Load index from disk on first use."""
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.index_file.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning("Corrupt attachment index, starting fresh: %s", e)
+                self._entries = {}
+        return self._entries
+
+    def lookup(self, digest: str) -> str | None:
+        """Get relative path of stored file with this hash, if it still exists."""
+        with self._lock:
+            relative_path = self._load().get(digest)
+        if relative_path and (self.vault_path / relative_path).exists():
+            return relative_path
+        return None
+
+    def add(self, digest: str, relative_path: str) -> None:
+        """Record stored file and persist index atomically."""
+        with self._lock:
+            entries = self._load()
+            entries[digest] = relative_path
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.index_file.with_suffix(".tmp")
+            tmp_file.write_text(json.dumps(entries), encoding="utf-8")
+            os.replace(tmp_file, self.index_file)
+
+
+class AttachmentPipeline:
+    """Save attachments without holding them in memory or blocking the loop.
+
+    Downloads go straight into a hidden temp file inside the target
+    attachments/YYYY-MM-DD/ directory. On commit the file is hashed in
+    chunks: content already in the vault is dropped and the existing path
+    returned, new content is fsynced and atomically renamed to a
+    hash-derived name. All file I/O runs in worker threads.
+    """
+
+    def __init__(self, storage: VaultStorage) -> None:
+        self.storage = storage
+        self.index = AttachmentIndex(storage.vault_path)
+
+    @asynccontextmanager
+    async def incoming(self, day: date) -> AsyncIterator[Path]:
+        """Reserve a temp file for a download; removed unless committed.
+
+        Args:
+            day: Date used for the attachments directory
+
+        Yields:
+            Path to write the download to
+        """
+        dir_path = await asyncio.to_thread(self.storage.get_attachments_dir, day)
+        fd, name = await asyncio.to_thread(
+            tempfile.mkstemp, suffix=".part", prefix=".incoming-", dir=dir_path
+        )
+        os.close(fd)
+        tmp_path = Path(name)
+        try:
+            yield tmp_path
+        finally:
+            await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+
+    async def commit(
+        self,
+        tmp_path: Path,
+        day: date,
+        prefix: str = "img",
+        extension: str = "jpg",
+    ) -> str:
+        """Store downloaded temp file, deduplicating by content.
+
+        Args:
+            tmp_path: Path yielded by incoming()
+            day: Date for organizing
+            prefix: Filename prefix by kind (img, video, doc)
+            extension: File extension
+
+        Returns:
+            Relative path for Obsidian embed: attachments/YYYY-MM-DD/<name>
+        """
+        return await asyncio.to_thread(self._commit, tmp_path, day, prefix, extension)
+
+    async def save(
+        self,
+        data: bytes,
+        day: date,
+        prefix: str = "img",
+        extension: str = "jpg",
+    ) -> str:
+        """Store in-memory bytes (for scripts), deduplicating by content.
+
+        Goes through the same temp file, index lookup, fsync and rename as
+        streamed downloads.
+
+        Args:
+            data: File bytes
+            day: Date for organizing
+            prefix: Filename prefix by kind (img, video, doc)
+            extension: File extension
+
+        Returns:
+            Relative path for Obsidian embed: attachments/YYYY-MM-DD/<name>
+        """
+        async with self.incoming(day) as tmp_path:
+            await asyncio.to_thread(tmp_path.write_bytes, data)
+            return await self.commit(tmp_path, day, prefix, extension)
+
+    def _commit(self, tmp_path: Path, day: date, prefix: str, extension: str) -> str:
+        """Hash, dedup, fsync and rename (runs in thread)."""
+        with tmp_path.open("rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+
+        existing = self.index.lookup(digest)
+        if existing:
+            logger.info("Duplicate attachment, reusing %s", existing)
+            return existing
+
+        with tmp_path.open("rb") as f:
+            os.fsync(f.fileno())
+
+        dir_path = tmp_path.parent
+        filename = attachment_filename(prefix, digest, extension)
+        os.replace(tmp_path, dir_path / filename)
+        _fsync_dir(dir_path)
+
+        relative_path = f"attachments/{day.isoformat()}/{filename}"
+        self.index.add(digest, relative_path)
+        logger.debug("Attachment committed: %s", relative_path)
+        return relative_path
+
+
+def _fsync_dir(path: Path) -> None:
+    """Persist directory entry changes (rename) where supported."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+_pipelines: dict[Path, AttachmentPipeline] = {}
+
+
+def get_attachment_pipeline(vault_path: Path) -> AttachmentPipeline:
+    """Get the attachment pipeline for a vault (shares one hash index)."""
+    key = Path(vault_path).resolve()
+    if key not in _pipelines:
+        _pipelines[key] = AttachmentPipeline(VaultStorage(key))
+    return _pipelines[key]
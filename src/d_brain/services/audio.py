@@ -0,0 +1,129 @@
+"""Audio helpers: silence detection and splitting via ffmpeg."""
+
+import asyncio
+import logging
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SILENCE_NOISE = "-35dB"  # Below this level counts as silence
+SILENCE_MIN_DURATION = 0.4  # Seconds of quiet to count as a pause
+TARGET_CHUNK_SECONDS = 60.0
+MAX_CHUNK_SECONDS = 90.0
+
+_SILENCE_START_RE = re.compile(r"silence_start: (-?[\d.]+)")
+_SILENCE_END_RE = re.compile(r"silence_end: (-?[\d.]+)")
+
+
+def ffmpeg_available() -> bool:
+    """Check if ffmpeg is installed."""
+    return shutil.which("ffmpeg") is not None
+
+
+async def _run_ffmpeg(*args: str, audio: bytes) -> tuple[int, str]:
+    """Run ffmpeg with audio on stdin, return exit code and stderr."""
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg",
+        "-hide_banner",
+        *args,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate(audio)
+    return process.returncode or 0, stderr.decode(errors="replace")
+
+
+async def find_silences(audio: bytes) -> list[tuple[float, float]]:
+    """Detect pauses in audio.
+
+    Returns:
+        List of (start, end) seconds of each pause
+    """
+    returncode, stderr = await _run_ffmpeg(
+        "-i",
+        "pipe:0",
+        "-af",
+        f"silencedetect=noise={SILENCE_NOISE}:d={SILENCE_MIN_DURATION}",
+        "-f",
+        "null",
+        "-",
+        audio=audio,
+    )
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg silencedetect failed: {stderr[-500:]}")
+
+    starts = [float(m) for m in _SILENCE_START_RE.findall(stderr)]
+    ends = [float(m) for m in _SILENCE_END_RE.findall(stderr)]
+    return list(zip(starts, ends, strict=False))
+
+
+def choose_cut_points(
+    silences: list[tuple[float, float]],
+    duration: float,
+    target: float = TARGET_CHUNK_SECONDS,
+    max_length: float = MAX_CHUNK_SECONDS,
+) -> list[float]:
+    """Pick cut points in pauses, aiming for chunks of about `target` seconds.
+
+    Falls back to a hard cut when there is no pause within `max_length`.
+    """
+    pauses = [(start + end) / 2 for start, end in silences]
+    cuts: list[float] = []
+    last = 0.0
+
+    while duration - last > max_length:
+        candidates = [p for p in pauses if last + target / 2 < p <= last + max_length]
+        if candidates:
+            cut = min(candidates, key=lambda p: abs(p - (last + target)))
+        else:
+            cut = last + target
+        cuts.append(cut)
+        last = cut
+
+    return cuts
+
+
+async def split_on_silence(audio: bytes, duration: float) -> list[bytes]:
+    """Split audio into chunks at pauses.
+
+    Chunks are cut without re-encoding (ffmpeg segment muxer, stream copy),
+    so boundaries snap to the nearest packet.
+
+    Args:
+        audio: Audio file content (e.g. Telegram OGG/Opus voice)
+        duration: Audio duration in seconds
+
+    Returns:
+        Chunks in order; a single chunk if no cut was needed
+    """
+    cuts = choose_cut_points(await find_silences(audio), duration)
+    if not cuts:
+        return [audio]
+
+    with tempfile.TemporaryDirectory(prefix="d-brain-audio-") as tmp_dir:
+        pattern = str(Path(tmp_dir) / "chunk-%03d.ogg")
+        returncode, stderr = await _run_ffmpeg(
+            "-i",
+            "pipe:0",
+            "-f",
+            "segment",
+            "-segment_times",
+            ",".join(f"{cut:.3f}" for cut in cuts),
+            "-c",
+            "copy",
+            pattern,
+            audio=audio,
+        )
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg segment failed: {stderr[-500:]}")
+
+        chunks = [
+            path.read_bytes() for path in sorted(Path(tmp_dir).glob("chunk-*.ogg"))
+        ]
+
+    logger.info("Split %.0fs audio into %d chunks", duration, len(chunks))
+    return chunks
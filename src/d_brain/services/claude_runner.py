@@ -0,0 +1,275 @@
+"""Async Claude CLI runner with a bounded worker pool."""
+
+import asyncio
+import logging
+import os
+import shutil
+import subprocess
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_USER_KEY = "default"
+LOGIN_ENV_TIMEOUT = 30
+STREAM_LINE_LIMIT = 16 * 1024 * 1024  # stream-json lines carry whole tool results
+
+LineCallback = Callable[[str], Awaitable[None]]
+
+
+def capture_login_env() -> dict[str, str]:
+    """Capture login shell environment once.
+
+    OAuth tokens require login shell environment to be accessible, so we
+    snapshot what `bash -l` exports instead of starting a login shell per call.
+    """
+    try:
+        result = subprocess.run(
+            ["bash", "-l", "-c", "env -0"],
+            capture_output=True,
+            timeout=LOGIN_ENV_TIMEOUT,
+            check=False,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning("Failed to capture login shell env: %s", e)
+        return dict(os.environ)
+
+    if result.returncode != 0:
+        logger.warning(
+            "Login shell exited with %d, using process env", result.returncode
+        )
+        return dict(os.environ)
+
+    env: dict[str, str] = {}
+    for item in result.stdout.split(b"\0"):
+        key, sep, value = item.decode(errors="replace").partition("=")
+        if sep and key:
+            env[key] = value
+    return env
+
+
+def resolve_claude_path(env: dict[str, str]) -> str:
+    """Get path to Claude CLI using PATH from the given environment.
+
+    Uses claude-proxy to route through VPN for regions where API is blocked.
+    """
+    search_path = env.get("PATH")
+    # Prefer claude-proxy for VPN routing
+    proxy_path = shutil.which("claude-proxy", path=search_path)
+    if proxy_path:
+        return proxy_path
+    # Fallback to direct claude
+    return shutil.which("claude", path=search_path) or "/opt/homebrew/bin/claude"
+
+
+@dataclass
+class _Job:
+    """Queued Claude CLI invocation."""
+
+    args: list[str]
+    cwd: Path
+    env: dict[str, str]
+    timeout: float
+    future: asyncio.Future[subprocess.CompletedProcess[str]]
+    on_line: LineCallback | None = None
+
+
+class ClaudeRunner:
+    """Run Claude CLI calls on a bounded pool of async workers.
+
+    Jobs are queued per user and served round-robin, so one user sending
+    several /do requests cannot starve everyone else.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS) -> None:
+        self.max_workers = max(1, max_workers)
+        self._queues: OrderedDict[str, deque[_Job]] = OrderedDict()
+        self._pending = asyncio.Semaphore(0)
+        self._workers: list[asyncio.Task[None]] = []
+        self._start_lock = asyncio.Lock()
+        self._env: dict[str, str] = {}
+        self._claude_path = ""
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def start(self) -> None:
+        """Capture environment, resolve binary and start workers."""
+        async with self._start_lock:
+            if self._workers:
+                return
+
+            self._env = await asyncio.to_thread(capture_login_env)
+            self._claude_path = resolve_claude_path(self._env)
+            logger.info(
+                "Claude runner started: %s (%d workers)",
+                self._claude_path,
+                self.max_workers,
+            )
+            self._workers = [
+                asyncio.create_task(self._worker(), name=f"claude-worker-{i}")
+                for i in range(self.max_workers)
+            ]
+
+    async def stop(self) -> None:
+        """Stop workers and fail all queued jobs."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        for queue in self._queues.values():
+            for job in queue:
+                if not job.future.done():
+                    job.future.cancel()
+        self._queues.clear()
+
+    async def run(
+        self,
+        args: list[str],
+        cwd: Path,
+        env: dict[str, str] | None = None,
+        timeout: float = 1200,
+        user_key: str = DEFAULT_USER_KEY,
+        on_line: LineCallback | None = None,
+    ) -> subprocess.CompletedProcess[str]:
+        """Queue Claude CLI call and wait for its result.
+
+        Args:
+            args: CLI arguments (without the binary)
+            cwd: Working directory
+            env: Extra variables on top of the login shell environment
+            timeout: Seconds before the process is killed
+            user_key: Fairness key, usually the Telegram chat id
+            on_line: Called with each stdout line as it arrives
+
+        Returns:
+            Completed process with decoded stdout/stderr
+
+        Raises:
+            subprocess.TimeoutExpired: If the call exceeds timeout
+            FileNotFoundError: If Claude CLI is not installed
+        """
+        await self.start()
+
+        job = _Job(
+            args=args,
+            cwd=cwd,
+            env={**self._env, **(env or {})},
+            timeout=timeout,
+            future=asyncio.get_running_loop().create_future(),
+            on_line=on_line,
+        )
+        self._queues.setdefault(user_key, deque()).append(job)
+        self._pending.release()
+        logger.debug("Queued Claude job for %s (depth %d)", user_key, self.queue_depth)
+
+        return await job.future
+
+    def _next_job(self) -> _Job:
+        """Pop next job, rotating between users."""
+        user_key, queue = self._queues.popitem(last=False)
+        job = queue.popleft()
+        if queue:
+            # Move user to the back of the line
+            self._queues[user_key] = queue
+        return job
+
+    async def _worker(self) -> None:
+        """Serve queued jobs until cancelled."""
+        while True:
+            await self._pending.acquire()
+            job = self._next_job()
+            if job.future.done():
+                # Caller gave up while the job was queued
+                continue
+
+            try:
+                result = await self._execute(job)
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+
+    async def _execute(self, job: _Job) -> subprocess.CompletedProcess[str]:
+        """Run a single job as a child process."""
+        process = await asyncio.create_subprocess_exec(
+            self._claude_path,
+            *job.args,
+            cwd=job.cwd,
+            env=job.env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LINE_LIMIT,
+        )
+
+        try:
+            if job.on_line is None:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(), timeout=job.timeout
+                )
+            else:
+                stdout, stderr = await asyncio.wait_for(
+                    self._stream(process, job.on_line), timeout=job.timeout
+                )
+        except TimeoutError:
+            process.kill()
+            await process.wait()
+            raise subprocess.TimeoutExpired(self._claude_path, job.timeout) from None
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+
+        return subprocess.CompletedProcess(
+            [self._claude_path, *job.args],
+            process.returncode or 0,
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace"),
+        )
+
+    async def _stream(
+        self, process: asyncio.subprocess.Process, on_line: LineCallback
+    ) -> tuple[bytes, bytes]:
+        """Read stdout line by line, feeding callback, while draining stderr."""
+        assert process.stdout is not None and process.stderr is not None
+
+        async def read_stdout() -> bytes:
+            assert process.stdout is not None
+            lines = []
+            while line := await process.stdout.readline():
+                lines.append(line)
+                try:
+                    await on_line(line.decode(errors="replace"))
+                except Exception:
+                    logger.exception("Claude output callback failed")
+            return b"".join(lines)
+
+        stdout, stderr, _ = await asyncio.gather(
+            read_stdout(), process.stderr.read(), process.wait()
+        )
+        return stdout, stderr
+
+
+_runner: ClaudeRunner | None = None
+
+
+def get_claude_runner() -> ClaudeRunner:
+    """Get process-wide Claude runner."""
+    global _runner
+    if _runner is None:
+        _runner = ClaudeRunner()
+    return _runner
+
+
+def set_claude_runner(runner: ClaudeRunner) -> None:
+    """Replace process-wide Claude runner (configured at startup)."""
+    global _runner
+    _runner = runner
@@ -0,0 +1,72 @@
+"""Minimal YAML frontmatter parsing for vault notes."""
+
+import re
+
+FRONTMATTER_RE = re.compile(r"\A---\s*\n(.*?)\n---\s*(?:\n|\Z)", re.DOTALL)
+_KEY_RE = re.compile(r"^([A-Za-z_][\w-]*):\s*(.*)$")
+
+FrontmatterValue = str | list[str]
+
+
+def _scalar(value: str) -> str:
+    """Strip quotes and trailing comments from a scalar value."""
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return value.split(" #", 1)[0].strip()
+
+
+def parse_frontmatter(content: str) -> tuple[dict[str, FrontmatterValue], str]:
+    """Split note into frontmatter fields and body.
+
+    Handles the subset Obsidian notes in the vault use: `key: value`,
+    inline lists `[a, b]` and block lists of `- item`. Nested mappings are
+    ignored.
+
+    Args:
+        content: Full note text
+
+    Returns:
+        (fields, body); fields is empty if the note has no frontmatter
+    """
+    match = FRONTMATTER_RE.match(content)
+    if not match:
+        return {}, content
+
+    fields: dict[str, FrontmatterValue] = {}
+    current_list: list[str] | None = None
+
+    for line in match.group(1).splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+
+        if stripped.startswith("- ") and current_list is not None:
+            current_list.append(_scalar(stripped[2:]))
+            continue
+
+        key_match = _KEY_RE.match(line)
+        if not key_match:
+            continue
+
+        key, value = key_match.group(1), key_match.group(2).strip()
+        if not value:
+            current_list = []
+            fields[key] = current_list
+        elif value.startswith("[") and value.endswith("]"):
+            current_list = None
+            fields[key] = [_scalar(v) for v in value[1:-1].split(",") if v.strip()]
+        else:
+            current_list = None
+            fields[key] = _scalar(value)
+
+    return fields, content[match.end() :]
+
+
+def field_text(value: FrontmatterValue | None) -> str:
+    """Frontmatter value as a single string (lists joined with spaces)."""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return " ".join(value)
+    return value
@@ -3,12 +3,36 @@
 import logging
 import subprocess
 from pathlib import Path
+from typing import Protocol
+
+try:
+    import pygit2
+except ImportError:  # Optional: pip install agent-second-brain[git]
+    pygit2 = None  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
 
+GIT_BACKENDS = ("auto", "subprocess", "pygit2")
 
-class VaultGit:
-    """Service for git operations on vault."""
+
+class GitBackend(Protocol):
+    """Operations VaultGit delegates to a git implementation."""
+
+    def get_status(self) -> str:
+        """Get porcelain-style status."""
+        ...
+
+    def commit_changes(self, message: str) -> bool:
+        """Stage all changes and commit."""
+        ...
+
+    def commit_paths(self, message: str, paths: list[str]) -> bool:
+        """Stage only given vault-relative paths and commit."""
+        ...
+
+
+class SubprocessGitBackend:
+    """Git backend that runs the `git` CLI for every operation."""
 
     def __init__(self, vault_path: Path) -> None:
         self.vault_path = Path(vault_path)
@@ -28,10 +52,6 @@ class VaultGit:
         result = self._run_git("status", "--porcelain")
         return result.stdout
 
-    def has_changes(self) -> bool:
-        """Check if there are uncommitted changes."""
-        return bool(self.get_status().strip())
-
     def commit_changes(self, message: str) -> bool:
         """Stage all changes and commit.
 
@@ -41,7 +61,7 @@ class VaultGit:
         Returns:
             True if commit was made, False otherwise
         """
-        if not self.has_changes():
+        if not self.get_status().strip():
             logger.info("No changes to commit")
             return False
 
@@ -60,6 +80,47 @@ class VaultGit:
         logger.info("Committed: %s", message)
         return True
 
+    def commit_paths(self, message: str, paths: list[str]) -> bool:
+        """Stage only given paths (including deletions) and commit.
+
+        Avoids scanning the whole vault with `status` and `add -A`.
+
+        Args:
+            message: Commit message
+            paths: Vault-relative files or directories
+
+        Returns:
+            True if commit was made, False if there was nothing to commit
+
+        Raises:
+            RuntimeError: If git add or git commit failed
+        """
+        existing = [p for p in paths if (self.vault_path / p).exists()]
+        missing = [p for p in paths if p not in existing]
+
+        if missing:
+            # `add` fails on pathspecs that match nothing; stage deletions
+            self._run_git(
+                "rm", "-r", "--cached", "--ignore-unmatch", "--quiet", "--", *missing
+            )
+
+        if existing:
+            add_result = self._run_git("add", "-A", "--", *existing)
+            if add_result.returncode != 0:
+                raise RuntimeError(f"Git add failed: {add_result.stderr.strip()}")
+
+        # Exit code 0 means nothing staged
+        if self._run_git("diff", "--cached", "--quiet").returncode == 0:
+            logger.info("No changes to commit")
+            return False
+
+        commit_result = self._run_git("commit", "-m", message)
+        if commit_result.returncode != 0:
+            raise RuntimeError(f"Git commit failed: {commit_result.stderr.strip()}")
+
+        logger.info("Committed %d paths: %s", len(paths), message)
+        return True
+
     def push(self) -> bool:
         """Push to remote.
 
@@ -74,6 +135,172 @@ class VaultGit:
         logger.info("Pushed to remote")
         return True
 
+
+class Pygit2GitBackend:
+    """In-process git backend on libgit2.
+
+    Blobs, trees and commits are written straight to the object store
+    through the repository index, without forking `git`. The vault may be
+    the repository root or a subdirectory of it.
+    """
+
+    def __init__(self, vault_path: Path) -> None:
+        if pygit2 is None:
+            raise RuntimeError("pygit2 is not installed")
+
+        self.vault_path = Path(vault_path).resolve()
+        repo_path = pygit2.discover_repository(str(self.vault_path))
+        if repo_path is None:
+            raise RuntimeError(f"No git repository at {self.vault_path}")
+
+        self.repo = pygit2.Repository(repo_path)
+        workdir = Path(self.repo.workdir).resolve()
+        self._prefix = self.vault_path.relative_to(workdir).as_posix()
+
+    def _repo_path(self, path: str) -> str:
+        """Convert vault-relative path to repository-relative path."""
+        if self._prefix == ".":
+            return path
+        return f"{self._prefix}/{path}"
+
+    def get_status(self) -> str:
+        """Get porcelain-style status of the vault."""
+        lines = []
+        for path, flags in self.repo.status().items():
+            if flags & pygit2.GIT_STATUS_IGNORED:
+                continue
+            if not _matches(path, [self._prefix]):
+                continue
+            code = "??" if flags == pygit2.GIT_STATUS_WT_NEW else " M"
+            lines.append(f"{code} {path}")
+        return "\n".join(lines)
+
+    def commit_changes(self, message: str) -> bool:
+        """Stage all changes in the vault and commit."""
+        return self.commit_paths(message, ["."])
+
+    def commit_paths(self, message: str, paths: list[str]) -> bool:
+        """Stage only given paths (including deletions) and commit.
+
+        Args:
+            message: Commit message
+            paths: Vault-relative files or directories
+
+        Returns:
+            True if commit was made, False if there was nothing to commit
+
+        Raises:
+            pygit2.GitError: If the index or commit could not be written
+        """
+        index = self.repo.index
+        index.read()
+
+        specs = [self._repo_path(p).removesuffix("/.") for p in paths]
+        index.add_all(specs)
+
+        # add_all doesn't stage deletions; drop entries whose files are gone
+        workdir = Path(self.repo.workdir)
+        for entry in list(index):
+            if _matches(entry.path, specs) and not (workdir / entry.path).exists():
+                index.remove(entry.path)
+
+        tree_id = index.write_tree()
+        parents = [] if self.repo.head_is_unborn else [self.repo.head.target]
+        if parents and self.repo[parents[0]].tree_id == tree_id:
+            logger.info("No changes to commit")
+            return False
+
+        index.write()
+        signature = self.repo.default_signature
+        self.repo.create_commit("HEAD", signature, signature, message, tree_id, parents)
+
+        logger.info("Committed %d paths in-process: %s", len(paths), message)
+        return True
+
+
+def _matches(path: str, specs: list[str]) -> bool:
+    """Check if repository path is one of specs or inside one of them."""
+    return any(
+        spec in (".", "") or path == spec or path.startswith(f"{spec}/")
+        for spec in specs
+    )
+
+
+def create_backend(vault_path: Path, backend: str = "auto") -> GitBackend:
+    """Create git backend by name.
+
+    Args:
+        vault_path: Vault directory
+        backend: "subprocess", "pygit2", or "auto" (pygit2 when available)
+
+    Returns:
+        Backend instance; falls back to subprocess if pygit2 can't be used
+    """
+    if backend not in GIT_BACKENDS:
+        raise ValueError(f"Unknown git backend: {backend}")
+
+    if backend != "subprocess" and pygit2 is not None:
+        try:
+            return Pygit2GitBackend(vault_path)
+        except Exception as e:
+            logger.warning("pygit2 backend unavailable, using git CLI: %s", e)
+    elif backend == "pygit2":
+        logger.warning("pygit2 is not installed, using git CLI")
+
+    return SubprocessGitBackend(vault_path)
+
+
+class VaultGit:
+    """Service for git operations on vault."""
+
+    def __init__(self, vault_path: Path, backend: str = "auto") -> None:
+        self.vault_path = Path(vault_path)
+        # Push always goes through the CLI: it owns credentials and SSH config
+        self._cli = SubprocessGitBackend(self.vault_path)
+        self.backend = create_backend(self.vault_path, backend)
+
+    def get_status(self) -> str:
+        """Get git status."""
+        return self.backend.get_status()
+
+    def has_changes(self) -> bool:
+        """Check if there are uncommitted changes."""
+        return bool(self.get_status().strip())
+
+    def commit_changes(self, message: str) -> bool:
+        """Stage all changes and commit.
+
+        Args:
+            message: Commit message
+
+        Returns:
+            True if commit was made, False otherwise
+        """
+        return self.backend.commit_changes(message)
+
+    def commit_paths(self, message: str, paths: list[str]) -> bool:
+        """Stage only given vault-relative paths and commit.
+
+        Args:
+            message: Commit message
+            paths: Vault-relative files or directories
+
+        Returns:
+            True if commit was made, False if there was nothing to commit
+
+        Raises:
+            Exception: If the backend failed to stage or commit
+        """
+        return self.backend.commit_paths(message, paths)
+
+    def push(self) -> bool:
+        """Push to remote.
+
+        Returns:
+            True if push was successful
+        """
+        return self._cli.push()
+
     def commit_and_push(self, message: str) -> bool:
         """Commit all changes and push.
 
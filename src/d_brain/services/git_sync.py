@@ -0,0 +1,213 @@
+"""Background git sync: debounced commits and scheduled pushes."""
+
+import asyncio
+import logging
+from collections.abc import Iterable
+from pathlib import Path
+
+from d_brain.services.git import VaultGit
+
+logger = logging.getLogger(__name__)
+
+COMMIT_DEBOUNCE = 10.0  # Seconds of quiet before committing
+MAX_COMMIT_DELAY = 60.0  # Commit at the latest this long after first request
+PUSH_DELAY = 30.0  # Seconds after a commit before pushing
+MAX_PUSH_BACKOFF = 3600.0
+MAX_COMMIT_BACKOFF = 600.0
+
+# Directories Claude may write during /process, /weekly and EKG sessions.
+# Attachments are staged by exact path instead of scanning the whole dir.
+CLAUDE_WRITE_PATHS = ("daily", "thoughts", "goals", "MOC", "summaries", "hypothesis")
+
+
+class GitSyncService:
+    """Coalesce commit requests into batched commits and deferred pushes.
+
+    Requests are debounced: the commit happens once no new request arrived
+    for COMMIT_DEBOUNCE seconds (or MAX_COMMIT_DELAY after the first one),
+    with all messages combined. Only requested and tracked paths are staged.
+    A failed commit keeps its messages and paths pending and is retried;
+    pushes are scheduled after commits. Both back off exponentially.
+    """
+
+    def __init__(self, git: VaultGit) -> None:
+        self.git = git
+        self._messages: list[str] = []
+        self._paths: set[str] = set()
+        self._commit_task: asyncio.Task[None] | None = None
+        self._in_flight: asyncio.Task[bool] | None = None  # Commit in a thread
+        self._push_task: asyncio.Task[None] | None = None
+        self._last_request = 0.0
+
+    def track(self, paths: Iterable[Path | str]) -> None:
+        """Include paths the bot wrote in the next commit."""
+        for path in paths:
+            self._paths.add(self._relative(path))
+
+    def request_commit(self, message: str, paths: Iterable[Path | str]) -> None:
+        """Request a commit of given paths; returns immediately.
+
+        Args:
+            message: Commit message for this change
+            paths: Vault-relative (or absolute) files or directories
+        """
+        if message not in self._messages:
+            self._messages.append(message)
+        self.track(paths)
+        self._last_request = asyncio.get_running_loop().time()
+
+        if self._commit_task is None or self._commit_task.done():
+            self._commit_task = asyncio.create_task(self._debounced_commit())
+
+    async def flush(self) -> None:
+        """Commit pending changes now and push.
+
+        A commit already running is awaited, so its thread never races the
+        flush commit for the git index.
+        """
+        if self._commit_task is not None and not self._commit_task.done():
+            self._commit_task.cancel()
+            await asyncio.gather(self._commit_task, return_exceptions=True)
+
+        committed = False
+        if self._in_flight is not None:
+            # Failure is fine: the batch went back to pending, retried below
+            (result,) = await asyncio.gather(self._in_flight, return_exceptions=True)
+            committed = result is True
+            self._in_flight = None
+
+        push_pending = False
+        if self._push_task is not None and not self._push_task.done():
+            push_pending = True
+            self._push_task.cancel()
+            await asyncio.gather(self._push_task, return_exceptions=True)
+        self._push_task = None
+
+        try:
+            committed = await self._commit() or committed
+        except Exception:
+            logger.exception("Commit on flush failed")
+
+        if committed or push_pending:
+            await asyncio.to_thread(self.git.push)
+
+    def _relative(self, path: Path | str) -> str:
+        """Convert path to vault-relative POSIX string."""
+        path = Path(path)
+        if path.is_absolute():
+            path = path.resolve().relative_to(self.git.vault_path.resolve())
+        return path.as_posix()
+
+    async def _debounced_commit(self) -> None:
+        """Wait for quiet period, then commit and schedule push.
+
+        Retries with exponential backoff while the commit fails. Requests
+        that arrived while a commit ran start a new quiet period here, as
+        request_commit() sees this task still running.
+        """
+        loop = asyncio.get_running_loop()
+        first_request = loop.time()
+        retry_delay = COMMIT_DEBOUNCE
+        while True:
+            now = loop.time()
+            quiet_until = self._last_request + COMMIT_DEBOUNCE
+            deadline = first_request + MAX_COMMIT_DELAY
+            if now < min(quiet_until, deadline):
+                await asyncio.sleep(min(quiet_until, deadline) - now)
+                continue
+
+            # Shielded: cancelling this task (flush) must not abandon the
+            # commit while its thread still holds the git index
+            self._in_flight = asyncio.create_task(self._commit())
+            try:
+                committed = await asyncio.shield(self._in_flight)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._in_flight = None
+                logger.exception(
+                    "Batched commit failed, retrying in %.0fs", retry_delay
+                )
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, MAX_COMMIT_BACKOFF)
+                continue
+
+            self._in_flight = None
+            if committed:
+                self._schedule_push()
+            if not self._messages and not self._paths:
+                return
+            first_request = loop.time()
+            retry_delay = COMMIT_DEBOUNCE
+
+    async def _commit(self) -> bool:
+        """Commit everything collected so far.
+
+        Returns:
+            True if a commit was made, False if there was nothing to commit
+
+        Raises:
+            Exception: If the commit failed; its messages and paths are
+                pending again
+        """
+        if not self._messages and not self._paths:
+            return False
+
+        pending = self._messages
+        messages = pending or ["chore: save attachments"]
+        paths = sorted(self._paths)
+        self._messages = []
+        self._paths = set()
+
+        if len(messages) == 1:
+            message = messages[0]
+        else:
+            body = "\n".join(f"- {m}" for m in messages)
+            message = f"chore: sync {len(messages)} changes\n\n{body}"
+
+        try:
+            return await asyncio.to_thread(self.git.commit_paths, message, paths)
+        except BaseException:
+            # Put the batch back ahead of anything requested meanwhile
+            self._messages = pending + [m for m in self._messages if m not in pending]
+            self._paths |= set(paths)
+            raise
+
+    def _schedule_push(self) -> None:
+        """Start push loop unless one is already pending."""
+        if self._push_task is None or self._push_task.done():
+            self._push_task = asyncio.create_task(self._push_with_retry())
+
+    async def _push_with_retry(self) -> None:
+        """Push after PUSH_DELAY, backing off exponentially on failure."""
+        delay = PUSH_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                if await asyncio.to_thread(self.git.push):
+                    return
+            except Exception:
+                logger.exception("Git push raised")
+            delay = min(delay * 2, MAX_PUSH_BACKOFF)
+            logger.warning("Git push failed, retrying in %.0fs", delay)
+
+
+_services: dict[Path, GitSyncService] = {}
+
+
+def get_git_sync(vault_path: Path, backend: str = "auto") -> GitSyncService:
+    """Get the git sync service for a vault.
+
+    The backend only applies when the service is created (at bot startup).
+    """
+    key = Path(vault_path).resolve()
+    if key not in _services:
+        _services[key] = GitSyncService(VaultGit(key, backend))
+    return _services[key]
+
+
+async def close_git_syncs() -> None:
+    """Flush pending commits and pushes of all vaults."""
+    for service in _services.values():
+        await service.flush()
+    _services.clear()
@@ -0,0 +1,279 @@
+"""Hypothesis map parser and index (format per vault/hypothesis/_schema.md)."""
+
+import asyncio
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+from d_brain.services.frontmatter import field_text, parse_frontmatter
+
+logger = logging.getLogger(__name__)
+
+MAP_DIRS = ("business", "personal", "archive")
+STALE_DAYS = 14  # Open hypotheses with no dated activity for this long
+OPEN_STATUSES = ("idea", "testing")
+
+_DATE_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+_TITLE_RE = re.compile(r"^# (?:HM:\s*)?(.+)$", re.MULTILINE)
+_OUTCOME_RE = re.compile(r"^\*\*Outcome:\*\*\s*(.+)$", re.MULTILINE)
+_HYPOTHESIS_RE = re.compile(r"^### (H\d+):\s*(.+)$", re.MULTILINE)
+_STATUS_RE = re.compile(r"^\*\*Status:\*\*\s*(\w+)", re.MULTILINE)
+_SECTION_RE = re.compile(r"^## ", re.MULTILINE)
+
+
+def _parse_date(value: str) -> date | None:
+    """Parse YYYY-MM-DD, None if absent or malformed."""
+    try:
+        return date.fromisoformat(value.strip()[:10])
+    except ValueError:
+        return None
+
+
+def _section(body: str, heading: str) -> str:
+    """Text of a `## heading` section up to the next `## `."""
+    match = re.search(rf"^## {re.escape(heading)}\s*$", body, re.MULTILINE)
+    if not match:
+        return ""
+    end = _SECTION_RE.search(body, match.end())
+    return body[match.end() : end.start() if end else len(body)]
+
+
+@dataclass
+class Metric:
+    """Row of the Metrics table."""
+
+    kind: str  # Subjective / Objective
+    name: str
+    current: str
+    target: str
+    deadline: str
+
+
+@dataclass
+class Hypothesis:
+    """One `### Hn: name` block."""
+
+    code: str
+    name: str
+    status: str
+    evidence_done: int = 0
+    evidence_total: int = 0
+    last_activity: date | None = None  # Latest date in experiments or evidence
+
+    def is_stale(self, today: date, map_updated: date | None) -> bool:
+        """Open hypothesis with no activity for STALE_DAYS."""
+        if self.status not in OPEN_STATUSES:
+            return False
+        dates = [d for d in (self.last_activity, map_updated) if d]
+        return bool(dates) and (today - max(dates)).days >= STALE_DAYS
+
+
+@dataclass
+class HypothesisMap:
+    """Parsed hypothesis map file."""
+
+    path: str  # Vault-relative
+    title: str
+    domain: str
+    status: str
+    outcome: str = ""
+    created: date | None = None
+    updated: date | None = None
+    next_review: date | None = None
+    review_cadence: str = ""
+    metrics: list[Metric] = field(default_factory=list)
+    hypotheses: list[Hypothesis] = field(default_factory=list)
+
+    @property
+    def slug(self) -> str:
+        """File name without extension, as used by `/hypothesis review`."""
+        return Path(self.path).stem
+
+    @property
+    def key_metric(self) -> Metric | None:
+        """First objective metric, else the first metric."""
+        for metric in self.metrics:
+            if metric.kind.lower() == "objective":
+                return metric
+        return self.metrics[0] if self.metrics else None
+
+    def count(self, status: str) -> int:
+        """Number of hypotheses with status."""
+        return sum(1 for h in self.hypotheses if h.status == status)
+
+    def is_overdue(self, today: date) -> bool:
+        """Active map whose next review date has passed."""
+        return (
+            self.status == "active"
+            and self.next_review is not None
+            and self.next_review < today
+        )
+
+    def stale_hypotheses(self, today: date) -> list[Hypothesis]:
+        """Open hypotheses without recent activity."""
+        return [h for h in self.hypotheses if h.is_stale(today, self.updated)]
+
+
+def _parse_metrics(goal_section: str) -> list[Metric]:
+    """Rows of the first table under `### Metrics`."""
+    match = re.search(r"^### Metrics\s*$", goal_section, re.MULTILINE)
+    if not match:
+        return []
+
+    metrics = []
+    for line in goal_section[match.end() :].splitlines():
+        line = line.strip()
+        if line.startswith("###"):
+            break
+        if not line.startswith("|"):
+            continue
+        cells = [cell.strip() for cell in line.strip("|").split("|")]
+        if len(cells) < 5 or cells[0] in ("Type", "") or set(cells[0]) <= {"-"}:
+            continue
+        metrics.append(Metric(*cells[:5]))
+    return metrics
+
+
+def _parse_hypotheses(section: str) -> list[Hypothesis]:
+    """`### Hn:` blocks of the Hypotheses section."""
+    matches = list(_HYPOTHESIS_RE.finditer(section))
+    hypotheses = []
+
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(section)
+        block = section[match.end() : end]
+        status = _STATUS_RE.search(block)
+        dates = [d for d in map(_parse_date, _DATE_RE.findall(block)) if d]
+        hypotheses.append(
+            Hypothesis(
+                code=match.group(1),
+                name=match.group(2).strip(),
+                status=status.group(1).lower() if status else "idea",
+                evidence_done=len(re.findall(r"^- \[[xX]\]", block, re.MULTILINE)),
+                evidence_total=len(re.findall(r"^- \[[ xX]\]", block, re.MULTILINE)),
+                last_activity=max(dates) if dates else None,
+            )
+        )
+    return hypotheses
+
+
+def parse_hypothesis_map(content: str, path: str) -> HypothesisMap:
+    """Parse hypothesis map markdown.
+
+    Args:
+        content: File text
+        path: Vault-relative path (domain falls back to the directory)
+
+    Returns:
+        Parsed map; missing sections leave defaults
+    """
+    fields, body = parse_frontmatter(content)
+    title = _TITLE_RE.search(body)
+    outcome = _OUTCOME_RE.search(body)
+    parts = Path(path).parts
+    default_domain = parts[-2] if len(parts) >= 2 else ""
+
+    status = field_text(fields.get("status")) or "active"
+    if default_domain == "archive":
+        status = "archived"
+
+    return HypothesisMap(
+        path=path,
+        title=title.group(1).strip() if title else Path(path).stem,
+        domain=field_text(fields.get("domain")) or default_domain,
+        status=status,
+        outcome=outcome.group(1).strip() if outcome else "",
+        created=_parse_date(field_text(fields.get("created"))),
+        updated=_parse_date(field_text(fields.get("updated"))),
+        next_review=_parse_date(field_text(fields.get("next_review"))),
+        review_cadence=field_text(fields.get("review_cadence")),
+        metrics=_parse_metrics(_section(body, "Goal")),
+        hypotheses=_parse_hypotheses(_section(body, "Hypotheses")),
+    )
+
+
+class HypothesisIndex:
+    """All hypothesis maps of a vault, reparsed only when a file changes.
+
+    A scan is one stat() per file under hypothesis/{business,personal,
+    archive}; unchanged files reuse the cached parse.
+    """
+
+    def __init__(self, vault_path: Path) -> None:
+        self.vault_path = Path(vault_path)
+        self.root = self.vault_path / "hypothesis"
+        self._lock = threading.Lock()
+        self._cache: dict[Path, tuple[tuple[int, int], HypothesisMap]] = {}
+
+    async def maps(self) -> list[HypothesisMap]:
+        """Get all maps, sorted by domain and title (scans in a thread)."""
+        return await asyncio.to_thread(self._scan)
+
+    def _scan(self) -> list[HypothesisMap]:
+        with self._lock:
+            seen = set()
+            for dir_name in MAP_DIRS:
+                for path in sorted((self.root / dir_name).glob("*.md")):
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    seen.add(path)
+                    signature = (stat.st_mtime_ns, stat.st_size)
+                    cached = self._cache.get(path)
+                    if cached and cached[0] == signature:
+                        continue
+                    try:
+                        content = path.read_text(encoding="utf-8")
+                    except (OSError, UnicodeDecodeError) as e:
+                        logger.warning("Can't read hypothesis map %s: %s", path, e)
+                        continue
+                    relative = path.relative_to(self.vault_path).as_posix()
+                    self._cache[path] = (
+                        signature,
+                        parse_hypothesis_map(content, relative),
+                    )
+
+            for path in self._cache.keys() - seen:
+                del self._cache[path]
+
+            return sorted(
+                (hm for _, hm in self._cache.values()),
+                key=lambda hm: (hm.domain, hm.title.lower()),
+            )
+
+
+def summarize_maps(maps: list[HypothesisMap], today: date) -> str:
+    """Plain-text overview of maps for a Claude prompt.
+
+    Lets Claude open only the maps it needs instead of reading them all.
+    """
+    lines = []
+    for hm in maps:
+        flags = []
+        if hm.is_overdue(today):
+            flags.append(f"review overdue since {hm.next_review}")
+        stale = hm.stale_hypotheses(today)
+        if stale:
+            flags.append("stale: " + ", ".join(h.code for h in stale))
+
+        lines.append(f"- {hm.path} [{hm.domain}, {hm.status}] {hm.title}")
+        if hm.outcome:
+            lines.append(f"  Goal: {hm.outcome}")
+        for metric in hm.metrics:
+            lines.append(
+                f"  Metric ({metric.kind}): {metric.name}: "
+                f"{metric.current} → {metric.target} by {metric.deadline}"
+            )
+        for h in hm.hypotheses:
+            lines.append(
+                f"  {h.code} {h.name}: {h.status}, "
+                f"evidence {h.evidence_done}/{h.evidence_total}, "
+                f"last activity {h.last_activity or 'none'}"
+            )
+        if flags:
+            lines.append(f"  Attention: {'; '.join(flags)}")
+    return "\n".join(lines)
@@ -0,0 +1,226 @@
+"""Single-flight registry for long Claude jobs, shared between processes."""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import re
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from d_brain.services.storage import STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 2.0  # Seconds between checks on another process's job
+
+PartialCallback = Callable[[str], Awaitable[None]]
+JobFactory = Callable[[PartialCallback], Awaitable[dict[str, Any]]]
+
+
+def job_name(operation: str, key: str) -> str:
+    """File-safe job name, e.g. process-2026-10-18."""
+    return re.sub(r"[^\w.-]", "_", f"{operation}-{key}")
+
+
+@dataclass
+class _Job:
+    """Running job and the callers attached to it."""
+
+    task: asyncio.Task[dict[str, Any]] | None = None
+    subscribers: list[PartialCallback] = field(default_factory=list)
+    partial: str = ""  # Latest partial output, replayed to late joiners
+
+
+class JobRegistry:
+    """Run at most one job per operation and key, across processes.
+
+    A job is identified by operation and key ("process" + date, "weekly" +
+    ISO week). While it runs, an flock on .d-brain/jobs/<name>.lock is
+    held, so the bot and the timer scripts see each other's runs. A second
+    request for the same job attaches to it instead of starting another
+    Claude run: in-process callers get its partial output as it arrives
+    and share its result. If another process holds the lock, one task
+    follows its partial output file and, when the lock is released, takes
+    the report it left in <name>.json; if it left none (crashed), the job
+    runs here.
+    """
+
+    def __init__(self, vault_path: Path) -> None:
+        self.jobs_dir = Path(vault_path) / STATE_DIR / "jobs"
+        self._jobs: dict[str, _Job] = {}
+
+    def running(self, operation: str, key: str) -> bool:
+        """Whether the job is running in this or another process."""
+        name = job_name(operation, key)
+        if name in self._jobs:
+            return True
+        fd = self._try_lock(name)
+        if fd is None:
+            return True
+        os.close(fd)
+        return False
+
+    async def run(
+        self,
+        operation: str,
+        key: str,
+        factory: JobFactory,
+        on_partial: PartialCallback | None = None,
+    ) -> dict[str, Any]:
+        """Run job, or attach to the same job already running.
+
+        Args:
+            operation: Job kind, e.g. "process"
+            key: Job instance, e.g. the date
+            factory: Starts the job given a partial-output callback; only
+                called if no run is in progress
+            on_partial: Receives the job's partial output
+
+        Returns:
+            The job's report (shared by all attached callers)
+        """
+        name = job_name(operation, key)
+        job = self._jobs.get(name)
+        if job is None:
+            job = _Job()
+            self._jobs[name] = job
+            job.task = asyncio.create_task(
+                self._execute(name, job, factory), name=f"job-{name}"
+            )
+            job.task.add_done_callback(lambda _: self._forget(name, job))
+        else:
+            logger.info("Attaching to running job %s", name)
+            if on_partial is not None and job.partial:
+                await on_partial(job.partial)
+
+        if on_partial is not None:
+            job.subscribers.append(on_partial)
+        assert job.task is not None
+        try:
+            # A caller giving up must not cancel the job for everyone else
+            return await asyncio.shield(job.task)
+        finally:
+            if on_partial in job.subscribers:
+                job.subscribers.remove(on_partial)
+
+    async def close(self) -> None:
+        """Cancel running jobs and release their locks."""
+        tasks = [job.task for job in self._jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _forget(self, name: str, job: _Job) -> None:
+        if self._jobs.get(name) is job:
+            del self._jobs[name]
+
+    async def _execute(
+        self, name: str, job: _Job, factory: JobFactory
+    ) -> dict[str, Any]:
+        """Run job under its lock, or wait for another process's run."""
+        waiting_since = time.time()
+        fd = await asyncio.to_thread(self._try_lock, name)
+        if fd is None:
+            logger.info("Job %s is running in another process, following it", name)
+            fd = await self._follow(name, job)
+            try:
+                result = await asyncio.to_thread(
+                    self._read_result, name, waiting_since
+                )
+            except BaseException:
+                os.close(fd)
+                raise
+            if result is not None:
+                os.close(fd)
+                return result
+            logger.warning("Job %s ended elsewhere without a report, running it", name)
+
+        partial_path = self._path(name, "partial")
+
+        async def on_partial(text: str) -> None:
+            await self._publish(job, text)
+            await asyncio.to_thread(_write_atomic, partial_path, text)
+
+        try:
+            logger.info("Job %s started", name)
+            result = await factory(on_partial)
+            await asyncio.to_thread(
+                _write_atomic,
+                self._path(name, "json"),
+                json.dumps({"finished": time.time(), "report": result}),
+            )
+            return result
+        finally:
+            partial_path.unlink(missing_ok=True)
+            os.close(fd)
+
+    async def _follow(self, name: str, job: _Job) -> int:
+        """Relay another process's partial output until its lock is free.
+
+        Returns:
+            Descriptor holding the lock
+        """
+        partial_path = self._path(name, "partial")
+        seen = 0
+        while True:
+            fd = await asyncio.to_thread(self._try_lock, name)
+            if fd is not None:
+                return fd
+            try:
+                mtime = partial_path.stat().st_mtime_ns
+                if mtime != seen:
+                    seen = mtime
+                    await self._publish(job, partial_path.read_text(encoding="utf-8"))
+            except OSError:
+                pass
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def _publish(self, job: _Job, text: str) -> None:
+        """Pass partial output to every attached caller."""
+        job.partial = text
+        for callback in list(job.subscribers):
+            try:
+                await callback(text)
+            except Exception:
+                logger.exception("Job partial output callback failed")
+
+    def _path(self, name: str, suffix: str) -> Path:
+        return self.jobs_dir / f"{name}.{suffix}"
+
+    def _try_lock(self, name: str) -> int | None:
+        """Take the job's flock without waiting.
+
+        Returns:
+            Descriptor holding the lock (close it to release), or None if
+            another process holds it
+        """
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self._path(name, "lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    def _read_result(self, name: str, since: float) -> dict[str, Any] | None:
+        """Report of a run that finished after `since`, if any."""
+        try:
+            saved = json.loads(self._path(name, "json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if saved.get("finished", 0) < since:
+            return None
+        return saved.get("report")
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Replace file contents so readers never see a partial write."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
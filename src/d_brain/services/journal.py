@@ -0,0 +1,179 @@
+"""Single-writer append journal for daily files."""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import TextIO
+
+from d_brain.services.storage import VaultStorage
+
+logger = logging.getLogger(__name__)
+
+BATCH_WINDOW = 0.05  # Seconds to wait for more entries before committing
+MAX_BATCH = 200
+
+
+@dataclass(order=True)
+class _PendingEntry:
+    """Entry waiting to be written."""
+
+    timestamp: datetime
+    seq: int
+    msg_type: str = field(compare=False)
+    entry: str = field(compare=False)
+    future: asyncio.Future[Path] = field(compare=False)
+
+
+class AppendJournal:
+    """Batch daily-file appends from all handlers through one writer task.
+
+    Entries that arrive together are sorted by Telegram timestamp, written
+    through one long-lived handle per day and made durable with a single
+    fsync per file per batch (group commit). File I/O runs in a thread so
+    bursts of forwards don't block the event loop.
+    """
+
+    def __init__(self, storage: VaultStorage) -> None:
+        self.storage = storage
+        self._queue: asyncio.Queue[_PendingEntry] = asyncio.Queue()
+        self._writer: asyncio.Task[None] | None = None
+        self._handles: dict[date, TextIO] = {}
+        self._seq = 0
+
+    def start(self) -> None:
+        """Start writer task (idempotent)."""
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._run(), name="append-journal")
+
+    async def stop(self) -> None:
+        """Flush queued entries, stop writer and close file handles."""
+        if self._writer is not None:
+            await self._queue.join()
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+        await asyncio.to_thread(self._close_handles, None)
+
+    async def append(self, text: str, timestamp: datetime, msg_type: str) -> Path:
+        """Queue entry and wait until it is durably written.
+
+        Args:
+            text: Content to append
+            timestamp: Entry timestamp (Telegram message date)
+            msg_type: Type marker like [voice], [text], [photo]
+
+        Returns:
+            Path to the daily file the entry was written to
+        """
+        self.start()
+        self._seq += 1
+        pending = _PendingEntry(
+            timestamp=timestamp,
+            seq=self._seq,
+            msg_type=msg_type,
+            entry=VaultStorage.format_entry(text, timestamp, msg_type),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        await self._queue.put(pending)
+        return await pending.future
+
+    async def _run(self) -> None:
+        """Writer loop: collect a batch, write it, resolve futures."""
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(BATCH_WINDOW)
+            while not self._queue.empty() and len(batch) < MAX_BATCH:
+                batch.append(self._queue.get_nowait())
+
+            batch.sort()
+            try:
+                paths = await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                logger.exception("Failed to write %d journal entries", len(batch))
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+            else:
+                for pending, path in zip(batch, paths, strict=True):
+                    if not pending.future.done():
+                        pending.future.set_result(path)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: list[_PendingEntry]) -> list[Path]:
+        """Write sorted batch and fsync each touched file once."""
+        paths = []
+        touched: dict[date, TextIO] = {}
+        appended: dict[date, list[_PendingEntry]] = {}
+
+        for pending in batch:
+            day = pending.timestamp.date()
+            handle = self._handle(day)
+            handle.write(pending.entry)
+            touched[day] = handle
+            appended.setdefault(day, []).append(pending)
+            paths.append(self.storage.get_daily_file(day))
+
+        for handle in touched.values():
+            handle.flush()
+            os.fsync(handle.fileno())
+
+        for day, entries in appended.items():
+            self.storage.record_appended(
+                day,
+                [(p.timestamp, p.msg_type) for p in entries],
+                sum(len(p.entry.encode()) for p in entries),
+            )
+            self.storage.notify_written(self.storage.get_daily_file(day))
+
+        # Roll over: keep only the newest day's handle open
+        self._close_handles(max(self._handles))
+        logger.debug("Journal committed %d entries", len(batch))
+        return paths
+
+    def _handle(self, day: date) -> TextIO:
+        """Get append handle for day, reopening if file was replaced."""
+        path = self.storage.get_daily_file(day)
+        handle = self._handles.get(day)
+
+        if handle is not None:
+            # Editors and Claude may rewrite the file; follow the new inode
+            try:
+                same_file = os.stat(path).st_ino == os.fstat(handle.fileno()).st_ino
+            except FileNotFoundError:
+                same_file = False
+            if same_file:
+                return handle
+            handle.close()
+
+        handle = path.open("a", encoding="utf-8")
+        self._handles[day] = handle
+        return handle
+
+    def _close_handles(self, keep: date | None) -> None:
+        """Close all handles except the one for `keep`."""
+        for day in list(self._handles):
+            if day != keep:
+                self._handles.pop(day).close()
+
+
+_journals: dict[Path, AppendJournal] = {}
+
+
+def get_journal(vault_path: Path) -> AppendJournal:
+    """Get the append journal for a vault (one writer per vault)."""
+    key = Path(vault_path).resolve()
+    if key not in _journals:
+        _journals[key] = AppendJournal(VaultStorage(key))
+    return _journals[key]
+
+
+async def close_journals() -> None:
+    """Flush and close all journals."""
+    for journal in _journals.values():
+        await journal.stop()
+    _journals.clear()
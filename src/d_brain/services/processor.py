@@ -1,81 +1,198 @@
 """Claude processing service."""
 
+import json
 import logging
-import os
-import shutil
 import subprocess
+from collections.abc import Awaitable, Callable
 from datetime import date
 from pathlib import Path
 from typing import Any
 
+from d_brain.services.claude_runner import (
+    DEFAULT_USER_KEY,
+    ClaudeRunner,
+    get_claude_runner,
+)
+from d_brain.services.prompts import (
+    FileFragment,
+    PromptBuilder,
+    PromptTemplate,
+    html_output,
+    mcp_rules,
+)
+from d_brain.services.watermarks import WatermarkIndex
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_TIMEOUT = 1200  # 20 minutes
+
+PartialCallback = Callable[[str], Awaitable[None]]
 
-def _get_claude_path() -> str:
-    """Get path to Claude CLI dynamically.
 
-    Uses claude-proxy to route through VPN for regions where API is blocked.
+class StreamJsonParser:
+    """Collect Claude CLI `--output-format stream-json` events.
+
+    Each assistant turn's text is forwarded to the callback as soon as it
+    arrives; the final `result` event replaces it as the report.
     """
-    # Prefer claude-proxy for VPN routing
-    proxy_path = shutil.which("claude-proxy")
-    if proxy_path:
-        return proxy_path
-    # Fallback to direct claude
-    return shutil.which("claude") or "/opt/homebrew/bin/claude"
 
+    def __init__(self, on_partial: PartialCallback) -> None:
+        self.on_partial = on_partial
+        self.text = ""
+        self.result: str | None = None
+        self.is_error = False
+
+    async def feed(self, line: str) -> None:
+        """Handle one stdout line."""
+        line = line.strip()
+        if not line:
+            return
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            logger.debug("Skipping non-JSON output line: %s", line[:200])
+            return
+
+        event_type = event.get("type")
+        if event_type == "assistant":
+            content = event.get("message", {}).get("content", [])
+            text = "".join(
+                block.get("text", "")
+                for block in content
+                if block.get("type") == "text"
+            ).strip()
+            if text:
+                self.text = text
+                await self.on_partial(text)
+        elif event_type == "result":
+            self.result = str(event.get("result") or "")
+            self.is_error = bool(event.get("is_error"))
+
+    @property
+    def output(self) -> str:
+        """Final report text."""
+        return self.result if self.result is not None else self.text
+
+
+_SKILL_BLOCK = PromptTemplate("""=== SKILL INSTRUCTIONS ===
+{skill}
+=== END SKILL ===""")
+
+_REFERENCE_BLOCK = PromptTemplate("""=== TODOIST REFERENCE ===
+{reference}
+=== END REFERENCE ===""")
+
+_NEW_ENTRIES_BLOCK = PromptTemplate("""=== NEW ENTRIES ({count} of {total}) ===
+{entries}
+=== END ENTRIES ===
+
+ИНКРЕМЕНТАЛЬНАЯ ОБРАБОТКА:
+- Обработай ТОЛЬКО записи из блока NEW ENTRIES
+- Остальные записи daily/{day}.md уже обработаны — НЕ перечитывай файл целиком
+- Отчёт только по новым записям""")
+
+_ASSISTANT_CONTEXT = PromptTemplate("""Ты - персональный ассистент d-brain.
 
-def _run_claude(args: list[str], cwd: Path, env: dict, timeout: int) -> subprocess.CompletedProcess:
-    """Run Claude CLI through login shell to ensure proper environment.
+CONTEXT:
+- Текущая дата: {today}
+- Vault path: {vault_path}""")
 
-    OAuth tokens require login shell environment to be accessible.
-    """
-    claude_path = _get_claude_path()
-    # Build command string for bash -l -c
-    # Escape single quotes in args
-    escaped_args = []
-    for arg in args:
-        escaped = arg.replace("'", "'\"'\"'")
-        escaped_args.append(f"'{escaped}'")
-    cmd_str = f"{claude_path} {' '.join(escaped_args)}"
-
-    return subprocess.run(
-        ["bash", "-l", "-c", cmd_str],
-        cwd=cwd,
-        capture_output=True,
-        text=True,
-        timeout=timeout,
-        check=False,
-        env=env,
-    )
+_EXECUTION_STEPS = """EXECUTION:
+1. Analyze the request
+2. Call MCP tools directly (mcp__todoist__*, read/write files)
+3. Return HTML status report with results"""
 
-DEFAULT_TIMEOUT = 1200  # 20 minutes
+_WEEKLY_WORKFLOW = """WORKFLOW:
+1. Собери данные за неделю (daily файлы в vault/daily/, completed tasks через MCP)
+2. Проанализируй прогресс по целям (goals/3-weekly.md)
+3. Определи победы и вызовы
+4. Сгенерируй HTML отчёт"""
 
 
 class ClaudeProcessor:
     """Service for triggering Claude Code processing."""
 
-    def __init__(self, vault_path: Path, todoist_api_key: str = "") -> None:
+    def __init__(
+        self,
+        vault_path: Path,
+        todoist_api_key: str = "",
+        runner: ClaudeRunner | None = None,
+    ) -> None:
         self.vault_path = Path(vault_path)
         self.todoist_api_key = todoist_api_key
+        self.runner = runner or get_claude_runner()
+        self.watermarks = WatermarkIndex(self.vault_path)
         self._mcp_config_path = (self.vault_path.parent / "mcp-config.json").resolve()
+        skill_dir = self.vault_path / ".claude/skills/dbrain-processor"
+        self._skill = FileFragment(skill_dir / "SKILL.md")
+        self._todoist_reference = FileFragment(skill_dir / "references/todoist.md")
+
+    async def _run_claude(
+        self,
+        prompt: str,
+        user_key: str,
+        on_partial: PartialCallback | None = None,
+        session_id: str | None = None,
+        resume: bool = False,
+    ) -> subprocess.CompletedProcess[str]:
+        """Run Claude CLI with MCP config and the given prompt.
+
+        With on_partial, output is requested as stream-json and each
+        assistant turn is passed to the callback while the CLI is running.
+        stdout of the returned process is always the final report text.
+
+        With session_id, the conversation is saved under that id (a UUID),
+        or continued from it if resume is set.
+        """
+        # Pass TODOIST_API_KEY to Claude subprocess
+        env: dict[str, str] = {}
+        if self.todoist_api_key:
+            env["TODOIST_API_KEY"] = self.todoist_api_key
+
+        args = [
+            "--print",
+            "--dangerously-skip-permissions",
+            "--mcp-config",
+            str(self._mcp_config_path),
+        ]
+        if session_id:
+            args += ["--resume" if resume else "--session-id", session_id]
+
+        if on_partial is None:
+            return await self.runner.run(
+                [*args, "-p", prompt],
+                cwd=self.vault_path.parent,
+                env=env,
+                timeout=DEFAULT_TIMEOUT,
+                user_key=user_key,
+            )
+
+        parser = StreamJsonParser(on_partial)
+        result = await self.runner.run(
+            [*args, "--output-format", "stream-json", "--verbose", "-p", prompt],
+            cwd=self.vault_path.parent,
+            env=env,
+            timeout=DEFAULT_TIMEOUT,
+            user_key=user_key,
+            on_line=parser.feed,
+        )
+        returncode = result.returncode or int(parser.is_error)
+        return subprocess.CompletedProcess(
+            result.args, returncode, parser.output, result.stderr
+        )
 
     def _load_skill_content(self) -> str:
         """Load dbrain-processor skill content for inclusion in prompt.
 
         NOTE: @vault/ references don't work in --print mode,
         so we must include skill content directly in the prompt.
+        Re-read only when the file changes.
         """
-        skill_path = self.vault_path / ".claude/skills/dbrain-processor/SKILL.md"
-        if skill_path.exists():
-            return skill_path.read_text()
-        return ""
+        return self._skill.read()
 
     def _load_todoist_reference(self) -> str:
-        """Load Todoist reference for inclusion in prompt."""
-        ref_path = self.vault_path / ".claude/skills/dbrain-processor/references/todoist.md"
-        if ref_path.exists():
-            return ref_path.read_text()
-        return ""
+        """Load Todoist reference for inclusion in prompt (cached by mtime)."""
+        return self._todoist_reference.read()
 
     def _html_to_markdown(self, html: str) -> str:
         """Convert Telegram HTML to Obsidian Markdown."""
@@ -134,11 +251,23 @@ week: {year}-W{week:02d}
                 moc_path.write_text(content)
                 logger.info("Updated MOC-weekly.md with link to %s", summary_path.stem)
 
-    def process_daily(self, day: date | None = None) -> dict[str, Any]:
+    async def process_daily(
+        self,
+        day: date | None = None,
+        user_key: str = DEFAULT_USER_KEY,
+        on_partial: PartialCallback | None = None,
+        incremental: bool = True,
+    ) -> dict[str, Any]:
         """Process daily file with Claude.
 
+        In incremental mode only entries added since the last successful
+        run are sent to Claude; a day with no new entries skips Claude.
+
         Args:
             day: Date to process (default: today)
+            user_key: Fairness key for the Claude runner queue
+            on_partial: Receives partial output while Claude is running
+            incremental: Process only entries newer than the watermark
 
         Returns:
             Processing report as dict
@@ -155,49 +284,56 @@ week: {year}-W{week:02d}
                 "processed_entries": 0,
             }
 
-        # Load skill content directly (@ references don't work in --print mode)
-        skill_content = self._load_skill_content()
-
-        prompt = f"""Сегодня {day}. Выполни ежедневную обработку.
+        content = daily_file.read_text(encoding="utf-8")
+        processed, pending = self.watermarks.split_entries(day, content)
+        if not incremental:
+            pending = processed + pending
+            processed = []
 
-=== SKILL INSTRUCTIONS ===
-{skill_content}
-=== END SKILL ===
-
-ПЕРВЫМ ДЕЛОМ: вызови mcp__todoist__user-info чтобы убедиться что MCP работает.
+        if not pending:
+            logger.info("No new entries for %s since last run", day)
+            return {
+                "report": (
+                    "📭 <b>Новых записей нет</b>\n\n"
+                    f"<i>Все записи за {day} уже обработаны</i>"
+                ),
+                "processed_entries": 0,
+            }
 
-CRITICAL MCP RULE:
-- ТЫ ИМЕЕШЬ ДОСТУП к mcp__todoist__* tools — ВЫЗЫВАЙ ИХ НАПРЯМУЮ
-- НИКОГДА не пиши "MCP недоступен" или "добавь вручную"
-- Для задач: вызови mcp__todoist__add-tasks tool
-- Если tool вернул ошибку — покажи ТОЧНУЮ ошибку в отчёте
+        # Load skill content directly (@ references don't work in --print mode)
+        skill_content = self._load_skill_content()
 
-CRITICAL OUTPUT FORMAT:
-- Return ONLY raw HTML for Telegram (parse_mode=HTML)
-- NO markdown: no **, no ## , no ```, no tables
-- Start directly with 📊 <b>Обработка за {day}</b>
-- Allowed tags: <b>, <i>, <code>, <s>, <u>
-- If entries already processed, return status report in same HTML format"""
+        builder = PromptBuilder("process_daily")
+        builder.add("header", f"Сегодня {day}. Выполни ежедневную обработку.")
+        builder.add("skill", _SKILL_BLOCK.render(skill=skill_content))
+        builder.add(
+            "mcp_rules",
+            mcp_rules("Для задач: вызови mcp__todoist__add-tasks tool"),
+        )
+        builder.add(
+            "output_format",
+            html_output(
+                start=f"directly with 📊 <b>Обработка за {day}</b>",
+                notes=(
+                    "If entries already processed, "
+                    "return status report in same HTML format",
+                ),
+            ),
+        )
+        if processed:
+            builder.add(
+                "new_entries",
+                _NEW_ENTRIES_BLOCK.render(
+                    count=len(pending),
+                    total=len(processed) + len(pending),
+                    entries="\n\n".join(entry.render() for entry in pending),
+                    day=day,
+                ),
+            )
+        prompt = builder.build().text
 
         try:
-            # Pass TODOIST_API_KEY to Claude subprocess
-            env = os.environ.copy()
-            if self.todoist_api_key:
-                env["TODOIST_API_KEY"] = self.todoist_api_key
-
-            result = _run_claude(
-                [
-                    "--print",
-                    "--dangerously-skip-permissions",
-                    "--mcp-config",
-                    str(self._mcp_config_path),
-                    "-p",
-                    prompt,
-                ],
-                cwd=self.vault_path.parent,
-                env=env,
-                timeout=DEFAULT_TIMEOUT,
-            )
+            result = await self._run_claude(prompt, user_key, on_partial)
 
             if result.returncode != 0:
                 error_msg = result.stderr or result.stdout or "Claude processing failed"
@@ -207,11 +343,13 @@ CRITICAL OUTPUT FORMAT:
                     "processed_entries": 0,
                 }
 
+            self.watermarks.mark_processed(day, pending)
+
             # Return human-readable output
             output = result.stdout.strip()
             return {
                 "report": output,
-                "processed_entries": 1,  # успешно обработано
+                "processed_entries": len(pending),
             }
 
         except subprocess.TimeoutExpired:
@@ -233,11 +371,21 @@ CRITICAL OUTPUT FORMAT:
                 "processed_entries": 0,
             }
 
-    def execute_prompt(self, user_prompt: str) -> dict[str, Any]:
+    async def execute_prompt(
+        self,
+        user_prompt: str,
+        user_key: str = DEFAULT_USER_KEY,
+        on_partial: PartialCallback | None = None,
+        session_id: str | None = None,
+    ) -> dict[str, Any]:
         """Execute arbitrary prompt with Claude.
 
         Args:
             user_prompt: User's natural language request
+            user_key: Fairness key for the Claude runner queue
+            on_partial: Receives partial output while Claude is running
+            session_id: Save the conversation under this UUID so later
+                turns can go through continue_session
 
         Returns:
             Execution report as dict
@@ -247,56 +395,25 @@ CRITICAL OUTPUT FORMAT:
         # Load todoist reference for task operations
         todoist_ref = self._load_todoist_reference()
 
-        prompt = f"""Ты - персональный ассистент d-brain.
-
-CONTEXT:
-- Текущая дата: {today}
-- Vault path: {self.vault_path}
-
-=== TODOIST REFERENCE ===
-{todoist_ref}
-=== END REFERENCE ===
-
-ПЕРВЫМ ДЕЛОМ: вызови mcp__todoist__user-info чтобы убедиться что MCP работает.
-
-CRITICAL MCP RULE:
-- ТЫ ИМЕЕШЬ ДОСТУП к mcp__todoist__* tools — ВЫЗЫВАЙ ИХ НАПРЯМУЮ
-- НИКОГДА не пиши "MCP недоступен" или "добавь вручную"
-- Если tool вернул ошибку — покажи ТОЧНУЮ ошибку в отчёте
-
-USER REQUEST:
-{user_prompt}
-
-CRITICAL OUTPUT FORMAT:
-- Return ONLY raw HTML for Telegram (parse_mode=HTML)
-- NO markdown: no **, no ##, no ```, no tables, no -
-- Start with emoji and <b>header</b>
-- Allowed tags: <b>, <i>, <code>, <s>, <u>
-- Be concise - Telegram has 4096 char limit
-
-EXECUTION:
-1. Analyze the request
-2. Call MCP tools directly (mcp__todoist__*, read/write files)
-3. Return HTML status report with results"""
+        builder = PromptBuilder("execute_prompt")
+        builder.add(
+            "context",
+            _ASSISTANT_CONTEXT.render(today=today, vault_path=self.vault_path),
+        )
+        builder.add("todoist_reference", _REFERENCE_BLOCK.render(reference=todoist_ref))
+        builder.add("mcp_rules", mcp_rules())
+        builder.add("user_request", f"USER REQUEST:\n{user_prompt}")
+        builder.add(
+            "output_format",
+            html_output(
+                start="with emoji and <b>header</b>", extra_markdown="no -"
+            ),
+        )
+        builder.add("execution", _EXECUTION_STEPS)
+        prompt = builder.build().text
 
         try:
-            env = os.environ.copy()
-            if self.todoist_api_key:
-                env["TODOIST_API_KEY"] = self.todoist_api_key
-
-            result = _run_claude(
-                [
-                    "--print",
-                    "--dangerously-skip-permissions",
-                    "--mcp-config",
-                    str(self._mcp_config_path),
-                    "-p",
-                    prompt,
-                ],
-                cwd=self.vault_path.parent,
-                env=env,
-                timeout=DEFAULT_TIMEOUT,
-            )
+            result = await self._run_claude(prompt, user_key, on_partial, session_id)
 
             if result.returncode != 0:
                 error_msg = result.stderr or result.stdout or "Claude execution failed"
@@ -321,55 +438,84 @@ EXECUTION:
             logger.exception("Unexpected error during execution")
             return {"error": str(e), "processed_entries": 0}
 
-    def generate_weekly(self) -> dict[str, Any]:
-        """Generate weekly digest with Claude.
+    async def continue_session(
+        self,
+        session_id: str,
+        message: str,
+        user_key: str = DEFAULT_USER_KEY,
+        on_partial: PartialCallback | None = None,
+    ) -> dict[str, Any]:
+        """Send the next message of a saved Claude conversation.
+
+        Only the message is sent; instructions and earlier turns (and any
+        files Claude already read) come from the resumed session.
+
+        Args:
+            session_id: Id passed to execute_prompt when the session started
+            message: New message for Claude
+            user_key: Fairness key for the Claude runner queue
+            on_partial: Receives partial output while Claude is running
 
         Returns:
-            Weekly digest report as dict
+            Execution report as dict; 'error' if the session can't be resumed
         """
-        today = date.today()
+        try:
+            result = await self._run_claude(
+                message, user_key, on_partial, session_id, resume=True
+            )
+
+            if result.returncode != 0:
+                error_msg = result.stderr or result.stdout or "Claude session failed"
+                logger.error("Claude session %s failed: %s", session_id, error_msg)
+                return {"error": error_msg, "processed_entries": 0}
+
+            return {
+                "report": result.stdout.strip(),
+                "processed_entries": 1,
+            }
 
-        prompt = f"""Сегодня {today}. Сгенерируй недельный дайджест.
+        except subprocess.TimeoutExpired:
+            logger.error("Claude session %s timed out", session_id)
+            return {"error": "Execution timed out", "processed_entries": 0}
+        except FileNotFoundError:
+            logger.error("Claude CLI not found")
+            return {"error": "Claude CLI not installed", "processed_entries": 0}
+        except Exception as e:
+            logger.exception("Unexpected error in Claude session %s", session_id)
+            return {"error": str(e), "processed_entries": 0}
 
-ПЕРВЫМ ДЕЛОМ: вызови mcp__todoist__user-info чтобы убедиться что MCP работает.
+    async def generate_weekly(
+        self,
+        user_key: str = DEFAULT_USER_KEY,
+        on_partial: PartialCallback | None = None,
+    ) -> dict[str, Any]:
+        """Generate weekly digest with Claude.
 
-CRITICAL MCP RULE:
-- ТЫ ИМЕЕШЬ ДОСТУП к mcp__todoist__* tools — ВЫЗЫВАЙ ИХ НАПРЯМУЮ
-- НИКОГДА не пиши "MCP недоступен" или "добавь вручную"
-- Для выполненных задач: вызови mcp__todoist__find-completed-tasks tool
-- Если tool вернул ошибку — покажи ТОЧНУЮ ошибку в отчёте
+        Args:
+            user_key: Fairness key for the Claude runner queue
+            on_partial: Receives partial output while Claude is running
 
-WORKFLOW:
-1. Собери данные за неделю (daily файлы в vault/daily/, completed tasks через MCP)
-2. Проанализируй прогресс по целям (goals/3-weekly.md)
-3. Определи победы и вызовы
-4. Сгенерируй HTML отчёт
+        Returns:
+            Weekly digest report as dict
+        """
+        today = date.today()
 
-CRITICAL OUTPUT FORMAT:
-- Return ONLY raw HTML for Telegram (parse_mode=HTML)
-- NO markdown: no **, no ##, no ```, no tables
-- Start with 📅 <b>Недельный дайджест</b>
-- Allowed tags: <b>, <i>, <code>, <s>, <u>
-- Be concise - Telegram has 4096 char limit"""
+        builder = PromptBuilder("generate_weekly")
+        builder.add("header", f"Сегодня {today}. Сгенерируй недельный дайджест.")
+        builder.add(
+            "mcp_rules",
+            mcp_rules(
+                "Для выполненных задач: вызови mcp__todoist__find-completed-tasks tool"
+            ),
+        )
+        builder.add("workflow", _WEEKLY_WORKFLOW)
+        builder.add(
+            "output_format", html_output(start="with 📅 <b>Недельный дайджест</b>")
+        )
+        prompt = builder.build().text
 
         try:
-            env = os.environ.copy()
-            if self.todoist_api_key:
-                env["TODOIST_API_KEY"] = self.todoist_api_key
-
-            result = _run_claude(
-                [
-                    "--print",
-                    "--dangerously-skip-permissions",
-                    "--mcp-config",
-                    str(self._mcp_config_path),
-                    "-p",
-                    prompt,
-                ],
-                cwd=self.vault_path.parent,
-                env=env,
-                timeout=DEFAULT_TIMEOUT,
-            )
+            result = await self._run_claude(prompt, user_key, on_partial)
 
             if result.returncode != 0:
                 error_msg = result.stderr or result.stdout or "Weekly digest failed"
@@ -0,0 +1,168 @@
+"""Prompt assembly: cached file fragments, precompiled templates, size accounting."""
+
+import logging
+import string
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_TOKEN = 4  # Rough estimate; Cyrillic is 2 bytes per char in UTF-8
+
+
+class PromptTemplate:
+    """Text with `{name}` placeholders, parsed once when defined.
+
+    Rendering joins the precomputed literal segments with the values, with
+    no format-string parsing per call. `{{` and `}}` are literal braces.
+    """
+
+    def __init__(self, text: str) -> None:
+        self._segments = [
+            (literal, field_name)
+            for literal, field_name, _, _ in string.Formatter().parse(text)
+        ]
+        self.fields = frozenset(name for _, name in self._segments if name)
+
+    def render(self, **values: Any) -> str:
+        """Fill placeholders.
+
+        Raises:
+            KeyError: If a placeholder has no value
+        """
+        parts = []
+        for literal, field_name in self._segments:
+            parts.append(literal)
+            if field_name:
+                parts.append(str(values[field_name]))
+        return "".join(parts)
+
+
+class FileFragment:
+    """Prompt fragment backed by a file, re-read only when it changes.
+
+    Each read is a single stat(); the content is reloaded when mtime or
+    size differ from the cached copy. A missing file reads as empty.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._signature: tuple[int, int] | None = None
+        self._text = ""
+
+    def read(self) -> str:
+        """Get current file content."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._signature = None
+            self._text = ""
+            return ""
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            self._text = self.path.read_text(encoding="utf-8")
+            self._signature = signature
+            logger.debug("Loaded prompt fragment %s", self.path.name)
+        return self._text
+
+
+@dataclass
+class Prompt:
+    """Assembled prompt with the size of each labelled part."""
+
+    name: str
+    text: str
+    sizes: dict[str, int] = field(default_factory=dict)  # UTF-8 bytes per part
+
+    @property
+    def total_bytes(self) -> int:
+        """Size of the whole prompt in UTF-8 bytes."""
+        return len(self.text.encode())
+
+    @property
+    def approx_tokens(self) -> int:
+        """Rough token count."""
+        return -(-self.total_bytes // BYTES_PER_TOKEN)
+
+    def summary(self) -> str:
+        """One-line size breakdown, largest parts first."""
+        parts = ", ".join(
+            f"{label}={size}"
+            for label, size in sorted(self.sizes.items(), key=lambda i: -i[1])
+        )
+        return (
+            f"{self.name}: {self.total_bytes} B (~{self.approx_tokens} tokens)"
+            f" [{parts}]"
+        )
+
+
+class PromptBuilder:
+    """Collect labelled parts into a Prompt, separated by blank lines."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._parts: list[tuple[str, str]] = []
+
+    def add(self, label: str, text: str) -> "PromptBuilder":
+        """Append a part; empty parts are skipped."""
+        if text:
+            self._parts.append((label, text))
+        return self
+
+    def build(self) -> Prompt:
+        """Join parts and log the size breakdown."""
+        sizes: dict[str, int] = {}
+        for label, text in self._parts:
+            sizes[label] = sizes.get(label, 0) + len(text.encode())
+
+        prompt = Prompt(
+            name=self.name,
+            text="\n\n".join(text for _, text in self._parts),
+            sizes=sizes,
+        )
+        logger.info("Prompt %s", prompt.summary())
+        return prompt
+
+
+_MCP_RULES = PromptTemplate("""ПЕРВЫМ ДЕЛОМ: вызови mcp__todoist__user-info чтобы убедиться что MCP работает.
+
+CRITICAL MCP RULE:
+- ТЫ ИМЕЕШЬ ДОСТУП к mcp__todoist__* tools — ВЫЗЫВАЙ ИХ НАПРЯМУЮ
+- НИКОГДА не пиши "MCP недоступен" или "добавь вручную"
+{tool_hint}- Если tool вернул ошибку — покажи ТОЧНУЮ ошибку в отчёте""")  # noqa: E501
+
+_HTML_OUTPUT = PromptTemplate("""CRITICAL OUTPUT FORMAT:
+- Return ONLY raw HTML for Telegram (parse_mode=HTML)
+- NO markdown: no **, no ##, no ```, no tables{extra_markdown}
+{start}- Allowed tags: <b>, <i>, <code>, <s>, <u>{notes}""")
+
+
+@lru_cache(maxsize=32)
+def mcp_rules(tool_hint: str = "") -> str:
+    """Shared Todoist MCP rules block.
+
+    Args:
+        tool_hint: Extra rule naming the tool a command should call
+    """
+    return _MCP_RULES.render(tool_hint=f"- {tool_hint}\n" if tool_hint else "")
+
+
+@lru_cache(maxsize=32)
+def html_output(
+    start: str = "", notes: tuple[str, ...] = (), extra_markdown: str = ""
+) -> str:
+    """Shared Telegram HTML output rules block.
+
+    Args:
+        start: What the reply must start with
+        notes: Additional rules appended as list items
+        extra_markdown: More forbidden markdown, appended to the NO markdown line
+    """
+    return _HTML_OUTPUT.render(
+        start=f"- Start {start}\n" if start else "",
+        notes="".join(f"\n- {note}" for note in notes),
+        extra_markdown=f", {extra_markdown}" if extra_markdown else "",
+    )
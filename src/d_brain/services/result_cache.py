@@ -0,0 +1,200 @@
+"""Persistent cache of read-only Claude reports, keyed by vault content."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from d_brain.services.storage import STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 200
+DEFAULT_DEPENDENCIES = ("hypothesis", "goals")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    report TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+class ResultCache:
+    """Claude reports keyed by prompt and a Merkle hash of the files read.
+
+    The hash covers every file under the dependency directories: a leaf
+    is the SHA-256 of a file's bytes, a directory hashes its children's
+    names and hashes. Leaves are memoized by (mtime, size), so checking an
+    unchanged vault costs one stat() per file and no reads. Any edit, by
+    the bot, Claude or Obsidian sync, changes the root hash and misses.
+
+    Stored in .d-brain/results.sqlite3; least recently used entries are
+    evicted beyond max_entries. invalidate() drops entries eagerly when a
+    dependency is known to have been written.
+    """
+
+    def __init__(
+        self,
+        vault_path: Path,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        dependencies: tuple[str, ...] = DEFAULT_DEPENDENCIES,
+    ) -> None:
+        self.vault_path = Path(vault_path)
+        self.db_path = self.vault_path / STATE_DIR / "results.sqlite3"
+        self.max_entries = max_entries
+        self.dependencies = dependencies
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._leaves: dict[Path, tuple[tuple[int, int], bytes]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open database on first use."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    async def lookup(self, prompt: str) -> tuple[str, str | None]:
+        """Get cached report for prompt against the current vault.
+
+        Returns:
+            Cache key (pass to put) and the report, None on a miss
+        """
+        return await asyncio.to_thread(self._lookup, prompt)
+
+    async def put(self, key: str, report: str) -> None:
+        """Store report, evicting least recently used entries if full."""
+        await asyncio.to_thread(self._put, key, report)
+
+    def invalidate(self, *paths: Path | str) -> None:
+        """Drop cached reports after a write to any of paths (all if none).
+
+        Paths are files or directories, absolute or vault-relative; writes
+        outside the dependency directories are ignored.
+        """
+        if paths and not any(self._is_dependency(path) for path in paths):
+            return
+        with self._lock:
+            self._leaves.clear()
+            try:
+                with self._connect() as conn:
+                    dropped = conn.execute("DELETE FROM results").rowcount
+            except sqlite3.Error as e:
+                logger.warning("Result cache invalidation failed: %s", e)
+                return
+        if dropped:
+            logger.info("Result cache invalidated (%d reports)", dropped)
+
+    def tree_hash(self) -> str:
+        """Merkle root of the dependency directories."""
+        with self._lock:
+            return self._tree_hash()
+
+    def _is_dependency(self, path: Path | str) -> bool:
+        path = Path(path)
+        if path.is_absolute():
+            try:
+                path = path.relative_to(self.vault_path)
+            except ValueError:
+                return False
+        return not path.parts or path.parts[0] in self.dependencies
+
+    def _tree_hash(self) -> str:
+        seen: set[Path] = set()
+        root = hashlib.sha256()
+        for name in sorted(self.dependencies):
+            root.update(f"{name}\0".encode())
+            root.update(self._dir_hash(self.vault_path / name, seen))
+        for path in self._leaves.keys() - seen:
+            del self._leaves[path]
+        return root.hexdigest()
+
+    def _dir_hash(self, directory: Path, seen: set[Path]) -> bytes:
+        """Hash of a directory from its children's names and hashes."""
+        digest = hashlib.sha256()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            return digest.digest()
+
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            path = Path(entry.path)
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    child = self._dir_hash(path, seen)
+                elif entry.is_file():
+                    child = self._file_hash(path, entry.stat(), seen)
+                else:
+                    continue
+            except OSError:
+                continue
+            digest.update(f"{entry.name}\0".encode())
+            digest.update(child)
+        return digest.digest()
+
+    def _file_hash(self, path: Path, stat: os.stat_result, seen: set[Path]) -> bytes:
+        """Content hash of a file, reread only when mtime or size changed."""
+        seen.add(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._leaves.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        digest = hashlib.sha256(path.read_bytes()).digest()
+        self._leaves[path] = (signature, digest)
+        return digest
+
+    def _lookup(self, prompt: str) -> tuple[str, str | None]:
+        with self._lock:
+            tree = self._tree_hash()
+            key = hashlib.sha256(f"{tree}\0{prompt}".encode()).hexdigest()
+            try:
+                with self._connect() as conn:
+                    row = conn.execute(
+                        "SELECT report FROM results WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is None:
+                        return key, None
+                    conn.execute(
+                        "UPDATE results SET last_used = ? WHERE key = ?",
+                        (time.time(), key),
+                    )
+            except sqlite3.Error as e:
+                logger.warning("Result cache read failed: %s", e)
+                return key, None
+
+        logger.info("Result cache hit: %s", key[:12])
+        return key, row[0]
+
+    def _put(self, key: str, report: str) -> None:
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                    (key, report, time.time()),
+                )
+                conn.execute(
+                    "DELETE FROM results WHERE rowid IN ("
+                    " SELECT rowid FROM results"
+                    " ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error as e:
+            logger.warning("Result cache write failed: %s", e)
+
+    def close(self) -> None:
+        """Close database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
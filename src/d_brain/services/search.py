@@ -0,0 +1,282 @@
+"""Full-text search index over vault notes (SQLite FTS5)."""
+
+import asyncio
+import logging
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from d_brain.services.frontmatter import field_text, parse_frontmatter
+from d_brain.services.storage import STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+INDEXED_DIRS = ("daily", "thoughts", "summaries", "hypothesis")
+RECONCILE_INTERVAL = 30.0  # Seconds between mtime scans triggered by search
+SNIPPET_TOKENS = 16
+
+# Snippet highlight markers; replaced by the formatter after HTML escaping
+MARK_START = "\x02"
+MARK_END = "\x03"
+
+FILTER_FIELDS = {"type": "type", "status": "status", "tag": "tags", "domain": "domain"}
+_FILTER_RE = re.compile(r"\b(type|status|tag|domain):(\S+)")
+_WORD_RE = re.compile(r"\w+")
+_HEADING_RE = re.compile(r"^# (.+)$", re.MULTILINE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    created TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    title, body, tags,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """Ranked search result."""
+
+    path: str
+    title: str
+    type: str
+    snippet: str  # Plain text with MARK_START/MARK_END around matches
+
+
+def build_match_query(terms: str) -> str:
+    """Turn free text into a safe FTS5 query: all words, prefix-matched.
+
+    Prefix matching (`word*`) also finds Russian word forms that share a
+    stem with the query, e.g. `проект` matches `проекта`.
+    """
+    words = _WORD_RE.findall(terms.lower())
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def _note_id(conn: sqlite3.Connection, relative: str) -> int | None:
+    """Row id of an indexed note."""
+    row = conn.execute("SELECT id FROM notes WHERE path = ?", (relative,)).fetchone()
+    return row[0] if row else None
+
+
+class VaultIndex:
+    """FTS5 index of vault notes with frontmatter columns.
+
+    Stored in .d-brain/search.sqlite3. Files are reindexed whole when the
+    bot writes them (index_file) and by a stat-only scan that picks up
+    edits made in Obsidian or by Claude (reconcile). Safe to use from
+    worker threads.
+    """
+
+    def __init__(self, vault_path: Path) -> None:
+        self.vault_path = Path(vault_path)
+        self.db_path = self.vault_path / STATE_DIR / "search.sqlite3"
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._last_reconcile = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open database on first use."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _relative(self, path: Path) -> str | None:
+        """Vault-relative path if the file belongs in the index."""
+        try:
+            relative = path.resolve().relative_to(self.vault_path.resolve())
+        except ValueError:
+            return None
+        if relative.suffix != ".md" or relative.parts[0] not in INDEXED_DIRS:
+            return None
+        return relative.as_posix()
+
+    def index_file(self, path: Path) -> None:
+        """Reindex one file (or drop it if deleted)."""
+        relative = self._relative(path)
+        if relative is None:
+            return
+        with self._lock, self._connect() as conn:
+            self._index(conn, relative)
+
+    def _index(self, conn: sqlite3.Connection, relative: str) -> None:
+        """Write one file's row and FTS entry (caller holds the lock)."""
+        path = self.vault_path / relative
+        try:
+            stat = path.stat()
+            content = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            self._remove(conn, relative)
+            return
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning("Can't index %s: %s", relative, e)
+            return
+
+        fields, body = parse_frontmatter(content)
+        heading = _HEADING_RE.search(body)
+        title = (
+            field_text(fields.get("title"))
+            or (heading.group(1).strip() if heading else "")
+            or path.stem
+        )
+        tags = field_text(fields.get("tags"))
+        created = field_text(fields.get("created")) or field_text(fields.get("date"))
+
+        note_id = _note_id(conn, relative)
+        values = (
+            stat.st_mtime_ns,
+            stat.st_size,
+            title,
+            field_text(fields.get("type")),
+            field_text(fields.get("status")),
+            field_text(fields.get("domain")),
+            tags,
+            created,
+        )
+        if note_id is None:
+            note_id = conn.execute(
+                "INSERT INTO notes"
+                " (mtime_ns, size, title, type, status, domain, tags, created, path)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*values, relative),
+            ).lastrowid
+        else:
+            conn.execute(
+                "UPDATE notes SET mtime_ns = ?, size = ?, title = ?, type = ?,"
+                " status = ?, domain = ?, tags = ?, created = ? WHERE id = ?",
+                (*values, note_id),
+            )
+            conn.execute("DELETE FROM notes_fts WHERE rowid = ?", (note_id,))
+
+        conn.execute(
+            "INSERT INTO notes_fts (rowid, title, body, tags) VALUES (?, ?, ?, ?)",
+            (note_id, title, body, tags),
+        )
+
+    def _remove(self, conn: sqlite3.Connection, relative: str) -> None:
+        """Drop file from the index (caller holds the lock)."""
+        note_id = _note_id(conn, relative)
+        if note_id is not None:
+            conn.execute("DELETE FROM notes_fts WHERE rowid = ?", (note_id,))
+            conn.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+
+    def reconcile(self) -> int:
+        """Sync index with the vault by comparing mtime and size.
+
+        Returns:
+            Number of files reindexed or removed
+        """
+        on_disk: dict[str, tuple[int, int]] = {}
+        for dir_name in INDEXED_DIRS:
+            for path in (self.vault_path / dir_name).rglob("*.md"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                relative = path.relative_to(self.vault_path).as_posix()
+                on_disk[relative] = (stat.st_mtime_ns, stat.st_size)
+
+        changed = 0
+        with self._lock, self._connect() as conn:
+            indexed = {
+                path: (mtime_ns, size)
+                for path, mtime_ns, size in conn.execute(
+                    "SELECT path, mtime_ns, size FROM notes"
+                )
+            }
+            for relative in indexed.keys() - on_disk.keys():
+                self._remove(conn, relative)
+                changed += 1
+            for relative, signature in on_disk.items():
+                if indexed.get(relative) != signature:
+                    self._index(conn, relative)
+                    changed += 1
+
+        self._last_reconcile = time.monotonic()
+        if changed:
+            logger.info("Search index reconciled: %d files updated", changed)
+        return changed
+
+    async def search(self, query: str, limit: int = 10) -> list[SearchHit]:
+        """Find notes matching query, best first.
+
+        Supports `type:`, `status:`, `domain:` and `tag:` filters on
+        frontmatter, e.g. `churn type:hypothesis-map status:active`.
+        Runs in a worker thread; reconciles first if the last scan is older
+        than RECONCILE_INTERVAL.
+
+        Args:
+            query: Free text with optional filters
+            limit: Max results
+
+        Returns:
+            Ranked hits (title matches weigh most, then tags, then body);
+            filter-only queries return newest paths first
+        """
+        return await asyncio.to_thread(self._search, query, limit)
+
+    def _search(self, query: str, limit: int) -> list[SearchHit]:
+        if time.monotonic() - self._last_reconcile > RECONCILE_INTERVAL:
+            self.reconcile()
+
+        filters = [
+            (FILTER_FIELDS[key], value) for key, value in _FILTER_RE.findall(query)
+        ]
+        match_query = build_match_query(_FILTER_RE.sub(" ", query))
+        if not match_query and not filters:
+            return []
+
+        where = []
+        params: list[str | int] = []
+        for column, value in filters:
+            # Column names come from FILTER_FIELDS, never from user input
+            where.append(f"notes.{column} LIKE ?")
+            params.append(f"%{value}%")
+
+        if match_query:
+            where.append("notes_fts MATCH ?")
+            params.append(match_query)
+            snippet = (
+                f"snippet(notes_fts, 1, '{MARK_START}', '{MARK_END}', '…',"
+                f" {SNIPPET_TOKENS})"
+            )
+            order = "bm25(notes_fts, 5.0, 1.0, 3.0), notes.path DESC"
+        else:
+            snippet = "substr(notes_fts.body, 1, 200)"
+            order = "notes.path DESC"
+
+        sql = (
+            f"SELECT notes.path, notes.title, notes.type, {snippet}"
+            " FROM notes_fts JOIN notes ON notes.id = notes_fts.rowid"
+            f" WHERE {' AND '.join(where)} ORDER BY {order} LIMIT ?"
+        )
+        params.append(limit)
+
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def close(self) -> None:
+        """Close database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
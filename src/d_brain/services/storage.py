@@ -1,8 +1,120 @@
 """Vault storage service for saving entries."""
 
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field, replace
 from datetime import date, datetime
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# Bot-private state (indexes, caches) inside the vault, kept out of git
+STATE_DIR = ".d-brain"
+
+HASH_NAME_LENGTH = 16  # Hex digits of sha256 used in attachment names
+
+ENTRY_HEADER_RE = re.compile(r"^## (\d{2}:\d{2}) (\[.*\])\s*$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class DailyEntry:
+    """Single `## HH:MM [type]` entry of a daily file."""
+
+    time: str
+    msg_type: str
+    text: str
+    key: str
+
+    @property
+    def header(self) -> str:
+        """Entry header line."""
+        return f"## {self.time} {self.msg_type}"
+
+    def render(self) -> str:
+        """Entry as it appears in the daily file."""
+        return f"{self.header}\n{self.text}"
+
+
+@dataclass
+class DailyStats:
+    """Entry counters of one daily file.
+
+    Persisted as a JSON sidecar in .d-brain/stats/ together with the daily
+    file's mtime and size they were computed for, so a stale sidecar (file
+    edited in Obsidian or by Claude) is detected with one stat().
+    """
+
+    counts: dict[str, int] = field(default_factory=dict)  # By entry_kind
+    first: str = ""  # HH:MM of the earliest entry
+    last: str = ""  # HH:MM of the latest entry
+    bytes: int = 0  # Daily file size the counters match
+    mtime_ns: int = 0  # Daily file mtime the counters match
+
+    @property
+    def total(self) -> int:
+        """Number of entries."""
+        return sum(self.counts.values())
+
+    def add(self, time: str, msg_type: str) -> None:
+        """Count one entry."""
+        kind = entry_kind(msg_type)
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        self.first = min(self.first, time) if self.first else time
+        self.last = max(self.last, time)
+
+    @classmethod
+    def from_content(cls, content: str) -> "DailyStats":
+        """Count entries of a daily file (signature fields left unset)."""
+        stats = cls()
+        for match in ENTRY_HEADER_RE.finditer(content):
+            stats.add(match.group(1), match.group(2))
+        return stats
+
+
+def entry_kind(msg_type: str) -> str:
+    """Counter key of a type marker: `[forward from: Name]` -> `forward`."""
+    words = msg_type.strip("[]").split()
+    return words[0].rstrip(":").lower() if words else ""
+
+
+def attachment_filename(prefix: str, digest: str, extension: str) -> str:
+    """Content-addressed attachment filename, e.g. img-3f2a...9c.jpg."""
+    return f"{prefix}-{digest[:HASH_NAME_LENGTH]}.{extension}"
+
+
+def parse_daily_entries(content: str) -> list[DailyEntry]:
+    """Split daily file content into entries.
+
+    Each entry gets a stable key derived from its header and text, so the
+    same entry keeps its key when new entries are appended after it.
+    Identical entries are told apart by their occurrence number.
+    """
+    matches = list(ENTRY_HEADER_RE.finditer(content))
+    entries = []
+    seen: dict[str, int] = {}
+
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+        text = content[match.end() : end].strip("\n")
+        digest = hashlib.sha1(f"{match.group(0)}\n{text}".encode()).hexdigest()[:16]
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        entries.append(
+            DailyEntry(
+                time=match.group(1),
+                msg_type=match.group(2),
+                text=text,
+                key=f"{digest}-{occurrence}",
+            )
+        )
+
+    return entries
+
 
 class VaultStorage:
     """Service for storing entries in Obsidian vault."""
@@ -11,11 +123,26 @@ class VaultStorage:
         self.vault_path = Path(vault_path)
         self.daily_path = self.vault_path / "daily"
         self.attachments_path = self.vault_path / "attachments"
+        self.stats_path = self.vault_path / STATE_DIR / "stats"
+        self._dirs_ready = False
+        self._stats: dict[date, DailyStats] = {}
+        self._stats_lock = threading.Lock()
+        # Called with each note path after the bot writes it (e.g. search index)
+        self.write_hooks: list[Callable[[Path], None]] = []
 
     def _ensure_dirs(self) -> None:
-        """Ensure required directories exist."""
+        """Ensure required directories exist (checked once per instance)."""
+        if self._dirs_ready:
+            return
         self.daily_path.mkdir(parents=True, exist_ok=True)
         self.attachments_path.mkdir(parents=True, exist_ok=True)
+        self._dirs_ready = True
+
+    @staticmethod
+    def format_entry(text: str, timestamp: datetime, msg_type: str) -> str:
+        """Format entry block as appended to the daily file."""
+        time_str = timestamp.strftime("%H:%M")
+        return f"\n## {time_str} {msg_type}\n{text}\n"
 
     def get_daily_file(self, day: date) -> Path:
         """Get path to daily file for given date."""
@@ -35,51 +162,125 @@ class VaultStorage:
         timestamp: datetime,
         msg_type: str,
     ) -> None:
-        """Append entry to daily file.
+        """Append entry to daily file synchronously.
+
+        The bot goes through AppendJournal instead; this stays for scripts.
 
         Args:
             text: Content to append
             timestamp: Entry timestamp
             msg_type: Type marker like [voice], [text], [photo], [forward from: Name]
         """
-        self._ensure_dirs()
         file_path = self.get_daily_file(timestamp.date())
-
-        time_str = timestamp.strftime("%H:%M")
-        entry = f"\n## {time_str} {msg_type}\n{text}\n"
+        entry = self.format_entry(text, timestamp, msg_type)
 
         with file_path.open("a", encoding="utf-8") as f:
             f.write(entry)
+        self.record_appended(
+            timestamp.date(), [(timestamp, msg_type)], len(entry.encode())
+        )
+        self.notify_written(file_path)
 
-    def get_attachments_dir(self, day: date) -> Path:
-        """Get attachments directory for given date."""
-        dir_path = self.attachments_path / day.isoformat()
-        dir_path.mkdir(parents=True, exist_ok=True)
-        return dir_path
+    def daily_stats(self, day: date) -> DailyStats:
+        """Get entry counters for a day without reading the daily file.
 
-    def save_attachment(
-        self,
-        data: bytes,
-        day: date,
-        timestamp: datetime,
-        extension: str = "jpg",
-    ) -> str:
-        """Save attachment and return relative path for Obsidian embed.
+        The daily file is only re-read when it changed behind the bot's
+        back (its mtime or size differ from the sidecar).
+        """
+        file_path = self.get_daily_file(day)
+        with self._stats_lock:
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                self._stats.pop(day, None)
+                return DailyStats()
 
-        Args:
-            data: File bytes
-            day: Date for organizing
-            timestamp: Timestamp for filename
-            extension: File extension
+            stats = self._load_stats(day)
+            if stats is None or (stats.mtime_ns, stats.bytes) != (
+                stat.st_mtime_ns,
+                stat.st_size,
+            ):
+                stats = self._rebuild_stats(day)
+            return replace(stats, counts=dict(stats.counts))
 
-        Returns:
-            Relative path for Obsidian embed: attachments/YYYY-MM-DD/img-HHMMSS.ext
+    def record_appended(
+        self, day: date, entries: list[tuple[datetime, str]], appended_bytes: int
+    ) -> None:
+        """Update day counters after entries were appended to its file.
+
+        Counters are updated in place when the file grew by exactly the
+        appended bytes; otherwise the file was also edited elsewhere and the
+        counters are rebuilt from it.
+
+        Args:
+            day: Day of the daily file
+            entries: (timestamp, msg_type) of each appended entry
+            appended_bytes: UTF-8 size of everything appended
         """
-        dir_path = self.get_attachments_dir(day)
-        time_str = timestamp.strftime("%H%M%S")
-        filename = f"img-{time_str}.{extension}"
-        file_path = dir_path / filename
+        with self._stats_lock:
+            try:
+                stat = self.get_daily_file(day).stat()
+                stats = self._load_stats(day)
+                if stats is None and stat.st_size == appended_bytes:
+                    stats = DailyStats()  # New file holds only these entries
+                if stats is None or stats.bytes + appended_bytes != stat.st_size:
+                    self._rebuild_stats(day)
+                    return
+
+                for timestamp, msg_type in entries:
+                    stats.add(timestamp.strftime("%H:%M"), msg_type)
+                stats.bytes = stat.st_size
+                stats.mtime_ns = stat.st_mtime_ns
+                self._save_stats(day, stats)
+            except (OSError, ValueError) as e:
+                logger.warning("Failed to update stats for %s: %s", day, e)
+                self._stats.pop(day, None)
+
+    def _load_stats(self, day: date) -> DailyStats | None:
+        """Counters from memory or the sidecar (caller holds the lock)."""
+        stats = self._stats.get(day)
+        if stats is not None:
+            return stats
+        try:
+            data = json.loads(
+                (self.stats_path / f"{day.isoformat()}.json").read_text()
+            )
+            stats = DailyStats(**data)
+        except (OSError, ValueError, TypeError):
+            return None
+        self._stats[day] = stats
+        return stats
+
+    def _rebuild_stats(self, day: date) -> DailyStats:
+        """Recount entries from the daily file (caller holds the lock)."""
+        file_path = self.get_daily_file(day)
+        stat = file_path.stat()
+        stats = DailyStats.from_content(file_path.read_text(encoding="utf-8"))
+        stats.bytes = stat.st_size
+        stats.mtime_ns = stat.st_mtime_ns
+        self._save_stats(day, stats)
+        logger.debug("Rebuilt stats for %s: %d entries", day, stats.total)
+        return stats
 
-        file_path.write_bytes(data)
+    def _save_stats(self, day: date, stats: DailyStats) -> None:
+        """Write sidecar atomically and cache it (caller holds the lock)."""
+        self._stats[day] = stats
+        self.stats_path.mkdir(parents=True, exist_ok=True)
+        path = self.stats_path / f"{day.isoformat()}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(asdict(stats)))
+        os.replace(tmp_path, path)
 
-        return f"attachments/{day.isoformat()}/{filename}"
+    def notify_written(self, path: Path) -> None:
+        """Run write hooks for a note the bot has written."""
+        for hook in self.write_hooks:
+            try:
+                hook(path)
+            except Exception:
+                logger.exception("Write hook failed for %s", path)
+
+    def get_attachments_dir(self, day: date) -> Path:
+        """Get attachments directory for given date."""
+        dir_path = self.attachments_path / day.isoformat()
+        dir_path.mkdir(parents=True, exist_ok=True)
+        return dir_path
@@ -0,0 +1,111 @@
+"""Persistent LRU cache of voice transcripts."""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from d_brain.services.storage import STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 2000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    file_unique_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    language TEXT NOT NULL,
+    transcript TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (file_unique_id, model, language)
+);
+CREATE INDEX IF NOT EXISTS transcripts_last_used ON transcripts (last_used);
+"""
+
+
+class TranscriptCache:
+    """Transcripts keyed by Telegram file_unique_id, model and language.
+
+    file_unique_id is the same for every forward or re-send of a voice
+    note, so a hit skips both the download and the transcription. Stored
+    in .d-brain/transcripts.sqlite3; least recently used entries are
+    evicted beyond max_entries. Queries run in worker threads.
+    """
+
+    def __init__(
+        self, vault_path: Path, max_entries: int = DEFAULT_MAX_ENTRIES
+    ) -> None:
+        self.db_path = Path(vault_path) / STATE_DIR / "transcripts.sqlite3"
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open database on first use."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    async def get(self, file_unique_id: str, model: str, language: str) -> str | None:
+        """Get cached transcript and mark it as recently used."""
+        return await asyncio.to_thread(self._get, file_unique_id, model, language)
+
+    async def put(
+        self, file_unique_id: str, model: str, language: str, transcript: str
+    ) -> None:
+        """Store transcript, evicting least recently used entries if full."""
+        await asyncio.to_thread(self._put, file_unique_id, model, language, transcript)
+
+    def _get(self, file_unique_id: str, model: str, language: str) -> str | None:
+        key = (file_unique_id, model, language)
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT transcript FROM transcripts"
+                    " WHERE file_unique_id = ? AND model = ? AND language = ?",
+                    key,
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    "UPDATE transcripts SET last_used = ?"
+                    " WHERE file_unique_id = ? AND model = ? AND language = ?",
+                    (time.time(), *key),
+                )
+        except sqlite3.Error as e:
+            logger.warning("Transcript cache read failed: %s", e)
+            return None
+
+        logger.info("Transcript cache hit: %s", file_unique_id)
+        return row[0]
+
+    def _put(
+        self, file_unique_id: str, model: str, language: str, transcript: str
+    ) -> None:
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?)",
+                    (file_unique_id, model, language, transcript, time.time()),
+                )
+                conn.execute(
+                    "DELETE FROM transcripts WHERE rowid IN ("
+                    " SELECT rowid FROM transcripts"
+                    " ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error as e:
+            logger.warning("Transcript cache write failed: %s", e)
+
+    def close(self) -> None:
+        """Close database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,17 +1,101 @@
-"""Deepgram transcription service."""
+"""Transcription services: Deepgram, local Whisper and routing between them."""
 
+import asyncio
+import io
 import logging
+import multiprocessing
+import os
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Protocol
 
+import httpx
 from deepgram import AsyncDeepgramClient
+from deepgram.environment import DeepgramClientEnvironment
+
+from d_brain.services.audio import ffmpeg_available, split_on_silence
+
+try:
+    import faster_whisper
+except ImportError:  # Optional: pip install agent-second-brain[local]
+    faster_whisper = None  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
 
+TRANSCRIBERS = ("deepgram", "local", "auto")
+
+CHUNKED_MIN_DURATION = 120  # Seconds; shorter notes go in one request
+MAX_PARALLEL_CHUNKS = 4
+
+# (text so far in order, chunks done, total chunks)
+ChunkProgressCallback = Callable[[str, int, int], Awaitable[None]]
+
+
+class Transcriber(Protocol):
+    """Speech-to-text engine used by the voice, /do and EKG handlers."""
+
+    # Part of the transcript cache key
+    model: str
+    language: str
+
+    async def transcribe(self, audio_bytes: bytes) -> str:
+        """Transcribe audio bytes to text."""
+        ...
+
+    async def transcribe_chunked(
+        self,
+        audio_bytes: bytes,
+        duration: float,
+        on_progress: ChunkProgressCallback | None = None,
+    ) -> str:
+        """Transcribe audio of known duration, long audio in chunks."""
+        ...
+
+    def close(self) -> None:
+        """Release engine resources."""
+        ...
+
+
+def _environment(base_url: str) -> DeepgramClientEnvironment:
+    """Build Deepgram environment, optionally pointing at another host."""
+    if not base_url:
+        return DeepgramClientEnvironment.PRODUCTION
+    ws_url = base_url.replace("https://", "wss://").replace("http://", "ws://")
+    return DeepgramClientEnvironment(
+        base=base_url,
+        production=ws_url,
+        agent=ws_url,
+        agent_rest=base_url,
+    )
+
 
 class DeepgramTranscriber:
     """Service for transcribing audio using Deepgram Nova-3."""
 
-    def __init__(self, api_key: str) -> None:
-        self.client = AsyncDeepgramClient(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "",
+        http_client: httpx.AsyncClient | None = None,
+        model: str = "nova-3",
+        language: str = "ru",
+    ) -> None:
+        """Create transcriber.
+
+        Args:
+            api_key: Deepgram API key
+            base_url: Override API host, e.g. a local stub server in tests
+            http_client: Shared HTTP client to send requests through
+            model: Deepgram model
+            language: Spoken language
+        """
+        self.model = model
+        self.language = language
+        self.client = AsyncDeepgramClient(
+            api_key=api_key,
+            environment=_environment(base_url),
+            httpx_client=http_client,
+        )
 
     async def transcribe(self, audio_bytes: bytes) -> str:
         """Transcribe audio bytes to text.
@@ -29,8 +113,8 @@ class DeepgramTranscriber:
 
         response = await self.client.listen.v1.media.transcribe_file(
             request=audio_bytes,
-            model="nova-3",
-            language="ru",
+            model=self.model,
+            language=self.language,
             punctuate=True,
             smart_format=True,
         )
@@ -45,3 +129,221 @@ class DeepgramTranscriber:
 
         logger.info("Transcription complete: %d chars", len(transcript))
         return transcript
+
+    async def transcribe_chunked(
+        self,
+        audio_bytes: bytes,
+        duration: float,
+        on_progress: ChunkProgressCallback | None = None,
+    ) -> str:
+        """Transcribe long audio as parallel chunks split at pauses.
+
+        Falls back to a single request for short audio or without ffmpeg.
+
+        Args:
+            audio_bytes: Audio file content
+            duration: Audio duration in seconds
+            on_progress: Called as chunks finish with the ordered text so far
+
+        Returns:
+            Transcribed text, chunks stitched in order
+        """
+        return await transcribe_in_chunks(
+            self.transcribe, audio_bytes, duration, MAX_PARALLEL_CHUNKS, on_progress
+        )
+
+    def close(self) -> None:
+        """Nothing to release; the shared HTTP client is owned by the caller."""
+
+
+# Whisper model loaded once per worker process by _init_whisper_worker
+_worker_model: Any = None
+
+
+def _init_whisper_worker(model: str, cpu_threads: int) -> None:
+    """Load Whisper model in a pool worker."""
+    global _worker_model
+    _worker_model = faster_whisper.WhisperModel(
+        model, device="cpu", compute_type="int8", cpu_threads=cpu_threads
+    )
+
+
+def _whisper_transcribe(audio_bytes: bytes, language: str) -> str:
+    """Transcribe in a pool worker (decodes OGG/Opus itself via PyAV)."""
+    segments, _ = _worker_model.transcribe(
+        io.BytesIO(audio_bytes), language=language, vad_filter=True
+    )
+    return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+class WhisperTranscriber:
+    """Local CPU transcription with faster-whisper in a process pool.
+
+    Each worker process loads the model once (int8 on CPU) and decodes
+    audio itself, so the event loop only ships bytes. Works offline; long
+    notes are split at pauses and spread across the workers.
+    """
+
+    def __init__(
+        self, model: str = "small", workers: int = 1, language: str = "ru"
+    ) -> None:
+        """Create transcriber; worker processes start on first use.
+
+        Args:
+            model: faster-whisper model size or path (tiny, base, small, ...)
+            workers: Worker processes, each with its own model copy
+            language: Spoken language
+        """
+        if faster_whisper is None:
+            raise RuntimeError("faster-whisper is not installed")
+
+        self.model = f"whisper-{model}"
+        self.language = language
+        self.workers = max(1, workers)
+        cpu_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        # spawn: forking a process with a running event loop and threads is unsafe
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_whisper_worker,
+            initargs=(model, cpu_threads),
+        )
+
+    async def transcribe(self, audio_bytes: bytes) -> str:
+        """Transcribe audio bytes to text.
+
+        Args:
+            audio_bytes: Audio file content
+
+        Returns:
+            Transcribed text
+        """
+        logger.info(
+            "Starting local transcription, audio size: %d bytes", len(audio_bytes)
+        )
+        loop = asyncio.get_running_loop()
+        transcript = await loop.run_in_executor(
+            self._pool, _whisper_transcribe, audio_bytes, self.language
+        )
+        logger.info("Local transcription complete: %d chars", len(transcript))
+        return transcript
+
+    async def transcribe_chunked(
+        self,
+        audio_bytes: bytes,
+        duration: float,
+        on_progress: ChunkProgressCallback | None = None,
+    ) -> str:
+        """Transcribe long audio as chunks spread across worker processes."""
+        return await transcribe_in_chunks(
+            self.transcribe, audio_bytes, duration, self.workers, on_progress
+        )
+
+    def close(self) -> None:
+        """Stop worker processes."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class RoutingTranscriber:
+    """Send short notes to a local engine and long ones to a remote one.
+
+    Short captures skip the network hop; long memos get the remote
+    engine's throughput and parallel chunking.
+    """
+
+    def __init__(
+        self, local: Transcriber, remote: Transcriber, max_local_duration: float
+    ) -> None:
+        """Create router.
+
+        Args:
+            local: Engine for notes up to max_local_duration seconds
+            remote: Engine for longer notes
+            max_local_duration: Routing threshold in seconds
+        """
+        self.local = local
+        self.remote = remote
+        self.max_local_duration = max_local_duration
+        # Routing is deterministic by duration, so one key covers both engines
+        self.model = f"{local.model}|{remote.model}@{max_local_duration:g}"
+        self.language = local.language
+
+    async def transcribe(self, audio_bytes: bytes) -> str:
+        """Transcribe audio of unknown duration with the remote engine."""
+        return await self.remote.transcribe(audio_bytes)
+
+    async def transcribe_chunked(
+        self,
+        audio_bytes: bytes,
+        duration: float,
+        on_progress: ChunkProgressCallback | None = None,
+    ) -> str:
+        """Pick engine by duration and transcribe."""
+        engine = self.local if duration <= self.max_local_duration else self.remote
+        return await engine.transcribe_chunked(audio_bytes, duration, on_progress)
+
+    def close(self) -> None:
+        """Close both engines."""
+        self.local.close()
+        self.remote.close()
+
+
+async def transcribe_in_chunks(
+    transcribe: Callable[[bytes], Awaitable[str]],
+    audio_bytes: bytes,
+    duration: float,
+    max_parallel: int,
+    on_progress: ChunkProgressCallback | None = None,
+) -> str:
+    """Split audio at pauses and transcribe chunks concurrently.
+
+    Falls back to one call for short audio, without ffmpeg, or if the
+    split fails.
+
+    Args:
+        transcribe: Engine call for a single piece of audio
+        audio_bytes: Audio file content
+        duration: Audio duration in seconds
+        max_parallel: Max chunks transcribed at once
+        on_progress: Called as chunks finish with the ordered text so far
+
+    Returns:
+        Transcribed text, chunks stitched in order
+    """
+    if duration < CHUNKED_MIN_DURATION or not ffmpeg_available():
+        return await transcribe(audio_bytes)
+
+    try:
+        chunks = await split_on_silence(audio_bytes, duration)
+    except Exception as e:
+        logger.warning("Audio split failed, transcribing whole file: %s", e)
+        return await transcribe(audio_bytes)
+
+    if len(chunks) == 1:
+        return await transcribe(audio_bytes)
+
+    results: list[str | None] = [None] * len(chunks)
+    semaphore = asyncio.Semaphore(max_parallel)
+
+    async def transcribe_chunk(index: int, chunk: bytes) -> None:
+        async with semaphore:
+            results[index] = await transcribe(chunk)
+
+        if on_progress is not None:
+            done = sum(1 for r in results if r is not None)
+            prefix = []
+            for text in results:
+                if text is None:
+                    break
+                prefix.append(text)
+            await on_progress(_join(prefix), done, len(chunks))
+
+    await asyncio.gather(
+        *(transcribe_chunk(i, chunk) for i, chunk in enumerate(chunks))
+    )
+    return _join(results)
+
+
+def _join(parts: list[str] | list[str | None]) -> str:
+    """Stitch chunk transcripts, skipping empty ones."""
+    return " ".join(part.strip() for part in parts if part and part.strip())
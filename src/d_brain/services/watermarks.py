@@ -0,0 +1,82 @@
+"""Watermarks of processed daily entries."""
+
+import json
+import logging
+import os
+from datetime import date, datetime
+from pathlib import Path
+
+from d_brain.services.storage import STATE_DIR, DailyEntry, parse_daily_entries
+
+logger = logging.getLogger(__name__)
+
+
+class WatermarkIndex:
+    """Track which entries of each daily file were already processed.
+
+    Stored as one small JSON sidecar per day in .d-brain/watermarks/.
+    """
+
+    def __init__(self, vault_path: Path) -> None:
+        self.vault_path = Path(vault_path)
+        self.index_path = self.vault_path / STATE_DIR / "watermarks"
+
+    def _sidecar(self, day: date) -> Path:
+        """Get sidecar path for given date."""
+        return self.index_path / f"{day.isoformat()}.json"
+
+    def processed_keys(self, day: date) -> set[str]:
+        """Get keys of entries already processed on given date."""
+        path = self._sidecar(day)
+        if not path.exists():
+            return set()
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Corrupt watermark %s, treating day as new: %s", path, e)
+            return set()
+        return set(data.get("processed", []))
+
+    def split_entries(
+        self, day: date, content: str
+    ) -> tuple[list[DailyEntry], list[DailyEntry]]:
+        """Split daily content into processed and pending entries.
+
+        Args:
+            day: Date of the daily file
+            content: Daily file content
+
+        Returns:
+            Tuple of (processed, pending) entries in file order
+        """
+        done = self.processed_keys(day)
+        processed, pending = [], []
+        for entry in parse_daily_entries(content):
+            (processed if entry.key in done else pending).append(entry)
+        return processed, pending
+
+    def mark_processed(self, day: date, entries: list[DailyEntry]) -> None:
+        """Record entries as processed."""
+        if not entries:
+            return
+
+        keys = self.processed_keys(day) | {entry.key for entry in entries}
+        self.index_path.mkdir(parents=True, exist_ok=True)
+
+        path = self._sidecar(day)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "processed": sorted(keys),
+                    "updated": datetime.now().isoformat(timespec="seconds"),
+                }
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
+        logger.info("Watermark %s: %d entries processed", day, len(keys))
+
+    def reset(self, day: date) -> None:
+        """Forget processed entries for given date."""
+        self._sidecar(day).unlink(missing_ok=True)